@@ -0,0 +1,71 @@
+from flask import Blueprint
+from werkzeug.utils import cached_property, import_string
+
+# Admin panel under /admin. Only the URL rules are declared here; the view
+# functions in admin_views.py are imported by the first admin request, which
+# keeps them (and what they import) off the cold-start path of public pages.
+bp = Blueprint('admin', __name__, url_prefix='/admin')
+
+
+class LazyView:
+    """View that imports the function it stands for on first call."""
+
+    def __init__(self, import_name):
+        self.__module__, self.__name__ = import_name.rsplit('.', 1)
+        self.import_name = import_name
+
+    @cached_property
+    def view(self):
+        return import_string(self.import_name)
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def route(rule, endpoint, **options):
+    bp.add_url_rule(rule, endpoint, LazyView(f'admin_views.{endpoint}'), **options)
+
+
+route('/login', 'login', methods=['GET', 'POST'])
+route('/logout', 'logout')
+route('', 'dashboard')
+route('/metrics', 'metrics')
+
+# Announcements
+route('/announcements', 'announcements')
+route('/announcements/add', 'add_announcement', methods=['GET', 'POST'])
+route('/announcements/edit/<announcement_id>', 'edit_announcement', methods=['GET', 'POST'])
+route('/announcements/delete/<announcement_id>', 'delete_announcement', methods=['POST'])
+route('/announcements/delete', 'bulk_delete_announcements', methods=['POST'])
+route('/announcements/import', 'import_announcements', methods=['POST'])
+
+# Staff
+route('/staff', 'staff')
+route('/staff/add', 'add_staff', methods=['GET', 'POST'])
+route('/staff/edit/<staff_id>', 'edit_staff', methods=['GET', 'POST'])
+route('/staff/delete/<staff_id>', 'delete_staff', methods=['POST'])
+route('/staff/delete', 'bulk_delete_staff', methods=['POST'])
+route('/staff/import', 'import_staff', methods=['POST'])
+
+# Image library
+route('/images', 'images')
+route('/images/upload', 'upload_image', methods=['POST'])
+route('/images/delete/<filename>', 'delete_image', methods=['POST'])
+route('/images/delete', 'bulk_delete_images', methods=['POST'])
+route('/images/gc', 'image_gc', methods=['GET', 'POST'])
+route('/images/thumbnail/<path:path>', 'image_thumbnail')
+
+# Page-specific images
+for page in ('home', 'about', 'programs'):
+    route(f'/images/{page}', f'{page}_images')
+    route(f'/images/{page}/upload', f'upload_{page}_image', methods=['POST'])
+    route(f'/images/{page}/edit', f'edit_{page}_image', methods=['POST'])
+    route(f'/images/{page}/delete/<filename>', f'delete_{page}_image', methods=['POST'])
+
+# Contact and newsletter submissions
+route('/submissions', 'submissions')
+route('/submissions/export', 'export_submissions')
+
+# Program images
+route('/programs', 'programs')
+route('/programs/edit/<program_id>', 'edit_program_image', methods=['GET', 'POST'])
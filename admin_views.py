@@ -0,0 +1,755 @@
+from datetime import datetime
+import csv
+import io
+import os
+
+from flask import abort, current_app, flash, redirect, request, send_file, session, url_for
+from werkzeug.security import check_password_hash, safe_join
+from werkzeug.utils import secure_filename
+
+import record_import
+from helpers import (allowed_file, collect_orphaned_images, login_required, paginate_images, paginate_submissions,
+                     remove_image, remove_images, save_image, save_images, save_upload, save_uploads, uploaded_images)
+from services import (compression, fragment_cache, login_throttle, page_cache, render_template, store, thumbnails,
+                      upload_store)
+from services import metrics as request_metrics
+from services import submissions as submission_queue
+from submissions import SUBMISSION_FIELDS
+
+# Admin view functions. They are routed by admin.py and imported on the first
+# request to an /admin URL, so public-only workers never load them.
+
+def login():
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        admin_users = current_app.config['ADMIN_USERS']
+        
+        # Throttle before check_password_hash: the KDF is what a flood would exhaust
+        retry_after = login_throttle.check(request.remote_addr, username if username in admin_users else None)
+        if retry_after:
+            flash(f'Too many login attempts. Try again in {retry_after} seconds.', 'error')
+            return render_template('admin/login.html'), 429, {'Retry-After': str(retry_after)}
+        
+        if username in admin_users and check_password_hash(admin_users[username], password):
+            session['admin_logged_in'] = True
+            session['admin_username'] = username
+            flash('Successfully logged in!', 'success')
+            return redirect(url_for('admin.dashboard'))
+        else:
+            flash('Invalid username or password.', 'error')
+    
+    return render_template('admin/login.html')
+
+def logout():
+    session.pop('admin_logged_in', None)
+    session.pop('admin_username', None)
+    flash('Successfully logged out.', 'success')
+    return redirect(url_for('admin.login'))
+
+@login_required
+def dashboard():
+    # Get counts for dashboard
+    stats = {
+        'announcements': store.count('announcements'),
+        'staff': store.count('staff'),
+        'leadership': store.count('staff', 'role', 'leadership'),
+        'program_staff': store.count('staff', 'role', 'program_staff')
+    }
+    
+    return render_template('admin/dashboard.html', stats=stats)
+
+@login_required
+def metrics():
+    cache_stats = page_cache.stats()
+    fragment_stats = fragment_cache.stats()
+    compression_stats = compression.stats()
+    throttle_stats = login_throttle.stats()
+    submission_stats = submission_queue.stats()
+    
+    # Prometheus text exposition format for scrapers
+    if request.args.get('format') == 'prometheus':
+        extra = [
+            ('page_cache_entries', 'gauge', 'Rendered pages currently cached.', cache_stats['entries']),
+            ('page_cache_hits_total', 'counter', 'Page cache hits.', cache_stats['hits']),
+            ('page_cache_misses_total', 'counter', 'Page cache misses.', cache_stats['misses']),
+            ('page_cache_evictions_total', 'counter', 'Page cache evictions.', cache_stats['evictions']),
+            ('fragment_cache_entries', 'gauge', 'Rendered template fragments currently cached.',
+             fragment_stats['entries']),
+            ('fragment_cache_hits_total', 'counter', 'Template fragment cache hits.', fragment_stats['hits']),
+            ('fragment_cache_misses_total', 'counter', 'Template fragment cache misses.', fragment_stats['misses']),
+            ('compression_cache_hits_total', 'counter', 'Compressed bodies reused.', compression_stats['hits']),
+            ('compression_cache_misses_total', 'counter', 'Bodies compressed and cached.', compression_stats['misses']),
+            ('login_throttled_ip_total', 'counter', 'Login attempts rejected by the per-IP limit.', throttle_stats['ip']),
+            ('login_throttled_username_total', 'counter', 'Login attempts rejected by the per-username limit.',
+             throttle_stats['username']),
+            ('submissions_queued', 'gauge', 'Form submissions waiting to be written.', submission_stats['queued']),
+            ('submissions_written_total', 'counter', 'Form submissions written.', submission_stats['written']),
+            ('submissions_rejected_total', 'counter', 'Form submissions refused with a 429 because the queue was full.',
+             submission_stats['rejected']),
+        ]
+        return current_app.response_class(request_metrics.prometheus(extra),
+                                  content_type='text/plain; version=0.0.4; charset=utf-8')
+    
+    return render_template('admin/metrics.html', metrics=request_metrics.snapshot(), page_cache=cache_stats,
+                           fragment_cache=fragment_stats, login_throttle=throttle_stats)
+
+# ===================================
+# Admin - Announcements Management
+# ===================================
+
+@login_required
+def announcements():
+    announcements = store.all('announcements')
+    return render_template('admin/announcements.html', announcements=announcements)
+
+@login_required
+def add_announcement():
+    if request.method == 'POST':
+        # Generate unique numeric ID
+        new_id = store.next_id('announcements')
+        
+        # Handle file upload
+        image_url = '/static/images/announcements/default.jpg'
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and allowed_file(file.filename):
+                image_url = save_upload(file)
+        
+        new_announcement = {
+            'id': new_id,
+            'title': request.form.get('title'),
+            'excerpt': request.form.get('excerpt'),
+            'category': request.form.get('category'),
+            'date': datetime.now().isoformat(),
+            'image_url': image_url,
+            'featured': request.form.get('featured') == 'on'
+        }
+        
+        store.insert('announcements', new_announcement, first=True)
+        
+        flash('Announcement added successfully!', 'success')
+        return redirect(url_for('admin.announcements'))
+    
+    return render_template('admin/announcement_form.html', announcement=None)
+
+@login_required
+def edit_announcement(announcement_id):
+    # Convert to int if it's a numeric string
+    try:
+        announcement_id = int(announcement_id)
+    except ValueError:
+        pass
+    announcement = store.get('announcements', announcement_id)
+    
+    if not announcement:
+        flash('Announcement not found.', 'error')
+        return redirect(url_for('admin.announcements'))
+    
+    if request.method == 'POST':
+        changes = {
+            'title': request.form.get('title'),
+            'excerpt': request.form.get('excerpt'),
+            'category': request.form.get('category'),
+            'featured': request.form.get('featured') == 'on'
+        }
+        
+        # Handle file upload
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and allowed_file(file.filename):
+                changes['image_url'] = save_upload(file)
+        
+        store.update('announcements', announcement_id, changes)
+        
+        flash('Announcement updated successfully!', 'success')
+        return redirect(url_for('admin.announcements'))
+    
+    return render_template('admin/announcement_form.html', announcement=announcement)
+
+@login_required
+def delete_announcement(announcement_id):
+    # Convert to int if it's a numeric string
+    try:
+        announcement_id = int(announcement_id)
+    except ValueError:
+        pass
+    store.delete('announcements', announcement_id)
+    
+    flash('Announcement deleted successfully!', 'success')
+    return redirect(url_for('admin.announcements'))
+
+# ===================================
+# Admin - Bulk Import and Delete
+# ===================================
+
+# Record ids arrive as strings; numeric ones are stored as ints
+def _record_ids(values):
+    return [int(v) if v.isdigit() else v for v in values]
+
+# Validate a CSV/JSON upload and insert every record in one write, or none if
+# any row is invalid
+def _import_records(name, redirect_endpoint):
+    file = request.files.get('file')
+    if not file or not file.filename:
+        flash('No file selected.', 'error')
+        return redirect(url_for(redirect_endpoint))
+    
+    try:
+        rows = record_import.read_rows(file)
+    except (ValueError, UnicodeDecodeError) as e:
+        flash(f'Could not read {file.filename}: {e}', 'error')
+        return redirect(url_for(redirect_endpoint))
+    
+    records, errors = record_import.build_records(name, rows)
+    if errors:
+        flash('Nothing was imported. ' + '; '.join(errors[:10]) + (' ...' if len(errors) > 10 else ''), 'error')
+        return redirect(url_for(redirect_endpoint))
+    if not records:
+        flash('The file contains no records.', 'error')
+        return redirect(url_for(redirect_endpoint))
+    
+    for record_id, record in zip(store.next_ids(name, len(records)), records):
+        record['id'] = record_id
+    # Announcements are listed newest first, so the batch goes on top
+    store.insert_many(name, records, first=(name == 'announcements'))
+    
+    flash(f'Imported {len(records)} record(s) from {file.filename}.', 'success')
+    return redirect(url_for(redirect_endpoint))
+
+# Delete every selected record in one write
+def _delete_records(name, redirect_endpoint):
+    deleted = store.delete_many(name, _record_ids(request.form.getlist('ids')))
+    
+    if deleted:
+        flash(f'Deleted {len(deleted)} record(s).', 'success')
+    else:
+        flash('No records selected.', 'error')
+    return redirect(url_for(redirect_endpoint))
+
+@login_required
+def import_announcements():
+    return _import_records('announcements', 'admin.announcements')
+
+@login_required
+def bulk_delete_announcements():
+    return _delete_records('announcements', 'admin.announcements')
+
+@login_required
+def import_staff():
+    return _import_records('staff', 'admin.staff')
+
+@login_required
+def bulk_delete_staff():
+    return _delete_records('staff', 'admin.staff')
+
+# ===================================
+# Admin - Staff Management
+# ===================================
+
+@login_required
+def staff():
+    staff = store.all('staff')
+    return render_template('admin/staff.html', staff=staff)
+
+@login_required
+def add_staff():
+    if request.method == 'POST':
+        # Generate unique numeric ID
+        new_id = store.next_id('staff')
+        
+        # Handle file upload
+        image_url = '/static/images/staff/default.jpg'
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and allowed_file(file.filename):
+                image_url = save_upload(file)
+        
+        new_staff = {
+            'id': new_id,
+            'name': request.form.get('name'),
+            'title': request.form.get('title'),
+            'bio': request.form.get('bio'),
+            'role': request.form.get('role'),
+            'email': request.form.get('email'),
+            'linkedin_url': request.form.get('linkedin_url'),
+            'image_url': image_url
+        }
+        
+        # Add department for program staff
+        if new_staff['role'] == 'program_staff':
+            new_staff['department'] = request.form.get('department')
+        
+        store.insert('staff', new_staff)
+        
+        flash('Staff member added successfully!', 'success')
+        return redirect(url_for('admin.staff'))
+    
+    return render_template('admin/staff_form.html', staff_member=None)
+
+@login_required
+def edit_staff(staff_id):
+    # Convert to int if it's a numeric string
+    try:
+        staff_id = int(staff_id)
+    except ValueError:
+        pass
+    staff_member = store.get('staff', staff_id)
+    
+    if not staff_member:
+        flash('Staff member not found.', 'error')
+        return redirect(url_for('admin.staff'))
+    
+    if request.method == 'POST':
+        changes = {
+            'name': request.form.get('name'),
+            'title': request.form.get('title'),
+            'bio': request.form.get('bio'),
+            'role': request.form.get('role'),
+            'email': request.form.get('email'),
+            'linkedin_url': request.form.get('linkedin_url')
+        }
+        
+        if changes['role'] == 'program_staff':
+            changes['department'] = request.form.get('department')
+        
+        # Handle file upload
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and allowed_file(file.filename):
+                changes['image_url'] = save_upload(file)
+        
+        store.update('staff', staff_id, changes)
+        
+        flash('Staff member updated successfully!', 'success')
+        return redirect(url_for('admin.staff'))
+    
+    return render_template('admin/staff_form.html', staff_member=staff_member)
+
+@login_required
+def delete_staff(staff_id):
+    # Convert to int if it's a numeric string
+    try:
+        staff_id = int(staff_id)
+    except ValueError:
+        pass
+    store.delete('staff', staff_id)
+    
+    flash('Staff member deleted successfully!', 'success')
+    return redirect(url_for('admin.staff'))
+
+# ===================================
+# Admin - Images Management
+# ===================================
+
+@login_required
+def images():
+    # One page of the uploaded images (newest first)
+    pagination = paginate_images('uploads', request.args.get('page', 1, type=int))
+    
+    return render_template('admin/images.html', images=pagination['items'], pagination=pagination)
+
+@login_required
+def upload_image():
+    files, rejected = uploaded_images()
+    
+    if not files and not rejected:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.images'))
+    
+    if files:
+        upload_store.add_to_library(*save_uploads(files))
+        flash(f"{len(files)} image{'s' if len(files) != 1 else ''} uploaded successfully!", 'success')
+    if rejected:
+        flash(f"Invalid file type: {', '.join(rejected)}. Allowed types: png, jpg, jpeg, gif, webp", 'error')
+    
+    return redirect(url_for('admin.images'))
+
+@login_required
+def delete_image(filename):
+    filename = secure_filename(filename)
+    filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+    
+    references = upload_store.refcount(filename)
+    if references:
+        flash(f'Image is still used by {references} record(s) and cannot be deleted.', 'error')
+    elif os.path.exists(filepath):
+        remove_image(filepath)
+        upload_store.remove_from_library(upload_store.url(filename))
+        flash('Image deleted successfully!', 'success')
+    else:
+        flash('Image not found.', 'error')
+    
+    return redirect(url_for('admin.images'))
+
+@login_required
+def bulk_delete_images():
+    filepaths, in_use = [], []
+    for filename in dict.fromkeys(secure_filename(f) for f in request.form.getlist('filenames')):
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        if upload_store.refcount(filename):
+            in_use.append(filename)
+        elif os.path.exists(filepath):
+            filepaths.append(filepath)
+    
+    remove_images(filepaths)
+    upload_store.remove_from_library(*(upload_store.url(os.path.basename(path)) for path in filepaths))
+    if filepaths:
+        flash(f'Deleted {len(filepaths)} image(s).', 'success')
+    if in_use:
+        flash(f"Still used by records and not deleted: {', '.join(in_use)}", 'error')
+    if not filepaths and not in_use:
+        flash('No images selected.', 'error')
+    return redirect(url_for('admin.images'))
+
+@login_required
+def image_thumbnail(path):
+    filepath = safe_join(os.path.join('static', 'images'), path)
+    if filepath is None or not allowed_file(filepath):
+        abort(404)
+    try:
+        thumbnail = thumbnails.get(filepath)
+    except FileNotFoundError:
+        abort(404)
+    
+    # Thumbnail URLs carry the source's mtime, so a versioned one never changes
+    response = send_file(os.path.abspath(thumbnail), mimetype='image/webp',
+                         max_age=31536000 if 'v' in request.args else None)
+    response.cache_control.public = False
+    response.cache_control.private = True
+    return response
+
+@login_required
+def image_gc():
+    # GET reports what would be collected; POST deletes it
+    if request.method == 'POST':
+        report = collect_orphaned_images()
+        if report['deleted']:
+            flash(f"Deleted {len(report['deleted'])} unused image(s), reclaiming {report['reclaimed'] // 1024} KB.", 'success')
+        else:
+            flash('No unused images to delete.', 'error')
+        return redirect(url_for('admin.image_gc'))
+    
+    report = collect_orphaned_images(dry_run=True)
+    return render_template('admin/image_gc.html', report=report)
+
+# ===================================
+# Admin - Page-Specific Images
+# ===================================
+
+@login_required
+def home_images():
+    pagination = paginate_images('hero', request.args.get('page', 1, type=int))
+    return render_template('admin/page_images.html', 
+                         images=pagination['items'], 
+                         pagination=pagination,
+                         list_endpoint='admin.home_images',
+                         page_name='Home Page',
+                         page_folder='hero',
+                         upload_endpoint='admin.upload_home_image',
+                         edit_endpoint='admin.edit_home_image',
+                         delete_endpoint='admin.delete_home_image')
+
+@login_required
+def upload_home_image():
+    files, rejected = uploaded_images()
+    
+    if not files and not rejected:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.home_images'))
+    
+    if files:
+        # All files are written in parallel and the page's listing refreshed once
+        save_images(files, os.path.join('static', 'images', 'hero'), 'home')
+        flash(f"{len(files)} image{'s' if len(files) != 1 else ''} uploaded successfully!", 'success')
+    if rejected:
+        flash(f"Invalid file type: {', '.join(rejected)}", 'error')
+    
+    return redirect(url_for('admin.home_images'))
+
+@login_required
+def edit_home_image():
+    old_filename = request.form.get('old_filename')
+    
+    if 'new_image' not in request.files:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.home_images'))
+    
+    file = request.files['new_image']
+    
+    if file.filename == '':
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.home_images'))
+    
+    if file and allowed_file(file.filename):
+        hero_path = os.path.join('static', 'images', 'hero')
+        old_filepath = os.path.join(hero_path, secure_filename(old_filename))
+        
+        # Delete old file if it exists
+        if os.path.exists(old_filepath):
+            remove_image(old_filepath)
+        
+        # Save new file with same name or generate new name
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"home_{timestamp}_{filename}"
+        
+        os.makedirs(hero_path, exist_ok=True)
+        save_image(file, hero_path, filename)
+        
+        flash('Image replaced successfully!', 'success')
+    else:
+        flash('Invalid file type.', 'error')
+    
+    return redirect(url_for('admin.home_images'))
+
+@login_required
+def delete_home_image(filename):
+    filepath = os.path.join('static', 'images', 'hero', secure_filename(filename))
+    
+    if os.path.exists(filepath):
+        remove_image(filepath)
+        flash('Image deleted successfully!', 'success')
+    else:
+        flash('Image not found.', 'error')
+    
+    return redirect(url_for('admin.home_images'))
+
+@login_required
+def about_images():
+    pagination = paginate_images('about', request.args.get('page', 1, type=int))
+    return render_template('admin/page_images.html', 
+                         images=pagination['items'], 
+                         pagination=pagination,
+                         list_endpoint='admin.about_images',
+                         page_name='About Us Page',
+                         page_folder='about',
+                         upload_endpoint='admin.upload_about_image',
+                         edit_endpoint='admin.edit_about_image',
+                         delete_endpoint='admin.delete_about_image')
+
+@login_required
+def upload_about_image():
+    files, rejected = uploaded_images()
+    
+    if not files and not rejected:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.about_images'))
+    
+    if files:
+        # All files are written in parallel and the page's listing refreshed once
+        save_images(files, os.path.join('static', 'images', 'about'), 'about')
+        flash(f"{len(files)} image{'s' if len(files) != 1 else ''} uploaded successfully!", 'success')
+    if rejected:
+        flash(f"Invalid file type: {', '.join(rejected)}", 'error')
+    
+    return redirect(url_for('admin.about_images'))
+
+@login_required
+def edit_about_image():
+    old_filename = request.form.get('old_filename')
+    
+    if 'new_image' not in request.files:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.about_images'))
+    
+    file = request.files['new_image']
+    
+    if file.filename == '':
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.about_images'))
+    
+    if file and allowed_file(file.filename):
+        about_path = os.path.join('static', 'images', 'about')
+        old_filepath = os.path.join(about_path, secure_filename(old_filename))
+        
+        # Delete old file if it exists
+        if os.path.exists(old_filepath):
+            remove_image(old_filepath)
+        
+        # Save new file
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"about_{timestamp}_{filename}"
+        
+        os.makedirs(about_path, exist_ok=True)
+        save_image(file, about_path, filename)
+        
+        flash('Image replaced successfully!', 'success')
+    else:
+        flash('Invalid file type.', 'error')
+    
+    return redirect(url_for('admin.about_images'))
+
+@login_required
+def delete_about_image(filename):
+    filepath = os.path.join('static', 'images', 'about', secure_filename(filename))
+    
+    if os.path.exists(filepath):
+        remove_image(filepath)
+        flash('Image deleted successfully!', 'success')
+    else:
+        flash('Image not found.', 'error')
+    
+    return redirect(url_for('admin.about_images'))
+
+@login_required
+def programs_images():
+    pagination = paginate_images('programs', request.args.get('page', 1, type=int))
+    return render_template('admin/page_images.html', 
+                         images=pagination['items'], 
+                         pagination=pagination,
+                         list_endpoint='admin.programs_images',
+                         page_name='Our Programs Page',
+                         page_folder='programs',
+                         upload_endpoint='admin.upload_programs_image',
+                         edit_endpoint='admin.edit_programs_image',
+                         delete_endpoint='admin.delete_programs_image')
+
+@login_required
+def upload_programs_image():
+    files, rejected = uploaded_images()
+    
+    if not files and not rejected:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.programs_images'))
+    
+    if files:
+        # All files are written in parallel and the page's listing refreshed once
+        save_images(files, os.path.join('static', 'images', 'programs'), 'program')
+        flash(f"{len(files)} image{'s' if len(files) != 1 else ''} uploaded successfully!", 'success')
+    if rejected:
+        flash(f"Invalid file type: {', '.join(rejected)}", 'error')
+    
+    return redirect(url_for('admin.programs_images'))
+
+@login_required
+def edit_programs_image():
+    old_filename = request.form.get('old_filename')
+    
+    if 'new_image' not in request.files:
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.programs_images'))
+    
+    file = request.files['new_image']
+    
+    if file.filename == '':
+        flash('No file selected.', 'error')
+        return redirect(url_for('admin.programs_images'))
+    
+    if file and allowed_file(file.filename):
+        programs_path = os.path.join('static', 'images', 'programs')
+        old_filepath = os.path.join(programs_path, secure_filename(old_filename))
+        
+        # Delete old file if it exists
+        if os.path.exists(old_filepath):
+            remove_image(old_filepath)
+        
+        # Save new file
+        filename = secure_filename(file.filename)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        filename = f"program_{timestamp}_{filename}"
+        
+        os.makedirs(programs_path, exist_ok=True)
+        save_image(file, programs_path, filename)
+        
+        flash('Image replaced successfully!', 'success')
+    else:
+        flash('Invalid file type.', 'error')
+    
+    return redirect(url_for('admin.programs_images'))
+
+@login_required
+def delete_programs_image(filename):
+    filepath = os.path.join('static', 'images', 'programs', secure_filename(filename))
+    
+    if os.path.exists(filepath):
+        remove_image(filepath)
+        flash('Image deleted successfully!', 'success')
+    else:
+        flash('Image not found.', 'error')
+    
+    return redirect(url_for('admin.programs_images'))
+
+# ===================================
+# Admin - Program Images Management
+# ===================================
+
+@login_required
+def programs():
+    programs_data = store.all('programs')
+    return render_template('admin/programs.html', programs=programs_data)
+
+@login_required
+def edit_program_image(program_id):
+    program = store.get('programs', program_id)
+    
+    if not program:
+        flash('Program not found.', 'error')
+        return redirect(url_for('admin.programs'))
+    
+    if request.method == 'POST':
+        # Handle file upload
+        if 'image' in request.files:
+            file = request.files['image']
+            if file and file.filename != '' and allowed_file(file.filename):
+                old_image_url = program.get('image_url')
+                image_url = save_upload(file)
+                program = store.update('programs', program_id, {'image_url': image_url})
+                
+                if old_image_url and not upload_store.filename(old_image_url):
+                    # Delete old image file from the programs folder
+                    old_image_path = old_image_url.replace('/static/', 'static/')
+                    if os.path.exists(old_image_path):
+                        try:
+                            remove_image(old_image_path)
+                        except:
+                            pass  # Ignore if file can't be deleted
+                
+                flash(f'{program["name"]} image updated successfully!', 'success')
+                return redirect(url_for('admin.programs'))
+        else:
+            flash('No file selected.', 'error')
+    
+    return render_template('admin/program_form.html', program=program)
+
+# ===================================
+# Admin - Form Submissions
+# ===================================
+
+# Helper function to read the submission kind from the query string
+def submission_kind():
+    kind = request.args.get('kind', 'contact')
+    if kind not in SUBMISSION_FIELDS:
+        abort(404)
+    return kind
+
+@login_required
+def submissions():
+    kind = submission_kind()
+    pagination = paginate_submissions(kind, request.args.get('page', 1, type=int))
+    
+    return render_template('admin/submissions.html', kind=kind, fields=SUBMISSION_FIELDS[kind],
+                           submissions=pagination['items'], pagination=pagination, queue=submission_queue.stats())
+
+@login_required
+def export_submissions():
+    kind = submission_kind()
+    columns = ('created',) + SUBMISSION_FIELDS[kind]
+    records = submission_queue.sink.iter(kind)
+    
+    # Streamed row by row; cells a spreadsheet would run as a formula are quoted
+    def rows():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(columns)
+        for record in records:
+            writer.writerow(["'" + value if value[:1] in ('=', '+', '-', '@') else value
+                             for value in (str(record.get(column) or '') for column in columns)])
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+    
+    return current_app.response_class(rows(), mimetype='text/csv', headers={
+        'Content-Disposition': f'attachment; filename={kind}-submissions-{datetime.now():%Y%m%d}.csv'})
@@ -0,0 +1,65 @@
+import hashlib
+import os
+import re
+
+# "css/main.css" is served as "css/main.<hash>.css"
+FINGERPRINT_RE = re.compile(r'^(?P<stem>.+)\.(?P<hash>[0-9a-f]{10})(?P<ext>\.[^./]+)?$')
+
+# One year: the URL changes whenever the content does
+IMMUTABLE_MAX_AGE = 31536000
+
+
+class AssetManifest:
+    """Maps logical static paths to content-hashed ones.
+
+    Hashes are computed on first use and cached against the file's mtime
+    and size, so a file edited or replaced in place (e.g. a program image
+    re-uploaded under the same name) gets a new URL on its next use.
+    """
+
+    def __init__(self, static_folder):
+        self.static_folder = static_folder
+        self._hashes = {}
+
+    def _hash(self, filename):
+        filepath = os.path.join(self.static_folder, filename)
+        try:
+            stats = os.stat(filepath)
+        except (FileNotFoundError, NotADirectoryError):
+            return None
+        signature = (stats.st_mtime_ns, stats.st_size)
+
+        cached = self._hashes.get(filename)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha1()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(65536), b''):
+                digest.update(chunk)
+        file_hash = digest.hexdigest()[:10]
+        self._hashes[filename] = (signature, file_hash)
+        return file_hash
+
+    def fingerprint(self, filename):
+        """Return the content-hashed form of ``filename``."""
+        file_hash = self._hash(filename)
+        if file_hash is None:
+            return filename
+        stem, ext = os.path.splitext(filename)
+        return f'{stem}.{file_hash}{ext}'
+
+    def resolve(self, requested):
+        """Return ``(filename, is_current)`` for a requested static path.
+
+        ``is_current`` is true only when ``requested`` carries the hash of the
+        file's current content and may therefore be cached forever.
+        """
+        match = FINGERPRINT_RE.match(requested)
+        if match is None:
+            return requested, False
+        filename = match.group('stem') + (match.group('ext') or '')
+        file_hash = self._hash(filename)
+        if file_hash is None:
+            return requested, False
+        return filename, file_hash == match.group('hash')
@@ -0,0 +1,98 @@
+"""Cold-start benchmark.
+
+Starts a fresh interpreter per sample, as a serverless platform does for a
+cold instance, and times importing the app and its first responses: ``GET /``
+(public pages) and ``GET /admin/login`` (the first admin request, which loads
+the admin views). Results use the same ``micro`` layout as ``benchmarks.run``
+so two runs can be diffed with ``benchmarks.compare``.
+
+Usage::
+
+    python -m benchmarks.cold_start --samples 20 --output cold-before.json
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from benchmarks.run import git_commit, summarize
+from benchmarks.synthetic import REPO_ROOT, build_workspace
+
+# Run in each fresh interpreter; prints the timings as JSON
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo_root!r})
+from app import app
+timings = {{'import app': time.perf_counter() - start}}
+client = app.test_client()
+for path in ('/', '/admin/login'):
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    timings[f'first GET {{path}}'] = time.perf_counter() - start
+    assert status == 200, (path, status)
+print(json.dumps(timings))
+"""
+
+
+def sample(workspace, storage):
+    env = dict(os.environ, STORAGE_BACKEND=storage)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', CHILD.format(repo_root=REPO_ROOT)], cwd=workspace, env=env,
+                            capture_output=True, text=True, check=True)
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    timings['process total'] = time.perf_counter() - start
+    return timings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--samples', type=int, default=20, help='fresh processes to start (default 20)')
+    parser.add_argument('--announcements', type=int, default=1000, help='synthetic announcements (default 1000)')
+    parser.add_argument('--staff', type=int, default=100, help='synthetic staff members (default 100)')
+    parser.add_argument('--images', type=int, default=100, help='files per image folder (default 100)')
+    parser.add_argument('--storage', choices=('json', 'sqlite'), default='json', help='content storage backend')
+    parser.add_argument('--workspace', help='build the synthetic data here instead of a temp folder')
+    parser.add_argument('--output', default='benchmark-results.json', help='JSON results file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    workspace = args.workspace or tempfile.mkdtemp(prefix='mochwanaesi-cold-')
+    build_workspace(workspace, args.announcements, args.staff, args.images)
+    print(f'Workspace: {workspace}')
+
+    # The first run compiles bytecode; real cold starts ship with it
+    sample(workspace, args.storage)
+    samples = [sample(workspace, args.storage) for _ in range(args.samples)]
+
+    micro = {}
+    for name in samples[0]:
+        micro[name] = summarize([s[name] for s in samples])
+        print(f"{name:60} p50 {micro[name]['p50_ms']:8.2f}ms  p95 {micro[name]['p95_ms']:8.2f}ms")
+
+    results = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'workspace')},
+        },
+        'micro': micro,
+        'routes': {},
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Compare two benchmark result files.
+
+Usage::
+
+    python -m benchmarks.compare before.json after.json [--metric p95_ms]
+"""
+import argparse
+import json
+
+
+def load(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(before, after, metric):
+    rows = []
+    for section in ('micro', 'routes'):
+        for name, result in after.get(section, {}).items():
+            old = before.get(section, {}).get(name, {}).get(metric)
+            new = result.get(metric)
+            if old is None or new is None:
+                continue
+            change = (new - old) / old * 100 if old else 0.0
+            rows.append((section, name, old, new, change))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files.')
+    parser.add_argument('before')
+    parser.add_argument('after')
+    parser.add_argument('--metric', default='p50_ms', help='summary field to compare (default p50_ms)')
+    args = parser.parse_args(argv)
+
+    before, after = load(args.before), load(args.after)
+    print(f"before: {before['metadata'].get('git_commit')}  after: {after['metadata'].get('git_commit')}")
+    for section, name, old, new, change in compare(before, after, args.metric):
+        print(f'{section:6} {name:60} {old:10.3f} -> {new:10.3f}  {change:+7.1f}%')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,438 @@
+"""Load-test and micro-benchmark runner.
+
+Builds a synthetic workspace (see ``benchmarks.synthetic``), imports the app
+from inside it and drives every route in ``app.url_map`` through the WSGI
+test client, logged in as an admin, from a pool of worker threads. Results
+(p50/p95/p99 latency, throughput, micro-benchmark timings and run metadata)
+are written as JSON so two runs can be diffed with ``benchmarks.compare``.
+
+Usage::
+
+    python -m benchmarks.run --announcements 10000 --images 2000 --concurrency 8
+    python -m benchmarks.run --routes announcements --skip-micro --output before.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks.synthetic import REPO_ROOT, build_workspace, make_image_bytes
+
+# Routes that can't be replayed meaningfully from a benchmark
+SKIPPED_ENDPOINTS = {'static'}
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples, elapsed=None):
+    """Return latency percentiles in milliseconds for a list of durations."""
+    summary = {
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else None,
+        'p50_ms': percentile(samples, 50) * 1000 if samples else None,
+        'p95_ms': percentile(samples, 95) * 1000 if samples else None,
+        'p99_ms': percentile(samples, 99) * 1000 if samples else None,
+        'max_ms': max(samples) * 1000 if samples else None,
+    }
+    if elapsed is not None:
+        summary['elapsed_s'] = elapsed
+        summary['throughput_rps'] = len(samples) / elapsed if elapsed else None
+    return summary
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ===================================
+# Scenarios
+# ===================================
+
+class Target:
+    """The app under test and the services the benchmarks reach into."""
+
+    def __init__(self, app):
+        self.app = app
+        services = app.extensions['services']
+        self.store = services.store
+        self.image_index = services.image_index
+        self.page_cache = services.page_cache
+        self.search_index = services.search_index
+        self.asset_manifest = services.asset_manifest
+
+    def get_page_images(self, folder):
+        from helpers import get_page_images
+        with self.app.app_context():
+            return get_page_images(folder)
+
+
+class Scenarios:
+    """Builds the request for the i-th call to each route.
+
+    GET routes are filled in from sample ids; POST routes that change data
+    have an explicit entry below. Deletes consume ids and filenames from
+    pools so every call removes something that still exists; the ids read
+    and edited are kept out of those pools. Once a pool runs dry, deletes
+    ask for a record that is missing.
+    """
+
+    def __init__(self, m):
+        self.m = m
+        self._lock = threading.Lock()
+        self.announcement_ids = [a['id'] for a in m.store.all('announcements')]
+        self.staff_ids = [s['id'] for s in m.store.all('staff')]
+        self.program_ids = [p['id'] for p in m.store.all('programs')]
+        self.deletable = {'announcements': self._deletable(self.announcement_ids),
+                          'staff': self._deletable(self.staff_ids)}
+        self.files = {folder: [e['filename'] for e in m.image_index.list(folder)]
+                      for folder in ('uploads', 'hero', 'about', 'programs')}
+        self._counter = 0
+
+    @staticmethod
+    def _deletable(ids):
+        # Everything but the first id (edited) and the middle one (read)
+        kept = {ids[0], ids[len(ids) // 2]} if ids else set()
+        return [record_id for record_id in ids if record_id not in kept]
+
+    def _next(self):
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    def _pop(self, pool):
+        with self._lock:
+            return pool.pop() if pool else 'missing'
+
+    def _image(self):
+        # Fresh bytes and names each call: content-addressed uploads would be
+        # deduplicated, and page images are named by upload time and filename
+        n = self._next()
+        return io.BytesIO(make_image_bytes(n)), f'benchmark-{n}.jpg'
+
+    def sample_args(self, rule):
+        samples = {
+            'announcement_id': self.announcement_ids[len(self.announcement_ids) // 2],
+            'staff_id': self.staff_ids[len(self.staff_ids) // 2],
+            'program_id': self.program_ids[0],
+            'filename': 'missing.jpg',
+            # Pools are popped from the end, so the first upload outlives the delete routes
+            'path': f"uploads/{self.files['uploads'][0]}" if self.files['uploads'] else 'uploads/missing.jpg',
+        }
+        return {arg: samples[arg] for arg in rule.arguments if arg in samples}
+
+    def announcement_form(self):
+        return {'title': f'Benchmark {self._next()}', 'excerpt': 'Benchmark announcement',
+                'category': 'News', 'image_url': '/static/images/announcements/default.jpg'}
+
+    def staff_form(self):
+        return {'name': f'Benchmark {self._next()}', 'title': 'Mentor', 'bio': 'Benchmark staff member',
+                'role': 'program_staff', 'department': 'Mentorship'}
+
+    def import_file(self, name, rows=20):
+        form = self.announcement_form if name == 'announcements' else self.staff_form
+        records = [form() for _ in range(rows)]
+        return io.BytesIO(json.dumps(records).encode('utf-8')), f'benchmark-{self._next()}.json'
+
+    def post(self, endpoint):
+        """Return ``(url_values, data)`` for a POST to ``endpoint``, or None."""
+        page_folders = {'home': 'hero', 'about': 'about', 'programs': 'programs'}
+        if endpoint == 'admin.login':
+            return {}, {'username': 'benchmark@example.org', 'password': 'benchmark'}
+        if endpoint == 'public.contact_submit':
+            return {}, {'name': 'Benchmark Visitor', 'email': 'visitor@example.org', 'phone': '082 123 4567',
+                        'subject': 'Benchmark', 'message': f'Benchmark message {self._next()}'}
+        if endpoint == 'public.newsletter_submit':
+            return {}, {'email': f'benchmark{self._next()}@example.org'}
+        if endpoint in ('admin.add_announcement', 'admin.edit_announcement'):
+            values = {} if endpoint.startswith('admin.add') else {'announcement_id': self.announcement_ids[0]}
+            return values, self.announcement_form()
+        if endpoint in ('admin.add_staff', 'admin.edit_staff'):
+            values = {} if endpoint.startswith('admin.add') else {'staff_id': self.staff_ids[0]}
+            return values, self.staff_form()
+        if endpoint == 'admin.delete_announcement':
+            return {'announcement_id': self._pop(self.deletable['announcements'])}, {}
+        if endpoint == 'admin.delete_staff':
+            return {'staff_id': self._pop(self.deletable['staff'])}, {}
+        if endpoint == 'admin.edit_program_image':
+            return {'program_id': self.program_ids[0]}, {'image': self._image()}
+        if endpoint == 'admin.upload_image':
+            return {}, {'image': self._image()}
+        if endpoint == 'admin.delete_image':
+            return {'filename': self._pop(self.files['uploads'])}, {}
+        if endpoint in ('admin.import_announcements', 'admin.import_staff'):
+            return {}, {'file': self.import_file(endpoint.rsplit('_', 1)[1])}
+        if endpoint == 'admin.bulk_delete_announcements':
+            return {}, {'ids': [str(self._pop(self.deletable['announcements'])) for _ in range(5)]}
+        if endpoint == 'admin.bulk_delete_staff':
+            return {}, {'ids': [str(self._pop(self.deletable['staff'])) for _ in range(5)]}
+        if endpoint == 'admin.bulk_delete_images':
+            return {}, {'filenames': [self._pop(self.files['uploads']) for _ in range(5)]}
+        for page, folder in page_folders.items():
+            if endpoint == f'admin.upload_{page}_image':
+                return {}, {'image': self._image()}
+            if endpoint == f'admin.edit_{page}_image':
+                return {}, {'old_filename': self._pop(self.files[folder]), 'new_image': self._image()}
+            if endpoint == f'admin.delete_{page}_image':
+                return {'filename': self._pop(self.files[folder])}, {}
+        return None
+
+
+# ===================================
+# Route load test
+# ===================================
+
+def make_client(m):
+    client = m.app.test_client()
+    with client.session_transaction() as session:
+        session['admin_logged_in'] = True
+        session['admin_username'] = 'benchmark'
+    return client
+
+
+def build_plan(m, scenarios, route_filter=None):
+    """Return ``(plan, skipped)`` where plan is a list of (name, method, endpoint, rule)."""
+    plan, skipped = [], []
+    for rule in sorted(m.app.url_map.iter_rules(), key=lambda r: r.rule):
+        if rule.endpoint in SKIPPED_ENDPOINTS:
+            continue
+        for method in ('GET', 'POST'):
+            if method not in rule.methods:
+                continue
+            name = f'{method} {rule.rule}'
+            if route_filter and not any(f in name for f in route_filter):
+                continue
+            if method == 'POST' and scenarios.post(rule.endpoint) is None:
+                skipped.append(name)
+                continue
+            plan.append((name, method, rule.endpoint, rule))
+    return plan, skipped
+
+
+def request_once(m, client, scenarios, method, endpoint, rule):
+    if method == 'GET':
+        values, data = scenarios.sample_args(rule), None
+        if endpoint in ('public.announcements', 'public.announcements_json'):
+            values = {'category': 'News', 'page': 2}
+        if endpoint in ('public.search', 'public.search_json'):
+            values = {'q': 'mentorship success', 'page': 2}
+    else:
+        values, data = scenarios.post(endpoint)
+
+    with m.app.test_request_context():
+        from flask import url_for
+        url = url_for(endpoint, **values)
+
+    start = time.perf_counter()
+    if method == 'GET':
+        response = client.get(url)
+    else:
+        response = client.post(url, data=data, content_type='multipart/form-data')
+    duration = time.perf_counter() - start
+    status = response.status_code
+    response.close()
+
+    if endpoint == 'admin.logout':
+        # Logging out drops the session; log the worker back in
+        with client.session_transaction() as session:
+            session['admin_logged_in'] = True
+            session['admin_username'] = 'benchmark'
+    return duration, status
+
+
+def run_route(m, scenarios, clients, method, endpoint, rule, requests, warmup):
+    for _ in range(warmup):
+        request_once(m, clients[0], scenarios, method, endpoint, rule)
+
+    local = threading.local()
+    statuses = {}
+    status_lock = threading.Lock()
+    client_iter = iter(clients)
+    client_lock = threading.Lock()
+
+    def worker(_):
+        if not hasattr(local, 'client'):
+            with client_lock:
+                local.client = next(client_iter)
+        duration, status = request_once(m, local.client, scenarios, method, endpoint, rule)
+        with status_lock:
+            statuses[status] = statuses.get(status, 0) + 1
+        return duration
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(clients)) as pool:
+        samples = list(pool.map(worker, range(requests)))
+    elapsed = time.perf_counter() - start
+
+    result = summarize(samples, elapsed)
+    result['statuses'] = {str(k): v for k, v in sorted(statuses.items())}
+    return result
+
+
+def run_routes(m, args):
+    scenarios = Scenarios(m)
+    plan, skipped = build_plan(m, scenarios, args.routes)
+    results = {}
+    for name, method, endpoint, rule in plan:
+        # One client per worker thread; the test client isn't thread-safe
+        clients = [make_client(m) for _ in range(args.concurrency)]
+        if args.cold_pages:
+            m.page_cache.invalidate()
+        results[name] = run_route(m, scenarios, clients, method, endpoint, rule, args.requests, args.warmup)
+        print(f"{name:60} p50 {results[name]['p50_ms']:8.2f}ms  p95 {results[name]['p95_ms']:8.2f}ms  "
+              f"p99 {results[name]['p99_ms']:8.2f}ms  {results[name]['throughput_rps']:8.1f} req/s")
+    for name in skipped:
+        print(f'{name:60} skipped (no scenario)')
+    return results, skipped
+
+
+# ===================================
+# Micro-benchmarks
+# ===================================
+
+def time_calls(fn, iterations, setup=None):
+    samples = []
+    for _ in range(iterations):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def run_micro(m, args):
+    store = m.store
+    n = args.micro_iterations
+    results = {}
+
+    def add(name, fn, setup=None, iterations=n):
+        results[name] = time_calls(fn, iterations, setup)
+        print(f"{name:60} p50 {results[name]['p50_ms']:8.3f}ms  p95 {results[name]['p95_ms']:8.3f}ms")
+
+    for name in ('announcements', 'staff'):
+        records = store.all(name)
+        record_id = records[0]['id']
+        # load_json_data: a warm read is served from the in-memory collection,
+        # a cold one re-parses the snapshot and journal from disk
+        add(f'load {name} (warm)', lambda name=name: store.all(name))
+        add(f'load {name} (cold)', lambda name=name: store.all(name),
+            setup=lambda name=name: store.invalidate(name))
+        # save_json_data: a single-record change appends to the journal; a full
+        # save rewrites the snapshot
+        add(f'update {name} record', lambda name=name, rid=record_id: store.update(name, rid, {'benchmark': time.time()}))
+        add(f'save {name} (full rewrite)', lambda name=name, records=records: store.save(name, records),
+            iterations=max(1, n // 10))
+
+    for folder in ('uploads', 'hero'):
+        add(f'get_page_images {folder} (warm)', lambda folder=folder: m.get_page_images(folder))
+        add(f'get_page_images {folder} (cold)', lambda folder=folder: m.get_page_images(folder),
+            setup=lambda folder=folder: m.image_index.invalidate(folder))
+
+    # Full-text search: 'cold' drops the memoized results, not the index
+    for query in ('mentorship', 'mentorship success workshop'):
+        add(f'search "{query}" (warm)', lambda query=query: m.search_index.search(query))
+        add(f'search "{query}" (cold)', lambda query=query: m.search_index.search(query),
+            setup=m.search_index.invalidate)
+
+    # Template rendering, bypassing the page cache via the undecorated views
+    for endpoint, path in (('index', '/'), ('about', '/about'), ('programs', '/programs'), ('staff', '/staff'),
+                           ('announcements', '/announcements?category=News'), ('contact', '/contact')):
+        view = m.app.view_functions[f'public.{endpoint}'].__wrapped__
+
+        def render(view=view, path=path):
+            with m.app.test_request_context(path):
+                view()
+        add(f'render {endpoint}', render)
+
+    return results
+
+
+# ===================================
+# Entry point
+# ===================================
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--announcements', type=int, default=10000, help='synthetic announcements (default 10000)')
+    parser.add_argument('--staff', type=int, default=1000, help='synthetic staff members (default 1000)')
+    parser.add_argument('--images', type=int, default=2000, help='files per image folder (default 2000)')
+    parser.add_argument('--hero-images', type=int, default=8, help='hero slideshow images (default 8)')
+    parser.add_argument('--concurrency', type=int, default=4, help='worker threads (default 4)')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route (default 200)')
+    parser.add_argument('--warmup', type=int, default=5, help='untimed requests per route (default 5)')
+    parser.add_argument('--micro-iterations', type=int, default=50, help='iterations per micro-benchmark')
+    parser.add_argument('--routes', nargs='*', help='only run routes whose "METHOD /rule" contains one of these')
+    parser.add_argument('--cold-pages', action='store_true', help='clear the page cache before each route')
+    parser.add_argument('--storage', choices=('json', 'sqlite'), default='json', help='content storage backend')
+    parser.add_argument('--skip-routes', action='store_true', help='skip the route load test')
+    parser.add_argument('--skip-micro', action='store_true', help='skip the micro-benchmarks')
+    parser.add_argument('--workspace', help='build the synthetic data here instead of a temp folder')
+    parser.add_argument('--output', default='benchmark-results.json', help='JSON results file')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output)
+    workspace = args.workspace or tempfile.mkdtemp(prefix='mochwanaesi-bench-')
+    build_workspace(workspace, args.announcements, args.staff, args.images, args.hero_images)
+    print(f'Workspace: {workspace}')
+
+    # The app resolves data/ and static/ relative to the working directory
+    os.environ['STORAGE_BACKEND'] = args.storage
+    os.chdir(workspace)
+    sys.path.insert(0, REPO_ROOT)
+    from app import app
+    app.static_folder = os.path.join(workspace, 'static')
+    m = Target(app)
+    m.asset_manifest.static_folder = app.static_folder
+    if args.storage == 'sqlite':
+        from content_store import ContentStore
+        json_store = ContentStore(m.app.config['DATA_FOLDER'])
+        for name in json_store.collections:
+            m.store.save(name, json_store.all(name))
+
+    results = {
+        'metadata': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'parameters': {k: v for k, v in vars(args).items() if k not in ('output', 'workspace')},
+        },
+        'micro': {},
+        'routes': {},
+        'skipped_routes': [],
+    }
+
+    if not args.skip_micro:
+        results['micro'] = run_micro(m, args)
+    if not args.skip_routes:
+        results['routes'], results['skipped_routes'] = run_routes(m, args)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f'Results written to {output}')
+
+
+if __name__ == '__main__':
+    main()
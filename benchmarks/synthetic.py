@@ -0,0 +1,95 @@
+"""Synthetic content generators for the benchmark suite.
+
+``build_workspace`` lays out a throwaway copy of the app's runtime folders
+(``data/`` and ``static/images/``) with announcements, staff and image
+folders scaled to the requested sizes. The real ``data/`` folder is never
+touched.
+"""
+import io
+import json
+import os
+import random
+import shutil
+from datetime import datetime, timedelta
+
+from PIL import Image
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CATEGORIES = ('Programs', 'Events', 'News', 'Success Stories', 'Volunteers')
+DEPARTMENTS = ('Mentorship', 'Academic Support', 'Career Guidance', 'Operations')
+WORDS = ('students', 'mentorship', 'education', 'community', 'career', 'leaders', 'future',
+         'support', 'scholarship', 'workshop', 'volunteers', 'success', 'learners', 'growth')
+
+
+def _sentence(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def make_announcements(count, rng):
+    start = datetime(2020, 1, 1)
+    announcements = []
+    for i in range(count, 0, -1):
+        announcements.append({
+            'id': i,
+            'title': _sentence(rng, 6),
+            'excerpt': ' '.join(_sentence(rng, 12) for _ in range(3)) + ' 🎓🚀',
+            'category': rng.choice(CATEGORIES),
+            'date': (start + timedelta(hours=i)).isoformat(),
+            'image_url': '/static/images/announcements/default.jpg',
+            'featured': rng.random() < 0.05
+        })
+    return announcements
+
+
+def make_staff(count, rng):
+    staff = []
+    for i in range(1, count + 1):
+        role = 'leadership' if rng.random() < 0.2 else 'program_staff'
+        staff.append({
+            'id': i,
+            'name': f'Staff Member {i}',
+            'title': _sentence(rng, 3),
+            'bio': ' '.join(_sentence(rng, 15) for _ in range(2)),
+            'role': role,
+            'department': rng.choice(DEPARTMENTS) if role == 'program_staff' else None,
+            'email': f'staff{i}@example.org',
+            'linkedin_url': '',
+            'image_url': '/static/images/staff/default.jpg'
+        })
+    return staff
+
+
+def make_image_bytes(seed=0, size=(64, 48), fmt='JPEG'):
+    colour = (seed * 37 % 256, seed * 91 % 256, seed * 53 % 256)
+    buffer = io.BytesIO()
+    Image.new('RGB', size, colour).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+def make_images(folder, count, prefix):
+    os.makedirs(folder, exist_ok=True)
+    data = make_image_bytes()
+    for i in range(count):
+        with open(os.path.join(folder, f'{prefix}_{i:05d}.jpg'), 'wb') as f:
+            f.write(data)
+
+
+def build_workspace(root, announcements=10000, staff=1000, images=2000, hero_images=8, seed=1):
+    """Create a benchmark workspace under ``root`` and return its path."""
+    rng = random.Random(seed)
+    data_folder = os.path.join(root, 'data')
+    images_folder = os.path.join(root, 'static', 'images')
+    os.makedirs(data_folder, exist_ok=True)
+
+    shutil.copy(os.path.join(REPO_ROOT, 'data', 'programs.json'), data_folder)
+    for name, records in (('announcements', make_announcements(announcements, rng)),
+                          ('staff', make_staff(staff, rng))):
+        with open(os.path.join(data_folder, f'{name}.json'), 'w', encoding='utf-8') as f:
+            json.dump(records, f, indent=2, ensure_ascii=False)
+
+    make_images(os.path.join(images_folder, 'uploads'), images, 'upload')
+    make_images(os.path.join(images_folder, 'programs'), images, 'program')
+    make_images(os.path.join(images_folder, 'about'), images, 'about')
+    make_images(os.path.join(images_folder, 'hero'), hero_images, 'home')
+    return root
@@ -0,0 +1,183 @@
+import gzip
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional: .br variants are skipped without it
+    brotli = None
+
+# Built bundle -> source files under static/, concatenated in this order
+BUNDLES = {
+    'css/site.css': ['css/main.css', 'css/components.css', 'css/slideshow.css', 'css/responsive.css'],
+    'css/admin.css': ['css/main.css', 'css/admin.css'],
+    'js/site.js': ['js/icons.js', 'js/toast.js', 'js/navigation.js', 'js/images.js'],
+    'js/index.js': ['js/slideshow.js'],
+    'js/announcements.js': ['js/announcements.js', 'js/forms.js'],
+    'js/contact.js': ['js/forms.js'],
+    'js/admin.js': ['js/icons.js'],
+}
+
+# Subfolder of static/ the build writes to
+OUTPUT_FOLDER = 'dist'
+
+# Content-Encoding -> file suffix, in order of preference
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+_ICON_ATTRIBUTE_RE = re.compile(r'data-lucide="([^"]*)"')
+_ICON_KEYWORD_RE = re.compile(r'''\bicon\s*[=:]\s*['"]([a-z0-9-]+)['"]''')
+_JS_STRING_RE = re.compile(r'''['"]([a-z0-9-]+)['"]''')
+_TOKEN_RE = re.compile(r'[a-z0-9]+(?:-[a-z0-9]+)*')
+_SVG_RE = re.compile(r'<svg\b[^>]*>(?P<body>.*)</svg>', re.S)
+
+
+# ===================================
+# Minification
+# ===================================
+
+def _segments(text, quotes, line_comments):
+    """Split source into ``(is_string, text)`` segments with comments removed."""
+    code, i, n = [], 0, len(text)
+    while i < n:
+        c = text[i]
+        if c in quotes:
+            j = i + 1
+            while j < n and text[j] != c:
+                j += 2 if text[j] == '\\' else 1
+            if code:
+                yield False, ''.join(code)
+                code = []
+            yield True, text[i:j + 1]
+            i = j + 1
+        elif text.startswith('/*', i):
+            end = text.find('*/', i + 2)
+            i = n if end < 0 else end + 2
+            code.append(' ')
+        elif line_comments and text.startswith('//', i):
+            end = text.find('\n', i)
+            i = n if end < 0 else end
+        else:
+            code.append(c)
+            i += 1
+    if code:
+        yield False, ''.join(code)
+
+
+def minify_css(text):
+    """Strip comments and whitespace that CSS doesn't need; strings are kept verbatim."""
+    out = []
+    for is_string, segment in _segments(text, '"\'', line_comments=False):
+        if not is_string:
+            segment = re.sub(r'\s+', ' ', segment)
+            segment = re.sub(r'\s*([{};,>])\s*', r'\1', segment)
+            segment = re.sub(r':\s+', ':', segment)
+            segment = segment.replace(';}', '}')
+        out.append(segment)
+    return ''.join(out).strip()
+
+
+def minify_js(text):
+    """Strip comments, indentation and blank lines.
+
+    Line breaks are kept so automatic semicolon insertion behaves exactly as
+    in the source; this is deliberately conservative rather than a full
+    JavaScript minifier.
+    """
+    out = []
+    for is_string, segment in _segments(text.replace('\r\n', '\n'), '"\'`', line_comments=True):
+        if not is_string:
+            segment = re.sub(r'[ \t]*\n\s*', '\n', segment)
+        out.append(segment)
+    return ''.join(out).strip()
+
+
+# ===================================
+# Build
+# ===================================
+
+def output_name(bundle):
+    """Return the path under static/ that ``bundle`` is built to."""
+    stem, ext = os.path.splitext(bundle)
+    return f'{OUTPUT_FOLDER}/{stem}.min{ext}'
+
+
+def write_precompressed(filepath, data):
+    """Write ``data`` to ``filepath`` along with its .gz and (if available) .br variants."""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    variants = {'': data, '.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(data, quality=11)
+    for suffix, content in variants.items():
+        with open(filepath + suffix, 'wb') as f:
+            f.write(content)
+    return {suffix or 'raw': len(content) for suffix, content in variants.items()}
+
+
+def build_bundle(static_folder, bundle, sources):
+    """Concatenate, minify and precompress one bundle; returns ``(path, sizes)``."""
+    minify = minify_css if bundle.endswith('.css') else minify_js
+    parts = []
+    for source in sources:
+        with open(os.path.join(static_folder, source), 'r', encoding='utf-8') as f:
+            parts.append(minify(f.read()))
+    separator = '\n' if bundle.endswith('.css') else ';\n'
+    path = output_name(bundle)
+    sizes = write_precompressed(os.path.join(static_folder, path), (separator.join(parts) + '\n').encode('utf-8'))
+    return path, sizes
+
+
+def is_stale(static_folder, bundle, sources):
+    """True if the built bundle is missing or older than any of its sources."""
+    try:
+        built = os.stat(os.path.join(static_folder, output_name(bundle))).st_mtime_ns
+    except FileNotFoundError:
+        return True
+    return any(os.stat(os.path.join(static_folder, s)).st_mtime_ns > built for s in sources)
+
+
+# ===================================
+# Icon sprite
+# ===================================
+
+def collect_icon_names(template_folder, script_folder, available, extra=()):
+    """Return the Lucide icon names the templates and scripts can ask for.
+
+    Literal ``data-lucide`` values are found directly; names chosen at render
+    time (``{% if %}check-circle{% else %}info{% endif %}``, toast types in
+    JavaScript, ``icon`` fields in the data passed as ``extra``) are found by
+    keeping only the tokens that are real icon names.
+    """
+    names = set(extra)
+    for folder, extensions in ((template_folder, ('.html',)), (script_folder, ('.js',))):
+        for root, _, files in os.walk(folder):
+            for filename in files:
+                if not filename.endswith(extensions):
+                    continue
+                with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
+                    text = f.read()
+                for value in _ICON_ATTRIBUTE_RE.findall(text):
+                    names.update(_TOKEN_RE.findall(value))
+                names.update(_ICON_KEYWORD_RE.findall(text))
+                if filename.endswith('.js'):
+                    names.update(_JS_STRING_RE.findall(text))
+    return sorted(names & set(available))
+
+
+def available_icons(icons_folder):
+    return {name[:-4] for name in os.listdir(icons_folder) if name.endswith('.svg')}
+
+
+def build_sprite(static_folder, icons_folder, names):
+    """Write ``dist/icons.svg`` with one ``<symbol id="name">`` per icon."""
+    symbols = []
+    for name in names:
+        with open(os.path.join(icons_folder, f'{name}.svg'), 'r', encoding='utf-8') as f:
+            match = _SVG_RE.search(re.sub(r'<!--.*?-->', '', f.read(), flags=re.S))
+        body = re.sub(r'\s*\n\s*', '', match.group('body'))
+        symbols.append(f'<symbol id="{name}" viewBox="0 0 24 24">{body}</symbol>')
+
+    sprite = ('<!-- Lucide icons (https://lucide.dev), ISC License -->\n'
+              '<svg xmlns="http://www.w3.org/2000/svg">' + ''.join(symbols) + '</svg>\n')
+    path = f'{OUTPUT_FOLDER}/icons.svg'
+    sizes = write_precompressed(os.path.join(static_folder, path), sprite.encode('utf-8'))
+    return path, sizes
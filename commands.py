@@ -0,0 +1,151 @@
+import os
+
+import click
+from flask import current_app
+
+import bundles
+from content_store import ContentStore
+from helpers import allowed_file, collect_orphaned_images
+from services import exporter, image_metadata, image_pipeline, store
+
+
+def _record_image_metadata(force=False):
+    """Compute missing (or, with ``force``, all) image metadata in one write; returns how many were recorded."""
+    images_folder = os.path.join('static', 'images')
+    changes = {}
+    for folder in ('uploads', 'hero', 'about', 'programs', 'announcements', 'staff'):
+        folder_path = os.path.join(images_folder, folder)
+        if not os.path.isdir(folder_path):
+            continue
+        for filename in sorted(os.listdir(folder_path)):
+            filepath = os.path.join(folder_path, filename)
+            if not allowed_file(filename) or (not force and image_metadata.is_current(filepath)):
+                continue
+            try:
+                changes[image_metadata.url(filepath)] = image_metadata.compute(filepath)
+            except OSError as e:
+                print(f'Skipped {folder}/{filename}: {e}')
+    if changes:
+        image_metadata.update(changes)
+    return len(changes)
+
+
+def register_commands(app):
+    """Add the maintenance commands to ``flask``; each runs inside an app context."""
+
+    @app.cli.command('compact-data')
+    def compact_data():
+        """Fold the data/*.journal change logs back into the JSON snapshots."""
+        for name in store.collections:
+            store.compact(name)
+            print(f'Compacted {name}')
+
+    @app.cli.command('migrate-to-sqlite')
+    def migrate_to_sqlite():
+        """Import the data/*.json collections into the SQLite database."""
+        from sqlite_store import SqliteContentStore
+        
+        json_store = ContentStore(current_app.config['DATA_FOLDER'])
+        sqlite_store = SqliteContentStore(current_app.config['SQLITE_DATABASE'])
+        
+        for name in json_store.collections:
+            records = json_store.all(name)
+            sqlite_store.save(name, records)
+        
+            # Carry the id sequence over so deleted ids are never reused
+            ids = [r['id'] for r in records if isinstance(r.get('id'), int)]
+            sqlite_store.seed_sequence(name, max([json_store.storage.last_id(name)] + ids))
+            print(f'Imported {len(records)} {name} record(s)')
+        
+        print(f"Done. Set STORAGE_BACKEND=sqlite to serve from {current_app.config['SQLITE_DATABASE']}")
+
+    @app.cli.command('build-image-variants')
+    def build_image_variants():
+        """Generate resized variants for every image already on disk."""
+        images_folder = os.path.join('static', 'images')
+        for folder in ('uploads', 'hero', 'about', 'programs', 'announcements', 'staff'):
+            folder_path = os.path.join(images_folder, folder)
+            if not os.path.isdir(folder_path):
+                continue
+            for filename in sorted(os.listdir(folder_path)):
+                if not allowed_file(filename):
+                    continue
+                try:
+                    image_pipeline.process(os.path.join(folder_path, filename))
+                    print(f'Processed {folder}/{filename}')
+                except OSError as e:
+                    print(f'Skipped {folder}/{filename}: {e}')
+
+    @app.cli.command('build-image-metadata')
+    @click.option('--force', is_flag=True, help='Recompute entries that are still current.')
+    def build_image_metadata(force):
+        """Record dimensions, placeholders and colours for every image on disk."""
+        print(f'Recorded metadata for {_record_image_metadata(force)} image(s)')
+
+    @app.cli.command('gc-images')
+    @click.option('--dry-run', is_flag=True, help='Only report what would be deleted.')
+    @click.option('--grace-days', type=float, default=None,
+                  help='Keep unused images younger than this (default: IMAGE_GC_GRACE_PERIOD).')
+    def gc_images(dry_run, grace_days):
+        """Delete record images that no record uses any more."""
+        report = collect_orphaned_images(dry_run, None if grace_days is None else grace_days * 86400)
+        for orphan in report['collectable']:
+            print(f"{'Would delete' if dry_run else 'Deleted'} {orphan['url']} ({orphan['reclaimable']} bytes)")
+        if report['recent']:
+            print(f"Kept {len(report['recent'])} unused image(s) still within the grace period")
+        if dry_run:
+            print(f"{len(report['collectable'])} image(s), {report['reclaimable']} bytes reclaimable")
+        else:
+            print(f"Deleted {len(report['deleted'])} image(s), reclaimed {report['reclaimed']} bytes")
+
+    @app.cli.command('build-assets')
+    def build_assets():
+        """Bundle, minify and precompress CSS/JS and build the icon sprite."""
+        for bundle, sources in bundles.BUNDLES.items():
+            path, sizes = bundles.build_bundle(current_app.static_folder, bundle, sources)
+            print(f'Built {path}: ' + ', '.join(f'{k} {v} bytes' for k, v in sizes.items()))
+        
+        icons_folder = current_app.config['LUCIDE_ICONS_FOLDER']
+        if not os.path.isdir(icons_folder):
+            print(f"Skipped icon sprite: {icons_folder} not found (run 'npm install' first)")
+        else:
+            available = bundles.available_icons(icons_folder)
+            data_icons = [r['icon'] for name in store.collections for r in store.all(name) if r.get('icon')]
+            names = bundles.collect_icon_names(os.path.join(current_app.root_path, current_app.template_folder),
+                                               current_app.static_folder, available, data_icons)
+            missing = sorted(set(data_icons) - available)
+            if missing:
+                print(f"Unknown icon(s) in data: {', '.join(missing)}")
+            path, sizes = bundles.build_sprite(current_app.static_folder, icons_folder, names)
+            print(f'Built {path} with {len(names)} icons: ' + ', '.join(f'{k} {v} bytes' for k, v in sizes.items()))
+        
+        if bundles.brotli is None:
+            print('Brotli is not installed; only .gz variants were written')
+
+    @app.cli.command('export')
+    @click.option('--force', is_flag=True, help='Re-render every page, even unchanged ones.')
+    @click.option('--dependencies', is_flag=True, help='Only print which pages each collection and image folder affects.')
+    def export(force, dependencies):
+        """Pre-render the public pages to static HTML in EXPORT_FOLDER."""
+        if dependencies:
+            for dependency, paths in sorted(exporter.dependency_map().items()):
+                print(f"{dependency}: {', '.join(paths)}")
+            return
+        
+        # Computed up front: pages rendered while it is still queued in the
+        # background would be exported without dimensions and placeholders
+        recorded = _record_image_metadata()
+        if recorded:
+            print(f'Recorded metadata for {recorded} image(s)')
+        
+        try:
+            rendered, unchanged = exporter.export(force=force)
+        finally:
+            # Let re-renders queued meanwhile finish before the process exits
+            exporter.close()
+        for path in rendered:
+            print(f'Rendered {path}')
+        print(f"{len(rendered)} page(s) rendered, {len(unchanged)} unchanged in {current_app.config['EXPORT_FOLDER']}")
+        if not current_app.config['EXPORT_SERVE']:
+            print('Set EXPORT_SERVE=1 to answer these pages from the export')
+        
\ No newline at end of file
@@ -0,0 +1,170 @@
+import gzip
+import re
+import threading
+import time
+from collections import OrderedDict
+from itertools import chain
+
+from werkzeug.datastructures import Headers
+from werkzeug.http import parse_accept_header
+from werkzeug.wsgi import ClosingIterator
+
+try:
+    import brotli
+except ImportError:  # optional: responses fall back to gzip without it
+    brotli = None
+
+# Content types worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = (
+    'text/html', 'text/css', 'text/plain', 'text/xml', 'text/javascript',
+    'application/javascript', 'application/json', 'application/xml', 'image/svg+xml',
+)
+
+_ETAG_SUFFIX_RE = re.compile(r'-(?:br|gzip)"')
+
+
+def _suffix_etag(etag, encoding):
+    # A compressed body is a different representation, so it gets its own ETag
+    return etag[:-1] + f'-{encoding}"' if etag.endswith('"') else etag
+
+
+class CompressionMiddleware:
+    """WSGI middleware that gzip/brotli-compresses text responses.
+
+    Only complete 200 responses of a compressible type and at least
+    ``min_size`` bytes are compressed, and never ones that already carry a
+    ``Content-Encoding`` (e.g. precompressed static files). Compressed
+    bodies of responses with an ETag, such as pages served from the page
+    cache or static files, are kept in a bounded LRU keyed by ETag and
+    encoding, so a cached page is compressed once rather than on every hit.
+
+    The compressed representation's ETag gets an ``-gzip``/``-br`` suffix;
+    the suffix is stripped from ``If-None-Match`` before the app sees it so
+    conditional requests still end in a 304.
+    """
+
+    def __init__(self, app, min_size=500, level=6, brotli_quality=5, cache_size=256):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+        self.brotli_quality = brotli_quality
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def negotiate(self, accept_encoding):
+        """Return the encoding to use for an Accept-Encoding header, or None."""
+        accepted = parse_accept_header(accept_encoding or '')
+        for encoding in (('br', 'gzip') if brotli is not None else ('gzip',)):
+            if accepted[encoding]:
+                return encoding
+        return None
+
+    def compress(self, body, encoding):
+        if encoding == 'br':
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.level)
+
+    def _compressed(self, body, encoding, etag):
+        if not etag or etag.startswith('W/'):
+            return self.compress(body, encoding)
+
+        key = (etag, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        compressed = self.compress(body, encoding)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._cache), 'max_entries': self.cache_size,
+                    'hits': self.hits, 'misses': self.misses}
+
+    def __call__(self, environ, start_response):
+        encoding = self.negotiate(environ.get('HTTP_ACCEPT_ENCODING'))
+        if_none_match = environ.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            environ['HTTP_IF_NONE_MATCH'] = _ETAG_SUFFIX_RE.sub('"', if_none_match)
+
+        captured = {}
+        # Body data passed to the legacy write() callable, in order with the iterable
+        written = []
+
+        def write(data):
+            if 'write' in captured:
+                captured['write'](data)
+            else:
+                written.append(data)
+
+        def capture(status, headers, exc_info=None):
+            captured.update(status=status, headers=headers, exc_info=exc_info)
+            return write
+
+        def pass_through(status, headers, app_iter):
+            # Once the real start_response is called, later writes go straight to the server
+            captured['write'] = start_response(status, headers.to_wsgi_list(), captured['exc_info'])
+            if not written:
+                return app_iter
+            return ClosingIterator(chain(written, app_iter), getattr(app_iter, 'close', None))
+
+        app_iter = self.app(environ, capture)
+        status, headers = captured['status'], Headers(captured['headers'])
+        status_code = int(status.split(' ', 1)[0])
+        etag = headers.get('ETag')
+
+        # The client revalidated a compressed copy: answer with that copy's ETag
+        if status_code == 304 and etag and encoding and if_none_match \
+                and _suffix_etag(etag, encoding) in if_none_match:
+            headers['ETag'] = _suffix_etag(etag, encoding)
+            headers.add('Vary', 'Accept-Encoding')
+
+        if not self._compressible(status_code, headers):
+            return pass_through(status, headers, app_iter)
+
+        headers.add('Vary', 'Accept-Encoding')
+        if encoding is None or environ.get('REQUEST_METHOD') == 'HEAD':
+            return pass_through(status, headers, app_iter)
+
+        start = time.perf_counter()
+        try:
+            # Appended to what write() received, which keeps adding to the same list
+            for data in app_iter:
+                written.append(data)
+            body = b''.join(written)
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+        compressed = self._compressed(body, encoding, etag)
+
+        headers['Content-Encoding'] = encoding
+        headers['Content-Length'] = str(len(compressed))
+        if etag:
+            headers['ETag'] = _suffix_etag(etag, encoding)
+        if 'Server-Timing' in headers:
+            headers['Server-Timing'] += f', compress;dur={(time.perf_counter() - start) * 1000:.2f};desc="{encoding}"'
+        start_response(status, headers.to_wsgi_list(), captured['exc_info'])
+        return [compressed]
+
+    def _compressible(self, status_code, headers):
+        if status_code != 200 or 'Content-Encoding' in headers:
+            return False
+        if 'no-transform' in headers.get('Cache-Control', ''):
+            return False
+        content_type = headers.get('Content-Type', '').split(';', 1)[0].strip()
+        if content_type not in COMPRESSIBLE_TYPES:
+            return False
+        # Streamed responses without a length are passed through untouched
+        length = headers.get('Content-Length', type=int)
+        return length is not None and length >= self.min_size
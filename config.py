@@ -0,0 +1,77 @@
+import json
+import os
+
+
+class Config:
+    """Default settings, read once by ``create_app``.
+
+    Anything here can be overridden by passing a mapping to ``create_app``;
+    the secret key, storage backend and admin credentials can also be set
+    through environment variables for deployments.
+    """
+
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
+    UPLOAD_FOLDER = 'static/images/uploads'
+    MAX_CONTENT_LENGTH = 64 * 1024 * 1024  # 64MB per request; bulk uploads post many files at once
+    UPLOAD_WORKERS = 4  # files of one bulk upload saved in parallel
+    DATA_FOLDER = 'data'
+    STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'json')  # 'json' or 'sqlite'
+    SQLITE_DATABASE = os.path.join('data', 'content.db')
+    # With the JSON backend, workers can read the collections from one memory-mapped
+    # snapshot in CACHE_FOLDER instead of each parsing and stat'ing data/*.json.
+    # Each worker still decodes its own copy, so this saves parsing, not memory
+    CONTENT_SNAPSHOT = os.environ.get('CONTENT_SNAPSHOT', '0') == '1'
+    CONTENT_SNAPSHOT_VERIFY_INTERVAL = 2  # seconds between checks for edits made outside the app
+    IMAGE_VARIANT_FORMATS = ('webp',)  # add 'avif' where Pillow supports it
+    CACHE_FOLDER = 'cache'
+    IMAGE_GC_FOLDERS = ('uploads', 'announcements', 'staff')  # static/images folders of record images
+    IMAGE_GC_GRACE_PERIOD = 7 * 24 * 3600  # seconds an unused image is kept before it can be collected
+    PAGE_CACHE_SIZE = 128  # rendered public pages kept in memory
+    FRAGMENT_CACHE_SIZE = 2048  # rendered {% cache %} blocks (navbar, cards, ...) kept in memory
+    TEMPLATE_BYTECODE_CACHE = True  # compiled templates kept in CACHE_FOLDER for fresh workers
+    ADMIN_IMAGES_PER_PAGE = 48  # tiles per page of the admin image galleries
+    ANNOUNCEMENTS_PER_PAGE = 10
+    SEARCH_RESULTS_PER_PAGE = 10
+    SERVER_TIMING = True  # per-phase timings in a Server-Timing header
+    COMPRESSION_MIN_SIZE = 500  # bytes; smaller responses are sent as-is
+    COMPRESSION_LEVEL = 6  # gzip level, 1 (fastest) to 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY = 5  # 0 to 11
+    COMPRESSION_CACHE_SIZE = 256  # compressed bodies kept per ETag
+    LUCIDE_VERSION = '0.453.0'  # pinned; keep in step with package.json
+    LUCIDE_ICONS_FOLDER = os.path.join('node_modules', 'lucide-static', 'icons')
+    EXPORT_FOLDER = 'export'  # written by 'flask export'
+    EXPORT_SERVE = os.environ.get('EXPORT_SERVE') == '1'  # answer public pages from the export
+    EXPORT_ACCEL_REDIRECT = os.environ.get('EXPORT_ACCEL_REDIRECT')  # e.g. '/_export/' for nginx internal location
+
+    # Login attempts allowed before any password is hashed, as (burst, attempts
+    # per minute) per client IP and per existing username. Buckets are kept per
+    # worker unless LOGIN_THROTTLE_STORAGE is 'file' or 'sqlite' (shared through
+    # CACHE_FOLDER by all workers of the host)
+    LOGIN_THROTTLE_PER_IP = (10, 6)
+    LOGIN_THROTTLE_PER_USERNAME = (5, 3)
+    LOGIN_THROTTLE_MAX_KEYS = 10000  # least recently used buckets are dropped beyond this
+    LOGIN_THROTTLE_STORAGE = os.environ.get('LOGIN_THROTTLE_STORAGE', 'memory')
+
+    # Reverse proxies in front of the app whose X-Forwarded-For/-Proto/-Host are
+    # trusted, so request.remote_addr (and the per-IP login throttle) sees the
+    # client rather than the proxy. Vercel adds one; never set it higher than
+    # the real number of hops, or clients can spoof their address
+    PROXY_FIX_HOPS = int(os.environ.get('PROXY_FIX_HOPS', '1' if os.environ.get('VERCEL') else '0'))
+
+    # Contact and newsletter form submissions are queued in memory and appended
+    # in batches by a background writer to DATA_FOLDER/submissions.jsonl, or to
+    # submissions.db with SUBMISSIONS_STORAGE=sqlite. A full queue answers 429
+    SUBMISSIONS_STORAGE = os.environ.get('SUBMISSIONS_STORAGE', 'jsonl')
+    SUBMISSIONS_QUEUE_SIZE = 1000  # pending submissions per worker
+    SUBMISSIONS_BATCH_SIZE = 100  # most submissions written with one fsync
+    ADMIN_SUBMISSIONS_PER_PAGE = 50
+
+    # Admin credentials as precomputed password hashes, so nothing runs the
+    # (deliberately slow) KDF at startup. Set ADMIN_USERS to a JSON object of
+    # {"username": "<hash>"} in production; generate a hash with
+    #   python -c "from werkzeug.security import generate_password_hash as h; print(h('password'))"
+    ADMIN_USERS = json.loads(os.environ['ADMIN_USERS']) if 'ADMIN_USERS' in os.environ else {
+        'Admin123@mochwanaesi.co.za': 'scrypt:32768:8:1$BbE5EGGwWPANyvPF$58cb054fabe15eecaf0f3f3996643c3ab'
+                                      '487587676d6b0c16f7711c207eee68d62512ad044c40893cf3baa0443c9808575ce81d4'
+                                      'b39f7b081c8e9c3ee6082b1c'
+    }
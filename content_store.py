@@ -0,0 +1,271 @@
+import threading
+
+from storage import JsonStorage, apply_ops
+
+# Secondary indexes kept for each collection in data/*.json
+DEFAULT_INDEXES = {
+    'announcements': ('category', 'featured'),
+    'staff': ('role',),
+    'programs': (),
+}
+
+
+class _Collection:
+    # Parsed records plus the indexes built from them. Instances are never
+    # mutated after construction; a write builds a new one.
+    __slots__ = ('records', 'by_id', 'indexes', 'signature', 'journal_offset', 'journal_entries')
+
+    def __init__(self, records, index_fields, signature, journal_offset=0, journal_entries=0):
+        self.records = records
+        self.signature = signature
+        self.journal_offset = journal_offset
+        self.journal_entries = journal_entries
+        self.by_id = {}
+        self.indexes = {field: {} for field in index_fields}
+
+        for record in records:
+            self.by_id[record.get('id')] = record
+            for field, index in self.indexes.items():
+                index.setdefault(record.get(field), []).append(record)
+
+
+class BaseStore:
+    """Interface shared by the content storage backends.
+
+    Routes only talk to a store through these methods, so the JSON files and
+    the SQLite database can be swapped via the ``STORAGE_BACKEND`` setting.
+    Collections are addressed by name (``announcements``, ``staff``,
+    ``programs``) and records by their ``id`` field.
+    """
+
+    def __init__(self, indexes=None):
+        self.index_fields = dict(DEFAULT_INDEXES if indexes is None else indexes)
+        self._listeners = []
+
+    @property
+    def collections(self):
+        return tuple(self.index_fields)
+
+    def all(self, name):
+        raise NotImplementedError
+
+    def get(self, name, record_id):
+        raise NotImplementedError
+
+    def filter(self, name, field, value):
+        raise NotImplementedError
+
+    def count(self, name, field=None, value=None):
+        if field is None:
+            return len(self.all(name))
+        return len(self.filter(name, field, value))
+
+    def signature(self, name):
+        """Cheap version stamp for ``name``; changes whenever its data does."""
+        raise NotImplementedError
+
+    def invalidate(self, name=None):
+        pass
+
+    def add_listener(self, callback):
+        """Call ``callback(name)`` after every write to a collection."""
+        self._listeners.append(callback)
+
+    def _notify(self, name):
+        # Called once the write is done and its locks are released, whatever the write path
+        for callback in self._listeners:
+            callback(name)
+
+    def save(self, name, records):
+        raise NotImplementedError
+
+    def compact(self, name):
+        pass
+
+    def next_id(self, name):
+        raise NotImplementedError
+
+    def next_ids(self, name, count):
+        """Reserve ``count`` consecutive ids and return them as a range."""
+        raise NotImplementedError
+
+    def insert(self, name, record, first=False):
+        raise NotImplementedError
+
+    def insert_many(self, name, records, first=False):
+        """Insert ``records`` in one write; with ``first`` they go on top, in order."""
+        raise NotImplementedError
+
+    def update(self, name, record_id, changes):
+        raise NotImplementedError
+
+    def delete(self, name, record_id):
+        raise NotImplementedError
+
+    def delete_many(self, name, record_ids):
+        """Delete ``record_ids`` in one write and return the records that existed."""
+        raise NotImplementedError
+
+
+class ContentStore(BaseStore):
+    """In-memory cache of the data/*.json collections.
+
+    Each collection is parsed once and kept in memory together with an id
+    index and the secondary indexes listed in ``indexes``. Every read checks
+    the mtime and size of the snapshot and journal so edits made by another
+    process (or by hand) are picked up without a restart; when only the
+    journal grew, just the new entries are replayed. Writes are persisted
+    record by record through ``JsonStorage`` and replace the cached copy
+    directly.
+
+    Records handed out by the store are shared between requests and must be
+    treated as read-only. Use ``insert``, ``update`` and ``delete`` to change
+    them.
+    """
+
+    def __init__(self, data_folder='data', indexes=None, storage=None):
+        super().__init__(indexes)
+        self.storage = storage or JsonStorage(data_folder)
+        self._collections = {}
+        self._lock = threading.RLock()
+
+    def _collection(self, name):
+        signature = self.storage.signature(name)
+        collection = self._collections.get(name)
+        if collection is not None and collection.signature == signature:
+            return collection
+
+        with self._lock:
+            # Another thread may have reloaded while we waited for the lock
+            signature = self.storage.signature(name)
+            collection = self._collections.get(name)
+            if collection is not None and collection.signature == signature:
+                return collection
+
+            index_fields = self.index_fields.get(name, ())
+            snapshot_unchanged = collection is not None and collection.signature[:2] == signature[:2]
+            if snapshot_unchanged and signature[3] >= collection.journal_offset:
+                # Only the journal grew: replay the new entries
+                ops, offset = self.storage.read_journal(name, collection.journal_offset)
+                collection = _Collection(apply_ops(collection.records, ops), index_fields, signature,
+                                         offset, collection.journal_entries + len(ops))
+            else:
+                records, offset, entries = self.storage.load(name)
+                collection = _Collection(records, index_fields, signature, offset, entries)
+            self._collections[name] = collection
+            return collection
+
+    # ===================================
+    # Reads
+    # ===================================
+
+    def all(self, name):
+        return self._collection(name).records
+
+    def get(self, name, record_id):
+        return self._collection(name).by_id.get(record_id)
+
+    def filter(self, name, field, value):
+        collection = self._collection(name)
+        if field in collection.indexes:
+            return collection.indexes[field].get(value, [])
+        return [r for r in collection.records if r.get(field) == value]
+
+    def signature(self, name):
+        return self.storage.signature(name)
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._collections.clear()
+            else:
+                self._collections.pop(name, None)
+
+    # ===================================
+    # Writes
+    # ===================================
+
+    def _commit(self, name, ops):
+        # Callers hold both the store lock and the storage lock, so the
+        # collection read here is current and nobody else can append. They
+        # notify the listeners after releasing them.
+        collection = self._collection(name)
+        records = apply_ops(collection.records, ops)
+        entries = collection.journal_entries + len(ops)
+
+        if entries >= self.storage.compact_every:
+            self.storage.write_snapshot(name, records)
+            offset, entries = 0, 0
+        else:
+            offset = self.storage.append(name, ops, collection.journal_offset)
+
+        self._collections[name] = _Collection(
+            records, self.index_fields.get(name, ()), self.storage.signature(name), offset, entries)
+
+    def _save(self, name, records):
+        self.storage.write_snapshot(name, records)
+        self._collections[name] = _Collection(
+            records, self.index_fields.get(name, ()), self.storage.signature(name))
+
+    def save(self, name, records):
+        with self._lock, self.storage.lock(name):
+            self._save(name, records)
+        self._notify(name)
+
+    def compact(self, name):
+        with self._lock, self.storage.lock(name):
+            self._save(name, self._collection(name).records)
+        self._notify(name)
+
+    def next_id(self, name):
+        with self._lock, self.storage.lock(name):
+            return self.storage.next_id(name, self._collection(name).records)
+
+    def next_ids(self, name, count):
+        with self._lock, self.storage.lock(name):
+            first_id = self.storage.next_id(name, self._collection(name).records, count)
+        return range(first_id, first_id + count)
+
+    def insert(self, name, record, first=False):
+        with self._lock, self.storage.lock(name):
+            self._commit(name, [{'op': 'put', 'record': record, 'first': first}])
+        self._notify(name)
+        return record
+
+    def insert_many(self, name, records, first=False):
+        if not records:
+            return records
+        # Each op inserted at the top pushes the previous one down
+        ordered = reversed(records) if first else records
+        with self._lock, self.storage.lock(name):
+            self._commit(name, [{'op': 'put', 'record': record, 'first': first} for record in ordered])
+        self._notify(name)
+        return records
+
+    def update(self, name, record_id, changes):
+        with self._lock, self.storage.lock(name):
+            record = self._collection(name).by_id.get(record_id)
+            if record is None:
+                return None
+            record = {**record, **changes}
+            self._commit(name, [{'op': 'put', 'record': record}])
+        self._notify(name)
+        return record
+
+    def delete(self, name, record_id):
+        with self._lock, self.storage.lock(name):
+            if record_id not in self._collection(name).by_id:
+                return False
+            self._commit(name, [{'op': 'delete', 'id': record_id}])
+        self._notify(name)
+        return True
+
+    def delete_many(self, name, record_ids):
+        with self._lock, self.storage.lock(name):
+            by_id = self._collection(name).by_id
+            deleted = [by_id[record_id] for record_id in dict.fromkeys(record_ids) if record_id in by_id]
+            if deleted:
+                self._commit(name, [{'op': 'delete', 'id': record['id']} for record in deleted])
+        if deleted:
+            self._notify(name)
+        return deleted
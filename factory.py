@@ -0,0 +1,186 @@
+import mimetypes
+import os
+
+from flask import Flask, current_app, g, request, send_file, send_from_directory
+from jinja2 import FileSystemBytecodeCache
+from werkzeug.middleware.proxy_fix import ProxyFix
+
+import bundles
+from assets import IMMUTABLE_MAX_AGE
+from compression import CompressionMiddleware
+from fragment_cache import FragmentCacheExtension
+from helpers import (asset_url, bundle_urls, fragment_version, has_flashes, icon_sprite_url, image_meta, image_srcset,
+                     thumbnail_url)
+from metrics import RequestTimer
+from services import Services, asset_manifest, exporter, metrics
+
+
+def create_app(config=None):
+    """Build the site: settings from ``config.Config`` updated with ``config``.
+
+    Everything expensive is deferred to first use: the content is loaded by
+    the first request that reads it, the admin views are imported by the
+    first admin request and Pillow only by the image pipeline.
+    """
+    app = Flask(__name__)
+    app.config.from_object('config.Config')
+    if config:
+        app.config.update(config)
+
+    services = app.extensions['services'] = Services(app)
+
+    # {% cache %} blocks for the shared components; compiled templates are kept
+    # on disk so fresh workers load them instead of compiling them again
+    jinja_options = {'extensions': [*app.jinja_options.get('extensions', ()), FragmentCacheExtension]}
+    if app.config['TEMPLATE_BYTECODE_CACHE']:
+        bytecode_folder = os.path.join(app.config['CACHE_FOLDER'], 'templates')
+        try:
+            os.makedirs(bytecode_folder, exist_ok=True)
+            writable = os.access(bytecode_folder, os.W_OK)
+        except OSError:
+            writable = False
+        if writable:
+            jinja_options['bytecode_cache'] = FileSystemBytecodeCache(bytecode_folder)
+        else:
+            # Read-only deployments (e.g. Vercel) just compile templates per worker
+            app.logger.warning('Template bytecode cache disabled: %s is not writable', bytecode_folder)
+    app.jinja_options = {**app.jinja_options, **jinja_options}
+
+    app.before_request(start_request_timer)
+    app.after_request(record_request_metrics)
+
+    # Serve mode: public pages come from the 'flask export' output while it is current
+    if app.config['EXPORT_SERVE']:
+        app.before_request(serve_exported)
+
+    # gzip/brotli for HTML, JSON and other text responses; compressed bodies of
+    # cached pages are reused per ETag instead of being recompressed on every hit
+    services.compression = CompressionMiddleware(app.wsgi_app,
+                                                 min_size=app.config['COMPRESSION_MIN_SIZE'],
+                                                 level=app.config['COMPRESSION_LEVEL'],
+                                                 brotli_quality=app.config['COMPRESSION_BROTLI_QUALITY'],
+                                                 cache_size=app.config['COMPRESSION_CACHE_SIZE'])
+    app.wsgi_app = services.compression
+
+    # Client address, scheme and host from the trusted proxies' X-Forwarded-* headers
+    hops = app.config['PROXY_FIX_HOPS']
+    if hops:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=hops, x_proto=hops, x_host=hops)
+
+    # Content-hashed static URLs, cached by browsers for a year
+    app.url_defaults(fingerprint_static_url)
+    app.view_functions['static'] = serve_static
+
+    app.jinja_env.globals['asset_url'] = asset_url
+    app.jinja_env.globals['bundle_urls'] = bundle_urls
+    app.jinja_env.globals['icon_sprite_url'] = icon_sprite_url
+    app.jinja_env.globals['image_srcset'] = image_srcset
+    app.jinja_env.globals['image_meta'] = image_meta
+    app.jinja_env.globals['thumbnail_url'] = thumbnail_url
+    app.jinja_env.fragment_cache = services.fragment_cache
+    app.jinja_env.fragment_cache_version = fragment_version
+
+    from public import bp as public_bp
+    from admin import bp as admin_bp
+    app.register_blueprint(public_bp)
+    app.register_blueprint(admin_bp)
+
+    from commands import register_commands
+    register_commands(app)
+
+    return app
+
+# ===================================
+# Request Instrumentation
+# ===================================
+
+def start_request_timer():
+    g.request_timer = RequestTimer()
+
+def record_request_metrics(response):
+    timer = g.get('request_timer')
+    if timer is None:
+        return response
+    duration = timer.elapsed()
+    metrics.observe_request(request.endpoint or 'unmatched', request.method, response.status_code, duration)
+    if current_app.config['SERVER_TIMING']:
+        response.headers['Server-Timing'] = timer.header(duration)
+    return response
+
+# ===================================
+# Static Export
+# ===================================
+
+# Hand an exported page to the web server (X-Accel-Redirect, or X-Sendfile with
+# USE_X_SENDFILE) or send it from disk; anything else falls through to the view
+def serve_exported():
+    if request.method not in ('GET', 'HEAD') or request.query_string or request.url_rule is None or has_flashes():
+        return None
+    found = exporter.lookup(request.url_rule.rule, request.endpoint)
+    if 'request_timer' in g:
+        g.request_timer.mark('export', 'hit' if found is not None else 'miss')
+    if found is None:
+        return None
+    
+    filepath, entry = found
+    accel_prefix = current_app.config['EXPORT_ACCEL_REDIRECT']
+    if accel_prefix:
+        response = current_app.response_class(mimetype=entry['mimetype'])
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + entry['file']
+    else:
+        response = send_file(os.path.abspath(filepath), mimetype=entry['mimetype'], etag=False,
+                             conditional=False)
+    response.set_etag(entry['etag'])
+    for link in entry.get('links', ()):
+        response.headers.add('Link', link)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# ===================================
+# Static Files
+# ===================================
+
+def fingerprint_static_url(endpoint, values):
+    if endpoint == 'static' and 'filename' in values:
+        values['filename'] = asset_manifest.fingerprint(values['filename'])
+
+# Helper function to serve a .br/.gz copy written by 'flask build-assets' when the
+# client accepts it and it is at least as new as the file itself
+def send_precompressed(filename):
+    filepath = os.path.join(current_app.static_folder, filename)
+    try:
+        source_mtime = os.stat(filepath).st_mtime_ns
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+    
+    has_variants = False
+    for encoding, suffix in bundles.PRECOMPRESSED_ENCODINGS:
+        try:
+            fresh = os.stat(filepath + suffix).st_mtime_ns >= source_mtime
+        except FileNotFoundError:
+            continue
+        has_variants = has_variants or fresh
+        if fresh and request.accept_encodings[encoding]:
+            response = send_from_directory(current_app.static_folder, filename + suffix,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.content_encoding = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+    
+    if has_variants:
+        response = current_app.send_static_file(filename)
+        response.vary.add('Accept-Encoding')
+        return response
+    return None
+
+# Static file view that strips the fingerprint and marks current ones immutable
+def serve_static(filename):
+    filename, is_current = asset_manifest.resolve(filename)
+    response = send_precompressed(filename) or current_app.send_static_file(filename)
+    if is_current:
+        response.cache_control.no_cache = None
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+    return response
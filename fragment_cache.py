@@ -0,0 +1,103 @@
+import threading
+from collections import OrderedDict
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+
+def freeze(value):
+    """Return a hashable stand-in for ``value``; dicts and lists are frozen by content."""
+    if isinstance(value, dict):
+        return tuple(sorted(((k, freeze(v)) for k, v in value.items()), key=lambda item: str(item[0])))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+class FragmentCache:
+    """Bounded LRU cache of rendered template fragments.
+
+    Keys are the frozen arguments of a ``{% cache %}`` block; the first one
+    names the fragment and doubles as its namespace, so fragments that show
+    records use the collection name (``{% cache 'staff', member %}``) and
+    ``invalidate`` can be registered as a store listener. Each entry also
+    records the ``version`` it was rendered at: a fragment looked up at
+    another version is treated as missing and re-rendered in place.
+    """
+
+    def __init__(self, max_entries=2048):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, version=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, markup, version=None):
+        with self._lock:
+            self._entries[key] = (version, markup)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, namespace=None):
+        """Drop every fragment, or those whose key starts with ``namespace``."""
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == namespace]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'max_entries': self.max_entries,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class FragmentCacheExtension(Extension):
+    """``{% cache name, key... %}...{% endcache %}`` for Jinja templates.
+
+    The block's output is kept in ``environment.fragment_cache`` under the
+    given arguments, which must cover everything the block renders from;
+    records and other dicts are keyed by their content, so an edited record
+    gets a fresh fragment. ``environment.fragment_cache_version``, if set,
+    is called for a version shared by all fragments (e.g. of the image
+    metadata their markup embeds). Without a cache the block just renders.
+    """
+
+    tags = {'cache'}
+
+    def __init__(self, environment):
+        super().__init__(environment)
+        environment.extend(fragment_cache=None, fragment_cache_version=None)
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        args = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            args.append(parser.parse_expression())
+        body = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_render', [nodes.List(args)]), [], [], body).set_lineno(lineno)
+
+    def _render(self, args, caller):
+        cache = self.environment.fragment_cache
+        if cache is None:
+            return caller()
+        key = tuple(freeze(arg) for arg in args)
+        version = self.environment.fragment_cache_version
+        version = version() if version is not None else None
+        markup = cache.get(key, version)
+        if markup is None:
+            markup = caller()
+            cache.put(key, markup, version)
+        return markup
@@ -0,0 +1,415 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import wraps
+from urllib.parse import urlsplit
+
+from flask import current_app, flash, g, jsonify, redirect, request, session, url_for
+from werkzeug.utils import secure_filename
+
+import bundles
+from services import (ALLOWED_EXTENSIONS, image_index, image_metadata, image_pipeline, image_refs, metrics,
+                      page_cache, search_index, store, submissions, thumbnails, upload_store)
+
+
+# Helper function to check allowed file extensions
+def allowed_file(filename):
+    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+# Helper function to get images for a specific page
+def get_page_images(page_folder):
+    return image_index.list(page_folder)
+
+# Helper function to select one page of a folder's images, newest first, for the admin galleries
+def paginate_images(page_folder, page=1):
+    images = image_index.list(page_folder)
+    per_page = current_app.config['ADMIN_IMAGES_PER_PAGE']
+    pages = max(1, -(-len(images) // per_page))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    
+    return {
+        'items': images[start:start + per_page],
+        'page': page,
+        'pages': pages,
+        'total': len(images),
+        'prev_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page < pages else None
+    }
+
+# Helper function to select one page of contact or newsletter submissions, newest first
+def paginate_submissions(kind, page=1):
+    total = submissions.sink.count(kind)
+    per_page = current_app.config['ADMIN_SUBMISSIONS_PER_PAGE']
+    pages = max(1, -(-total // per_page))
+    page = min(max(page, 1), pages)
+    
+    return {
+        'items': submissions.sink.page(kind, (page - 1) * per_page, per_page),
+        'page': page,
+        'pages': pages,
+        'total': total,
+        'prev_page': page - 1 if page > 1 else None,
+        'next_page': page + 1 if page < pages else None
+    }
+
+# Confirmations flashed after a plain (non-JavaScript) form post, as forms.js shows them
+SUBMITTED_MESSAGES = {
+    'contact': 'Thank you for your message! We will get back to you soon.',
+    'newsletter': 'Thank you for subscribing to our newsletter!',
+}
+
+# Helper function to queue a validated form submission for the background writer:
+# 400 with the field errors, 429 while the queue is full, else 202. Plain form
+# posts (JavaScript disabled) are sent back to the page they came from with the
+# outcome flashed instead
+def queue_submission(kind, validated):
+    fields, errors = validated
+    if errors:
+        body, status, messages = {'errors': errors}, 400, list(errors.values())
+    elif submissions.submit(kind, fields) is None:
+        message = 'We are receiving a lot of messages right now. Please try again in a moment.'
+        body, status, messages = {'error': message}, 429, [message]
+    else:
+        body, status, messages = {'status': 'received'}, 202, [SUBMITTED_MESSAGES[kind]]
+    
+    if request.accept_mimetypes.best_match(('application/json', 'text/html')) != 'text/html':
+        return jsonify(body), status, ({'Retry-After': '5'} if status == 429 else {})
+    for message in messages:
+        flash(message, 'success' if status == 202 else 'error')
+    return redirect(form_page())
+
+# Helper function to find the page a form was posted from; only same-site
+# referrers are followed, anything else goes back to the contact page
+def form_page():
+    referrer = urlsplit(request.referrer or '')
+    if referrer.netloc == request.host and referrer.path:
+        return referrer.path
+    return url_for('public.contact')
+
+# Helper function to tell whether flashed messages are waiting to be shown; the
+# public page caches are skipped then. The session is only read if the client
+# sent one, so cached pages don't vary on the cookie
+def has_flashes():
+    if current_app.config['SESSION_COOKIE_NAME'] not in request.cookies:
+        return False
+    return bool(session.get('_flashes'))
+
+# ===================================
+# Image Files
+# ===================================
+
+# Helper function to save an uploaded image and queue its resized variants
+@metrics.timed('file-save')
+def save_image(file, folder, filename):
+    filepath = os.path.join(folder, filename)
+    file.save(filepath)
+    image_index.invalidate_path(filepath)
+    image_pipeline.discard(filepath)
+    image_pipeline.submit(filepath)
+    return filepath
+
+# Helper function to store an uploaded image once per unique content; returns its URL
+@metrics.timed('file-save')
+def save_upload(file):
+    extension = file.filename.rsplit('.', 1)[1].lower()
+    filename, created = upload_store.save(file, extension)
+    if created:
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
+        image_index.invalidate_path(filepath)
+        image_pipeline.submit(filepath)
+    return upload_store.url(filename)
+
+# Helper function to store several uploaded images at once: files are hashed and
+# written concurrently and the library listing is invalidated once; returns the
+# URLs in the order of ``files``
+@metrics.timed('file-save')
+def save_uploads(files):
+    # Worker threads have no app context, so hand them the store itself
+    uploads = upload_store._get_current_object()
+    
+    def save(file):
+        return uploads.save(file, file.filename.rsplit('.', 1)[1].lower())
+    
+    with ThreadPoolExecutor(max_workers=current_app.config['UPLOAD_WORKERS']) as executor:
+        saved = list(executor.map(save, files))
+    
+    created = [os.path.join(current_app.config['UPLOAD_FOLDER'], filename) for filename, new in saved if new]
+    if created:
+        image_index.invalidate_path(created[0])
+        for filepath in created:
+            image_pipeline.submit(filepath)
+    return [upload_store.url(filename) for filename, _ in saved]
+
+# Helper function to save several uploaded images to a page folder as
+# '<prefix>_<timestamp>_<name>', concurrently and with one listing invalidation
+@metrics.timed('file-save')
+def save_images(files, folder, prefix):
+    os.makedirs(folder, exist_ok=True)
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filepaths, used = [], set()
+    for file in files:
+        stem, extension = os.path.splitext(secure_filename(file.filename))
+        filename, n = f'{prefix}_{timestamp}_{stem}{extension}', 1
+        while filename in used or os.path.exists(os.path.join(folder, filename)):
+            n += 1
+            filename = f'{prefix}_{timestamp}_{stem}-{n}{extension}'
+        used.add(filename)
+        filepaths.append(os.path.join(folder, filename))
+    
+    with ThreadPoolExecutor(max_workers=current_app.config['UPLOAD_WORKERS']) as executor:
+        list(executor.map(lambda item: item[0].save(item[1]), zip(files, filepaths)))
+    
+    if filepaths:
+        image_index.invalidate_path(filepaths[0])
+        for filepath in filepaths:
+            image_pipeline.discard(filepath)
+            image_pipeline.submit(filepath)
+    return filepaths
+
+# Helper function to split the files posted under ``field`` into allowed images
+# and the names of rejected ones
+def uploaded_images(field='image'):
+    files = [f for f in request.files.getlist(field) if f and f.filename]
+    return [f for f in files if allowed_file(f.filename)], [f.filename for f in files if not allowed_file(f.filename)]
+
+# Helper function to delete an image together with its resized variants
+@metrics.timed('file-delete')
+def remove_image(filepath):
+    os.remove(filepath)
+    image_index.invalidate_path(filepath)
+    image_pipeline.discard(filepath)
+    thumbnails.discard(filepath)
+
+# Helper function to delete several images of one folder with a single listing invalidation
+@metrics.timed('file-delete')
+def remove_images(filepaths):
+    for filepath in filepaths:
+        os.remove(filepath)
+        image_pipeline.discard(filepath)
+        thumbnails.discard(filepath)
+    if filepaths:
+        image_index.invalidate_path(filepaths[0])
+
+# Helper function to find (and unless ``dry_run``, delete) the images in the
+# IMAGE_GC_FOLDERS that no record uses and that are older than the grace period;
+# reclaimable bytes include their resized variants
+def collect_orphaned_images(dry_run=False, grace_period=None):
+    if grace_period is None:
+        grace_period = current_app.config['IMAGE_GC_GRACE_PERIOD']
+    collectable, recent = image_refs.orphans(current_app.config['IMAGE_GC_FOLDERS'], grace_period)
+    variants = image_pipeline.variants_of([orphan['path'] for orphan in collectable + recent])
+    for orphan in collectable + recent:
+        orphan['variants'] = variants[orphan['path']]
+        orphan['reclaimable'] = orphan['size'] + sum(os.path.getsize(path) for path in orphan['variants'])
+    
+    deleted = []
+    if not dry_run:
+        by_folder = {}
+        for orphan in collectable:
+            # Re-check right before deleting: a record may have picked the image up since the scan
+            if not image_refs.is_referenced(orphan['url']) and os.path.exists(orphan['path']):
+                by_folder.setdefault(os.path.dirname(orphan['path']), []).append(orphan)
+        for orphans in by_folder.values():
+            remove_images([orphan['path'] for orphan in orphans])
+            deleted.extend(orphans)
+    
+    return {
+        'collectable': collectable,
+        'recent': recent,
+        'deleted': deleted,
+        'reclaimable': sum(orphan['reclaimable'] for orphan in collectable),
+        'reclaimed': sum(orphan['reclaimable'] for orphan in deleted),
+        'grace_period': grace_period,
+    }
+
+# ===================================
+# Template Globals
+# ===================================
+
+# Helper function to fingerprint a stored '/static/...' URL such as image_url
+def asset_url(url):
+    prefix = current_app.static_url_path + '/'
+    if url and url.startswith(prefix):
+        return url_for('static', filename=url[len(prefix):])
+    return url
+
+# Helper function to build a picture() srcset from fingerprinted variant URLs
+def image_srcset(url, fmt='webp'):
+    return image_pipeline.srcset(url, fmt, asset_url)
+
+# Helper function to build Link headers preloading the site stylesheet and an
+# above-the-fold image (matching the first <source> picture() emits for it).
+# WSGI cannot send 103 Early Hints itself; proxies and CDNs that support them
+# (nginx 'early_hints', Cloudflare) build them from these headers
+def preload_links(image_url=None, sizes='100vw'):
+    links = [f'<{url}>; rel=preload; as=style' for url in bundle_urls('css/site.css')]
+    if image_url:
+        link = f'<{asset_url(image_url)}>; rel=preload; as=image; fetchpriority=high'
+        for fmt in ('avif', 'webp'):
+            srcset = image_srcset(image_url, fmt)
+            if srcset:
+                link += f'; imagesrcset="{srcset}"; imagesizes="{sizes}"; type="image/{fmt}"'
+                break
+        links.append(link)
+    return links
+
+# Helper function for the admin galleries: URL of an image listing entry's
+# thumbnail, versioned by its mtime so browsers can keep it
+def thumbnail_url(image):
+    prefix = '/static/images/'
+    return url_for('admin.image_thumbnail', path=image['url'][len(prefix):], v=int(image['mtime']))
+
+# Helper function to stamp what every {% cache %} fragment depends on besides its
+# key: the image metadata and variant srcsets embedded in its markup. Read once
+# per request
+def fragment_version():
+    if 'fragment_version' not in g:
+        g.fragment_version = (image_metadata.signature(), image_pipeline.signature())
+    return g.fragment_version
+
+# Helper function for templates: the width, height, placeholder and colour of a
+# stored image, or None while they are still being computed
+def image_meta(url):
+    return image_metadata.get(url)
+
+# Helper function for templates: the built bundle while it is up to date,
+# otherwise its individual source files
+def bundle_urls(bundle):
+    sources = bundles.BUNDLES[bundle]
+    if bundles.is_stale(current_app.static_folder, bundle, sources):
+        return [url_for('static', filename=source) for source in sources]
+    return [url_for('static', filename=bundles.output_name(bundle))]
+
+# Helper function for templates: the local icon sprite, or None until it is built
+def icon_sprite_url():
+    sprite = f'{bundles.OUTPUT_FOLDER}/icons.svg'
+    if os.path.exists(os.path.join(current_app.static_folder, sprite)):
+        return url_for('static', filename=sprite)
+    return None
+
+# ===================================
+# Views
+# ===================================
+
+# Helper function to stamp the state of the collections and image folders a page
+# is rendered from; pages that show images also depend on their metadata
+def content_version(collections=(), image_folders=()):
+    version = tuple(store.signature(name) for name in collections) + \
+        tuple(image_index.signature(folder) for folder in image_folders)
+    if image_folders:
+        version += (image_metadata.signature(),)
+    return version
+
+# Public page cache decorator: serves the stored HTML while the collections and
+# image folders the page is rendered from are unchanged, with ETag and
+# Last-Modified so clients can revalidate with a 304. The dependencies are kept
+# on the view so 'flask export' knows which pages an edit affects.
+def cached_page(collections=(), image_folders=()):
+    dependencies = tuple(collections) + tuple(f'images/{folder}' for folder in image_folders)
+    if image_folders:
+        dependencies += ('image-metadata',)
+    
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            if has_flashes():
+                # Rendered for this visitor only; the messages must not be cached
+                return f(*args, **kwargs)
+            version = content_version(collections, image_folders)
+            key = (request.full_path, version)
+            
+            entry = page_cache.get(key)
+            if 'request_timer' in g:
+                g.request_timer.mark('page-cache', 'hit' if entry is not None else 'miss')
+            if entry is None:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = page_cache.put(key, response.get_data(), response.mimetype, dependencies,
+                                       response.headers.getlist('Link'))
+            
+            response = current_app.response_class(entry.body, mimetype=entry.mimetype)
+            for link in entry.links:
+                response.headers.add('Link', link)
+            response.set_etag(entry.etag)
+            response.last_modified = entry.last_modified
+            response.cache_control.public = True
+            response.cache_control.no_cache = True
+            return response.make_conditional(request)
+        decorated_function.dependencies = dependencies
+        decorated_function.content_version = lambda: content_version(collections, image_folders)
+        return decorated_function
+    return decorator
+
+# Helper function to select one page of announcements, optionally in one category
+def query_announcements(category='all', page=1):
+    if category and category != 'all':
+        items = store.filter('announcements', 'category', category)
+    else:
+        items = store.all('announcements')
+    
+    per_page = current_app.config['ANNOUNCEMENTS_PER_PAGE']
+    pages = max(1, -(-len(items) // per_page))
+    page = min(max(page, 1), pages)
+    start = (page - 1) * per_page
+    
+    return {
+        'items': items[start:start + per_page],
+        'category': category or 'all',
+        'page': page,
+        'pages': pages,
+        'total': len(items),
+        'next_page': page + 1 if page < pages else None
+    }
+
+# Helper function to run a site search and shape one page of hits for the
+# search page and its JSON API
+def search_results(query, collection='all', page=1):
+    collection = collection if collection in ('announcements', 'staff', 'programs') else 'all'
+    per_page = current_app.config['SEARCH_RESULTS_PER_PAGE']
+    page = max(page, 1)
+    total, hits = search_index.search(query, None if collection == 'all' else collection,
+                                      limit=per_page, offset=(page - 1) * per_page)
+    
+    results = []
+    for score, name, record in hits:
+        if name == 'announcements':
+            title, summary = record.get('title'), record.get('excerpt')
+            url = url_for('public.announcements', category=record.get('category'))
+        elif name == 'staff':
+            title, summary = record.get('name'), record.get('title')
+            url = url_for('public.staff')
+        else:
+            title, summary = record.get('name'), record.get('tagline')
+            url = url_for('public.programs')
+        results.append({
+            'type': name,
+            'id': record.get('id'),
+            'title': title,
+            'summary': summary,
+            'url': url,
+            'image_url': record.get('image_url'),
+            'score': round(score, 4)
+        })
+    
+    pages = max(1, -(-total // per_page))
+    return {
+        'query': query,
+        'type': collection,
+        'results': results,
+        'page': page,
+        'pages': pages,
+        'total': total,
+        'next_page': page + 1 if page < pages else None
+    }
+
+# Login required decorator
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'admin_logged_in' not in session:
+            flash('Please log in to access the admin panel.', 'error')
+            return redirect(url_for('admin.login'))
+        return f(*args, **kwargs)
+    return decorated_function
@@ -0,0 +1,147 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+
+class ImageReferenceIndex:
+    """Which records use each image below ``static/images``.
+
+    Maps image URLs to the ``(collection, id)`` keys of the records whose
+    ``fields`` point at them. Built from the store on first use and then
+    kept in step: ``refresh`` is registered as a store listener and, like
+    the search index, re-reads only the URLs of records that were added,
+    edited or deleted. Changes made by another process are picked up by a
+    signature check before each lookup.
+
+    ``orphans`` lists the images (files with one of ``allowed_extensions``)
+    in the given folders that no record uses, so replaced uploads and the
+    images of deleted records can be reclaimed. URLs in ``pinned`` (e.g.
+    the default images new records fall back to), and those for which
+    ``keep(url)`` is true (e.g. image library uploads), always count as used.
+    """
+
+    def __init__(self, store, images_folder='static/images', fields=('image_url',), pinned=(), keep=None,
+                 allowed_extensions=None):
+        self.store = store
+        self.images_folder = images_folder
+        self.allowed_extensions = allowed_extensions
+        self.fields = tuple(fields)
+        self.pinned = frozenset(pinned)
+        self.keep = keep
+        self._urls = {}
+        self._refs = {}
+        self._signatures = {}
+        self._lock = threading.RLock()
+
+    def url(self, filepath):
+        relpath = os.path.relpath(filepath, self.images_folder).replace(os.sep, '/')
+        return '/' + '/'.join([*self.images_folder.split(os.sep), relpath]).strip('/')
+
+    def _allowed(self, filename):
+        if self.allowed_extensions is None:
+            return True
+        return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
+
+    # ===================================
+    # Indexing
+    # ===================================
+
+    def _record_urls(self, record):
+        return frozenset(record[field] for field in self.fields if isinstance(record.get(field), str))
+
+    def _set(self, key, urls):
+        for url in self._urls.pop(key, ()):
+            keys = self._refs[url]
+            keys.discard(key)
+            if not keys:
+                del self._refs[url]
+        if urls:
+            self._urls[key] = urls
+            for url in urls:
+                self._refs.setdefault(url, set()).add(key)
+
+    def _sync(self, name):
+        signature = self.store.signature(name)
+        if self._signatures.get(name) == signature:
+            return
+        seen = set()
+        for record in self.store.all(name):
+            key = (name, record.get('id'))
+            seen.add(key)
+            urls = self._record_urls(record)
+            if self._urls.get(key, frozenset()) != urls:
+                self._set(key, urls)
+        for key in [key for key in self._urls if key[0] == name and key not in seen]:
+            self._set(key, frozenset())
+        self._signatures[name] = signature
+
+    def refresh(self, name=None):
+        """Apply changes to ``name`` (or every collection) once the index is built."""
+        with self._lock:
+            for collection in ([name] if name is not None else list(self.store.collections)):
+                if collection in self._signatures:
+                    self._sync(collection)
+
+    def _synced(self):
+        for name in self.store.collections:
+            self._sync(name)
+        return self._refs
+
+    # ===================================
+    # Queries
+    # ===================================
+
+    def references(self, url):
+        """Return the ``(collection, id)`` keys of the records using ``url``."""
+        with self._lock:
+            return sorted(self._synced().get(url, ()), key=str)
+
+    def _kept(self, url):
+        return url in self.pinned or (self.keep is not None and self.keep(url))
+
+    def is_referenced(self, url):
+        if self._kept(url):
+            return True
+        with self._lock:
+            return url in self._synced()
+
+    def orphans(self, folders, grace_period=0, now=None):
+        """Return ``(collectable, recent)`` unreferenced files in ``folders``.
+
+        Each is a list of ``{'url', 'path', 'size', 'mtime', 'modified'}`` dicts, oldest
+        first; ``recent`` holds the files modified less than ``grace_period``
+        seconds ago, which may just not have been attached to a record yet.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            refs = self._synced()
+            collectable, recent = [], []
+            for folder in folders:
+                folder_path = os.path.join(self.images_folder, folder)
+                if not os.path.isdir(folder_path):
+                    continue
+                with os.scandir(folder_path) as entries:
+                    for entry in entries:
+                        if not entry.is_file() or not self._allowed(entry.name):
+                            continue
+                        url = self.url(entry.path)
+                        if url in refs or self._kept(url):
+                            continue
+                        stats = entry.stat()
+                        orphan = {
+                            'url': url,
+                            'path': entry.path,
+                            'size': stats.st_size,
+                            'mtime': stats.st_mtime,
+                            'modified': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M')
+                        }
+                        (recent if now - stats.st_mtime < grace_period else collectable).append(orphan)
+        collectable.sort(key=lambda orphan: orphan['mtime'])
+        recent.sort(key=lambda orphan: orphan['mtime'])
+        return collectable, recent
+
+    def stats(self):
+        with self._lock:
+            refs = self._synced()
+            return {'images': len(refs), 'records': len(self._urls)}
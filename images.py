@@ -0,0 +1,617 @@
+import base64
+import io
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from storage import JsonStorage
+
+logger = logging.getLogger(__name__)
+
+# Widths (in CSS pixels) of the resized copies generated for every upload
+VARIANT_WIDTHS = (320, 640, 960, 1280, 1920)
+
+# Encoder settings per output format
+VARIANT_FORMATS = {
+    'webp': {'format': 'WEBP', 'quality': 80, 'method': 4},
+    'avif': {'format': 'AVIF', 'quality': 60},
+}
+
+
+class ImagePipeline:
+    """Generates resized WebP/AVIF variants of uploaded images.
+
+    Variants live flat in ``variants_folder`` and are named after the
+    source image's path below ``static/images``, e.g. the 640px WebP copy
+    of ``/static/images/hero/a.jpg`` is ``variants/hero__a.jpg-640w.webp``.
+    Encoding runs on a small thread pool so upload requests return as soon
+    as the original is on disk.
+
+    Templates look variants up through ``srcset``; the listing behind it is
+    re-read only when the variants folder's mtime changes. With a
+    ``metadata`` index, each processed image's dimensions and placeholder
+    are recorded there from the already decoded original once its variants
+    are written.
+    """
+
+    def __init__(self, images_folder='static/images', variants_folder='static/images/variants',
+                 widths=VARIANT_WIDTHS, formats=('webp',), max_workers=2, metadata=None):
+        self.images_folder = images_folder
+        self.metadata = metadata
+        self.variants_folder = variants_folder
+        self.widths = tuple(sorted(widths))
+        self.formats = tuple(formats)
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self._index = {}
+        self._index_mtime = None
+
+    # ===================================
+    # Naming
+    # ===================================
+
+    def _key(self, source_path):
+        relpath = os.path.relpath(source_path, self.images_folder)
+        return relpath.replace(os.sep, '__')
+
+    def _source_path(self, url):
+        prefix = '/' + self.images_folder.replace(os.sep, '/').strip('/') + '/'
+        if not url or not url.startswith(prefix):
+            return None
+        return os.path.join(self.images_folder, *url[len(prefix):].split('/'))
+
+    def _variant_url(self, filename):
+        return '/' + '/'.join([*self.variants_folder.split(os.sep), filename]).strip('/')
+
+    # ===================================
+    # Encoding
+    # ===================================
+
+    def submit(self, source_path):
+        """Queue variant generation for ``source_path`` and return the future."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='image-variants')
+        future = self._executor.submit(self.process, source_path)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.error('Image variant generation failed', exc_info=future.exception())
+
+    def process(self, source_path):
+        """Write every variant of ``source_path`` and return their paths."""
+        os.makedirs(self.variants_folder, exist_ok=True)
+        key = self._key(source_path)
+        written = []
+
+        # Imported here so serving pages never pays for loading Pillow
+        from PIL import Image, ImageOps
+
+        with Image.open(source_path) as original:
+            # Bake in the EXIF rotation; the saved copies carry no metadata
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+            widths = [w for w in self.widths if w < image.width]
+            widths.append(min(image.width, self.widths[-1]))
+
+            for width in sorted(set(widths)):
+                height = max(1, round(image.height * width / image.width))
+                resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+                for fmt in self.formats:
+                    filepath = os.path.join(self.variants_folder, f'{key}-{width}w.{fmt}')
+                    tmp_path = filepath + '.tmp'
+                    resized.save(tmp_path, **VARIANT_FORMATS[fmt])
+                    os.replace(tmp_path, filepath)
+                    written.append(filepath)
+
+            # Recorded last: a fragment cached against the new metadata must
+            # also find the variants in its srcset
+            if self.metadata is not None:
+                self.metadata.record(source_path, image)
+
+        return written
+
+    def variants(self, source_path):
+        """Return the paths of the variants written for ``source_path``."""
+        return self.variants_of([source_path])[source_path]
+
+    def variants_of(self, source_paths):
+        """Return ``{source_path: [variant paths]}`` from a single listing of the variants folder."""
+        found = {source_path: [] for source_path in source_paths}
+        if not found or not os.path.isdir(self.variants_folder):
+            return found
+        keys = {self._key(source_path): source_path for source_path in source_paths}
+        for filename in os.listdir(self.variants_folder):
+            key = filename.rsplit('-', 1)[0]
+            if key in keys and not filename.endswith('.tmp'):
+                found[keys[key]].append(os.path.join(self.variants_folder, filename))
+        return found
+
+    def discard(self, source_path):
+        """Remove the variants of a deleted or replaced source image."""
+        if self.metadata is not None:
+            self.metadata.discard(source_path)
+        for filepath in self.variants(source_path):
+            os.remove(filepath)
+
+    # ===================================
+    # Lookup
+    # ===================================
+
+    def signature(self):
+        """Version stamp that changes whenever a variant is written or removed."""
+        try:
+            return os.stat(self.variants_folder).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _refresh_index(self):
+        mtime = self.signature()
+        if mtime == self._index_mtime:
+            return self._index
+
+        index = {}
+        if mtime is not None:
+            for filename in os.listdir(self.variants_folder):
+                stem, _, fmt = filename.rpartition('.')
+                key, _, width = stem.rpartition('-')
+                if fmt not in VARIANT_FORMATS or not width.endswith('w') or not width[:-1].isdigit():
+                    continue
+                index.setdefault(key, {}).setdefault(fmt, []).append(
+                    (int(width[:-1]), self._variant_url(filename)))
+            for formats in index.values():
+                for variants in formats.values():
+                    variants.sort()
+
+        self._index, self._index_mtime = index, mtime
+        return index
+
+    def srcset(self, url, fmt='webp', url_transform=None):
+        """Return the ``srcset`` value for ``url`` in ``fmt``, or ''.
+
+        ``url_transform`` is applied to each variant URL, e.g. to fingerprint it.
+        """
+        source_path = self._source_path(url)
+        if source_path is None:
+            return ''
+        variants = self._refresh_index().get(self._key(source_path), {}).get(fmt, [])
+        if url_transform is not None:
+            variants = [(width, url_transform(variant_url)) for width, variant_url in variants]
+        return ', '.join(f'{variant_url} {width}w' for width, variant_url in variants)
+
+
+class ImageFolderIndex:
+    """Cached listings of the image folders below ``static/images``.
+
+    A folder is scanned (listdir + stat) only when its mtime changes or when
+    ``invalidate`` is called after the app writes into it; overwriting a
+    file in place does not touch the directory mtime, so upload handlers
+    must invalidate explicitly. Listings are sorted by the real mtime,
+    newest first.
+
+    With a ``manifest_folder`` each scan is also written out as JSON, so a
+    freshly started worker can reuse it instead of rescanning, and a
+    rewritten manifest tells other workers that the listing changed.
+    """
+
+    def __init__(self, images_folder='static/images', allowed_extensions=None, manifest_folder=None):
+        self.images_folder = images_folder
+        self.allowed_extensions = allowed_extensions
+        self.manifest_folder = manifest_folder
+        self._cache = {}
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def _allowed(self, filename):
+        if self.allowed_extensions is None:
+            return True
+        return '.' in filename and filename.rsplit('.', 1)[1].lower() in self.allowed_extensions
+
+    def _manifest_path(self, folder):
+        return os.path.join(self.manifest_folder, f'images_{folder}.json')
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def signature(self, folder):
+        """Cheap version stamp for ``folder``; changes whenever its listing does."""
+        folder_mtime = self._mtime(os.path.join(self.images_folder, folder))
+        if self.manifest_folder is None:
+            return (folder_mtime, None)
+        return (folder_mtime, self._mtime(self._manifest_path(folder)))
+
+    def _scan(self, folder):
+        folder_path = os.path.join(self.images_folder, folder)
+        images = []
+        if os.path.isdir(folder_path):
+            with os.scandir(folder_path) as entries:
+                for entry in entries:
+                    if not entry.is_file() or not self._allowed(entry.name):
+                        continue
+                    stats = entry.stat()
+                    images.append({
+                        'filename': entry.name,
+                        'url': f'/static/images/{folder}/{entry.name}',
+                        'size': stats.st_size,
+                        'mtime': stats.st_mtime,
+                        'modified': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M')
+                    })
+        images.sort(key=lambda x: x['mtime'], reverse=True)
+        return images
+
+    def _read_manifest(self, folder, folder_mtime):
+        try:
+            with open(self._manifest_path(folder), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if manifest.get('folder_mtime') != folder_mtime:
+            return None
+        return manifest['images']
+
+    def _write_manifest(self, folder, folder_mtime, images):
+        filepath = self._manifest_path(folder)
+        tmp_path = f'{filepath}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(self.manifest_folder, exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'folder_mtime': folder_mtime, 'images': images}, f)
+            os.replace(tmp_path, filepath)
+        except OSError as e:
+            # Only spares cold workers a scan; e.g. a read-only deployment
+            # keeps serving the listing from memory
+            logger.warning('Could not write the image listing of %s: %s', folder, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def list(self, folder):
+        """Return the images in ``folder``, newest first. Treat as read-only."""
+        signature = self.signature(folder)
+        cached = self._cache.get(folder)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with self._lock:
+            images = None
+            if self.manifest_folder is not None:
+                images = self._read_manifest(folder, signature[0])
+            if images is None:
+                images = self._scan(folder)
+                if self.manifest_folder is not None:
+                    self._write_manifest(folder, signature[0], images)
+                    signature = self.signature(folder)
+            self._cache[folder] = (signature, images)
+            return images
+
+    def add_listener(self, callback):
+        """Call ``callback(folder)`` whenever a folder is invalidated."""
+        self._listeners.append(callback)
+
+    def invalidate(self, folder):
+        with self._lock:
+            self._cache.pop(folder, None)
+            if self.manifest_folder is not None:
+                try:
+                    os.remove(self._manifest_path(folder))
+                except FileNotFoundError:
+                    pass
+        for callback in self._listeners:
+            callback(folder)
+
+    def invalidate_path(self, filepath):
+        """Invalidate the folder that contains ``filepath``."""
+        folder = os.path.relpath(os.path.dirname(filepath), self.images_folder)
+        self.invalidate(folder.replace(os.sep, '/'))
+
+
+class ThumbnailCache:
+    """Small WebP previews of images for the admin galleries.
+
+    A thumbnail is made the first time it is requested and kept in
+    ``thumbnails_folder`` (outside ``static/``, as only admins see them),
+    named like the pipeline's variants. It is remade when the source is
+    newer than the stored copy, so a replaced image never shows a stale
+    preview. Concurrent requests for the same image wait for one encode
+    instead of each doing their own.
+    """
+
+    def __init__(self, images_folder='static/images', thumbnails_folder='cache/thumbnails', size=400, quality=70):
+        self.images_folder = images_folder
+        self.thumbnails_folder = thumbnails_folder
+        self.size = size
+        self.quality = quality
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.generated = 0
+
+    def _key(self, source_path):
+        relpath = os.path.relpath(source_path, self.images_folder)
+        return relpath.replace(os.sep, '__')
+
+    def path(self, source_path):
+        return os.path.join(self.thumbnails_folder, f'{self._key(source_path)}-{self.size}.webp')
+
+    def get(self, source_path):
+        """Return the path of the thumbnail of ``source_path``, encoding it if needed.
+
+        Raises ``FileNotFoundError`` if the source does not exist.
+        """
+        source_mtime = os.stat(source_path).st_mtime_ns
+        filepath = self.path(source_path)
+        if self._mtime(filepath) >= source_mtime:
+            return filepath
+
+        with self._lock:
+            lock = self._locks.setdefault(filepath, threading.Lock())
+        with lock:
+            # Another request may have written it while this one waited
+            if self._mtime(filepath) < source_mtime:
+                self._encode(source_path, filepath)
+        return filepath
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return -1
+
+    def _encode(self, source_path, filepath):
+        from PIL import Image, ImageOps
+
+        os.makedirs(self.thumbnails_folder, exist_ok=True)
+        with Image.open(source_path) as original:
+            # draft() lets JPEG decode at a fraction of full size
+            original.draft('RGB', (self.size, self.size))
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info or 'A' in image.mode else 'RGB')
+            image.thumbnail((self.size, self.size), Image.LANCZOS)
+            tmp_path = f'{filepath}.{os.getpid()}.{threading.get_ident()}.tmp'
+            image.save(tmp_path, format='WEBP', quality=self.quality, method=4)
+        os.replace(tmp_path, filepath)
+        self.generated += 1
+
+    def discard(self, source_path):
+        """Remove the thumbnail of a deleted image."""
+        try:
+            os.remove(self.path(source_path))
+        except FileNotFoundError:
+            pass
+
+
+# Side of the tiny preview inlined as a blurred placeholder, in pixels
+PLACEHOLDER_SIZE = 16
+
+
+def describe_image(image):
+    """Return the metadata recorded for an (EXIF-rotated) PIL ``image``."""
+    from PIL import Image
+
+    rgb = image.convert('RGB')
+
+    # Tiny WebP preview the browser scales up (and so blurs) while the real image loads
+    preview = rgb.copy()
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.BILINEAR)
+    buffer = io.BytesIO()
+    preview.save(buffer, format='WEBP', quality=40)
+
+    # Most common colour of a small median-cut palette
+    sample = rgb.copy()
+    sample.thumbnail((64, 64), Image.BILINEAR)
+    quantized = sample.quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(quantized.getcolors())
+    palette = quantized.getpalette()
+
+    return {
+        'width': image.width,
+        'height': image.height,
+        'aspect_ratio': round(image.width / image.height, 4),
+        'placeholder': 'data:image/webp;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii'),
+        'color': '#{:02x}{:02x}{:02x}'.format(*palette[index * 3:index * 3 + 3]),
+    }
+
+
+class ImageMetadataIndex:
+    """Pixel dimensions, a blurred placeholder and the dominant colour of each image.
+
+    Entries are computed with Pillow once per file and kept in
+    ``image-metadata.json`` in ``cache_folder``, keyed by URL, so templates
+    can give every ``<img>`` its intrinsic size and an instant placeholder
+    without opening the file while a page renders. The image pipeline
+    records an entry while it encodes an upload's variants; ``get`` queues
+    any image it has no entry for (e.g. files copied in by hand) on a
+    background thread and returns None until it is done.
+
+    The file is re-read when another process rewrites it, and ``signature``
+    changes with it, so pages rendered before an entry existed are not
+    served from caches afterwards. Writers merge into it under an exclusive
+    ``storage`` lock, so workers don't overwrite each other's entries; where
+    it can't be written (a read-only deployment) entries are kept in memory.
+    """
+
+    def __init__(self, images_folder='static/images', cache_folder='cache', storage=None):
+        self.images_folder = images_folder
+        self.cache_folder = cache_folder
+        self.storage = storage if storage is not None else JsonStorage(cache_folder)
+        self._entries = None
+        self._mtime = None
+        self._pending = set()
+        self._failed = set()
+        self._listeners = []
+        self._executor = None
+        self._lock = threading.RLock()
+
+    def _path(self):
+        return os.path.join(self.cache_folder, 'image-metadata.json')
+
+    def url(self, source_path):
+        relpath = os.path.relpath(source_path, self.images_folder).replace(os.sep, '/')
+        return '/' + '/'.join([*self.images_folder.split(os.sep), relpath]).strip('/')
+
+    def _source_path(self, url):
+        prefix = '/' + self.images_folder.replace(os.sep, '/').strip('/') + '/'
+        if not url or not url.startswith(prefix):
+            return None
+        return os.path.join(self.images_folder, *url[len(prefix):].split('/'))
+
+    # ===================================
+    # Persistence
+    # ===================================
+
+    def signature(self):
+        """Version stamp that changes whenever an entry is added or removed."""
+        try:
+            return os.stat(self._path()).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def _load(self):
+        mtime = self.signature()
+        with self._lock:
+            if self._entries is None or mtime != self._mtime:
+                entries = {}
+                if mtime is not None:
+                    try:
+                        with open(self._path(), 'r', encoding='utf-8') as f:
+                            entries = json.load(f)['images']
+                    except (FileNotFoundError, ValueError, KeyError):
+                        entries = {}
+                self._entries, self._mtime = entries, mtime
+            return self._entries
+
+    def update(self, changes):
+        """Write ``{url: entry}`` in one go; a None entry removes that URL."""
+        with self._lock:
+            try:
+                os.makedirs(self.cache_folder, exist_ok=True)
+                # Merge into the current file so entries written by other workers survive
+                with self.storage.lock('image-metadata'):
+                    entries = self._merge(self._load(), changes)
+                    self.storage.atomic_write(self._path(), lambda f: json.dump({'images': entries}, f))
+                    self._entries, self._mtime = entries, self.signature()
+            except OSError as e:
+                logger.warning('Could not write image metadata: %s', e)
+                self._entries = self._merge(self._entries or {}, changes)
+        for callback in self._listeners:
+            callback()
+
+    @staticmethod
+    def _merge(entries, changes):
+        entries = dict(entries)
+        for url, entry in changes.items():
+            if entry is None:
+                entries.pop(url, None)
+            else:
+                entries[url] = entry
+        return entries
+
+    # ===================================
+    # Entries
+    # ===================================
+
+    def _entry(self, source_path, image):
+        stats = os.stat(source_path)
+        return dict(describe_image(image), size=stats.st_size, mtime=stats.st_mtime)
+
+    def record(self, source_path, image):
+        """Store the entry for ``source_path`` from its already opened, rotated ``image``."""
+        self.update({self.url(source_path): self._entry(source_path, image)})
+
+    def compute(self, source_path):
+        """Open ``source_path`` and return its entry (not stored)."""
+        from PIL import Image, ImageOps
+
+        with Image.open(source_path) as original:
+            return self._entry(source_path, ImageOps.exif_transpose(original))
+
+    def is_current(self, source_path):
+        """Whether the stored entry still matches the file's size and mtime."""
+        entry = self._load().get(self.url(source_path))
+        if entry is None:
+            return False
+        stats = os.stat(source_path)
+        return entry.get('size') == stats.st_size and entry.get('mtime') == stats.st_mtime
+
+    def discard(self, source_path):
+        """Forget a deleted or replaced image."""
+        url = self.url(source_path)
+        with self._lock:
+            self._failed.discard(url)
+            if url not in self._load():
+                return
+        self.update({url: None})
+
+    def get(self, url):
+        """Return the entry for ``url``, or None (queueing it) if there is none yet."""
+        entry = self._load().get(url)
+        if entry is not None or url in self._failed:
+            return entry
+        source_path = self._source_path(url)
+        if source_path is not None:
+            self._queue(url, source_path)
+        return None
+
+    # ===================================
+    # Background computation
+    # ===================================
+
+    def _queue(self, url, source_path):
+        with self._lock:
+            if url in self._pending:
+                return
+            self._pending.add(url)
+            start = len(self._pending) == 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='image-metadata')
+        if start:
+            self._executor.submit(self._drain).add_done_callback(self._log_failure)
+
+    def _drain(self):
+        # Work through everything queued meanwhile and write the file once per batch
+        while True:
+            with self._lock:
+                batch = set(self._pending)
+            if not batch:
+                return
+            try:
+                changes = {}
+                for url in batch:
+                    try:
+                        changes[url] = self.compute(self._source_path(url))
+                    except Exception as e:
+                        # Not an image Pillow can read (or not there any more): skip it
+                        logger.info('Could not read image metadata for %s: %s', url, e)
+                        with self._lock:
+                            self._failed.add(url)
+                if changes:
+                    self.update(changes)
+            except Exception:
+                # Keep draining: this thread is only started again once the queue is empty
+                logger.exception('Could not store image metadata for %d image(s)', len(batch))
+            finally:
+                # Even if the batch failed, later gets must be able to queue these again
+                with self._lock:
+                    self._pending -= batch
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.error('Image metadata computation failed', exc_info=future.exception())
+
+    def add_listener(self, callback):
+        """Call ``callback()`` whenever entries are added or removed."""
+        self._listeners.append(callback)
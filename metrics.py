@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Server-Timing metric names are HTTP tokens
+_TOKEN_RE = re.compile(r'[^A-Za-z0-9!#$%&\'*+.^_`|~-]')
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'count', 'sum')
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self):
+        """Return ``[(le, count)]`` pairs as Prometheus expects, ending with +Inf."""
+        total, pairs = 0, []
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            pairs.append((bound, total))
+        pairs.append(('+Inf', self.count))
+        return pairs
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        target = q * self.count
+        for bound, count in self.cumulative():
+            if count >= target:
+                return bound if bound != '+Inf' else self.buckets[-1]
+        return self.buckets[-1]
+
+
+class RequestTimer:
+    """Timings collected while handling one request.
+
+    Durations are summed per phase name; nested calls to the same phase
+    (e.g. a store read made from inside another store read) are only
+    counted once, at the outermost level.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.marks = {}
+        self._active = {}
+
+    def enter(self, name):
+        depth = self._active.get(name, 0)
+        self._active[name] = depth + 1
+        return depth == 0
+
+    def exit(self, name, duration, outermost):
+        self._active[name] -= 1
+        if outermost:
+            total, count = self.phases.get(name, (0.0, 0))
+            self.phases[name] = (total + duration, count + 1)
+
+    def mark(self, name, description):
+        self.marks[name] = description
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def header(self, total=None):
+        """Render the timings as a ``Server-Timing`` header value."""
+        parts = []
+        for name, (duration, count) in self.phases.items():
+            parts.append(f'{_TOKEN_RE.sub("-", name)};dur={duration * 1000:.2f};desc="{count}x"')
+        for name, description in self.marks.items():
+            parts.append(f'{_TOKEN_RE.sub("-", name)};desc="{description}"')
+        if total is not None:
+            parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+
+class Metrics:
+    """Per-route latency histograms, request counters and phase timings.
+
+    ``current_timer`` returns the ``RequestTimer`` of the request being
+    handled (or None outside one), so ``timed`` wrappers can report into
+    the ``Server-Timing`` header as well as the process-wide aggregates.
+    Aggregates are per process; each worker reports its own.
+    """
+
+    def __init__(self, current_timer=lambda: None):
+        self.current_timer = current_timer
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._routes = {}
+        self._statuses = {}
+        self._phases = {}
+
+    def observe_request(self, route, method, status, duration):
+        with self._lock:
+            histogram = self._routes.get((route, method))
+            if histogram is None:
+                histogram = self._routes[(route, method)] = Histogram()
+            histogram.observe(duration)
+            key = (route, method, status)
+            self._statuses[key] = self._statuses.get(key, 0) + 1
+
+    def observe_phase(self, name, duration):
+        with self._lock:
+            histogram = self._phases.get(name)
+            if histogram is None:
+                histogram = self._phases[name] = Histogram()
+            histogram.observe(duration)
+
+    def timed(self, name):
+        """Decorator timing each call of the wrapped function as phase ``name``."""
+        def decorator(f):
+            @wraps(f)
+            def wrapper(*args, **kwargs):
+                timer = self.current_timer()
+                outermost = timer.enter(name) if timer is not None else True
+                start = time.perf_counter()
+                try:
+                    return f(*args, **kwargs)
+                finally:
+                    duration = time.perf_counter() - start
+                    if timer is not None:
+                        timer.exit(name, duration, outermost)
+                    if outermost:
+                        self.observe_phase(name, duration)
+            return wrapper
+        return decorator
+
+    def instrument(self, obj, methods, name):
+        """Replace ``obj``'s bound ``methods`` with timed versions."""
+        for method in methods:
+            setattr(obj, method, self.timed(name)(getattr(obj, method)))
+
+    # ===================================
+    # Reporting
+    # ===================================
+
+    def snapshot(self):
+        """Return the aggregates as plain dicts for the admin page."""
+        def summary(histogram):
+            return {
+                'count': histogram.count,
+                'mean_ms': histogram.sum / histogram.count * 1000 if histogram.count else None,
+                'p50_ms': histogram.quantile(0.5) * 1000 if histogram.count else None,
+                'p95_ms': histogram.quantile(0.95) * 1000 if histogram.count else None,
+                'p99_ms': histogram.quantile(0.99) * 1000 if histogram.count else None,
+            }
+
+        with self._lock:
+            routes = []
+            for (route, method), histogram in sorted(self._routes.items()):
+                statuses = {status: count for (r, m, status), count in self._statuses.items()
+                            if r == route and m == method}
+                routes.append({'route': route, 'method': method, 'statuses': dict(sorted(statuses.items())),
+                               **summary(histogram)})
+            phases = [{'phase': name, **summary(histogram)} for name, histogram in sorted(self._phases.items())]
+        return {'uptime_s': time.time() - self.started, 'routes': routes, 'phases': phases}
+
+    def prometheus(self, extra=()):
+        """Render the aggregates in the Prometheus text exposition format.
+
+        ``extra`` is an iterable of ``(name, type, help, value)`` for other
+        process-level values such as page cache statistics.
+        """
+        lines = []
+
+        def histogram_lines(metric, labels, histogram):
+            for le, count in histogram.cumulative():
+                lines.append(f'{metric}_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{metric}_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{metric}_count{{{labels}}} {histogram.count}')
+
+        with self._lock:
+            lines.append('# HELP http_request_duration_seconds Request latency by route.')
+            lines.append('# TYPE http_request_duration_seconds histogram')
+            for (route, method), histogram in sorted(self._routes.items()):
+                histogram_lines('http_request_duration_seconds',
+                                f'route="{_escape(route)}",method="{method}"', histogram)
+
+            lines.append('# HELP http_requests_total Requests by route and status.')
+            lines.append('# TYPE http_requests_total counter')
+            for (route, method, status), count in sorted(self._statuses.items()):
+                lines.append(f'http_requests_total{{route="{_escape(route)}",method="{method}",'
+                             f'status="{status}"}} {count}')
+
+            lines.append('# HELP app_phase_duration_seconds Time spent in instrumented phases.')
+            lines.append('# TYPE app_phase_duration_seconds histogram')
+            for name, histogram in sorted(self._phases.items()):
+                histogram_lines('app_phase_duration_seconds', f'phase="{_escape(name)}"', histogram)
+
+        for name, metric_type, help_text, value in extra:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,74 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+
+class CachedPage:
+    __slots__ = ('body', 'mimetype', 'etag', 'last_modified', 'dependencies', 'links')
+
+    def __init__(self, body, mimetype='text/html', dependencies=(), links=()):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self.dependencies = frozenset(dependencies)
+        # Link (preload) header values sent along with the page
+        self.links = tuple(links)
+
+
+class PageCache:
+    """Bounded LRU cache of rendered public pages.
+
+    Keys are chosen by the caller and should include a version of the
+    content the page was rendered from, so a stale entry can never be
+    served. ``invalidate`` additionally drops every entry that depends on a
+    changed collection or image folder so old versions do not linger until
+    they are evicted.
+    """
+
+    def __init__(self, max_entries=128):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, mimetype='text/html', dependencies=(), links=()):
+        entry = CachedPage(body, mimetype, dependencies, links)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, dependency=None):
+        with self._lock:
+            if dependency is None:
+                self._entries.clear()
+                return
+            for key in [k for k, e in self._entries.items() if dependency in e.dependencies]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
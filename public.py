@@ -0,0 +1,108 @@
+from flask import Blueprint, jsonify, request
+
+from helpers import (asset_url, cached_page, get_page_images, preload_links, query_announcements, queue_submission,
+                     search_results)
+from services import render_template, store
+from submissions import contact_fields, newsletter_fields
+
+# Public site, registered at the root URL
+bp = Blueprint('public', __name__)
+
+@bp.route('/')
+@cached_page(collections=('programs',), image_folders=('hero', 'variants'))
+def index():
+    # Get slideshow images from hero folder
+    hero_images = get_page_images('hero')
+    # Get programs data for home page program cards
+    programs_data = store.all('programs')
+    html = render_template('index.html', current_page='home', hero_images=hero_images, programs=programs_data)
+    # Let the browser (or an Early Hints proxy) start on the stylesheet and first slide before parsing the HTML
+    links = preload_links(hero_images[0]['url'] if hero_images else None)
+    return html, {'Link': ', '.join(links)}
+
+@bp.route('/about')
+@cached_page(collections=('staff',))
+def about():
+    # Get leadership team for the about page
+    leadership_team = store.filter('staff', 'role', 'leadership')
+    
+    return render_template('about.html', current_page='about', leadership_team=leadership_team)
+
+@bp.route('/programs')
+@cached_page(collections=('programs',), image_folders=('variants',))
+def programs():
+    programs_data = store.all('programs')
+    # Programs now use image_url directly from JSON data
+    # No need for keyword matching since admin updates the JSON
+    return render_template('programs.html', current_page='programs', programs=programs_data)
+
+@bp.route('/staff')
+@cached_page(collections=('staff',), image_folders=('variants',))
+def staff():
+    # Separate leadership and program staff
+    leadership_team = store.filter('staff', 'role', 'leadership')
+    program_staff = store.filter('staff', 'role', 'program_staff')
+    
+    return render_template('staff.html', 
+                         current_page='staff',
+                         leadership_team=leadership_team,
+                         program_staff=program_staff)
+
+@bp.route('/announcements')
+@cached_page(collections=('announcements',), image_folders=('variants',))
+def announcements():
+    # Separate featured and regular announcements
+    featured_announcements = store.filter('announcements', 'featured', True)[:2]
+    pagination = query_announcements(request.args.get('category', 'all'),
+                                     request.args.get('page', 1, type=int))
+    
+    return render_template('announcements.html', 
+                         current_page='announcements',
+                         featured_announcements=featured_announcements,
+                         all_announcements=pagination['items'],
+                         pagination=pagination)
+
+@bp.route('/api/announcements')
+@cached_page(collections=('announcements',))
+def announcements_json():
+    pagination = query_announcements(request.args.get('category', 'all'),
+                                     request.args.get('page', 1, type=int))
+    
+    return jsonify({
+        'announcements': [dict(a, image_url=asset_url(a.get('image_url'))) for a in pagination['items']],
+        'category': pagination['category'],
+        'page': pagination['page'],
+        'pages': pagination['pages'],
+        'total': pagination['total'],
+        'next_page': pagination['next_page']
+    })
+
+@bp.route('/search')
+@cached_page(collections=('announcements', 'staff', 'programs'), image_folders=('variants',))
+def search():
+    results = search_results(request.args.get('q', '').strip(), request.args.get('type', 'all'),
+                             request.args.get('page', 1, type=int))
+    
+    return render_template('search.html', current_page='search', search=results)
+
+@bp.route('/api/search')
+@cached_page(collections=('announcements', 'staff', 'programs'))
+def search_json():
+    results = search_results(request.args.get('q', '').strip(), request.args.get('type', 'all'),
+                             request.args.get('page', 1, type=int))
+    results['results'] = [dict(r, image_url=asset_url(r['image_url'])) for r in results['results']]
+    return jsonify(results)
+
+@bp.route('/contact')
+@cached_page()
+def contact():
+    return render_template('contact.html', current_page='contact')
+
+# Form endpoints: submissions are validated here and written in the background
+@bp.route('/api/contact', methods=['POST'])
+def contact_submit():
+    return queue_submission('contact', contact_fields(request.form))
+
+@bp.route('/api/newsletter', methods=['POST'])
+def newsletter_submit():
+    return queue_submission('newsletter', newsletter_fields(request.form))
@@ -0,0 +1,175 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows: the file backend only locks within the process
+    fcntl = None
+
+
+def _refill(tokens, updated, now, capacity, rate):
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+def _take(state, now, capacity, rate):
+    """Return ``(new_state, retry_after)``; ``retry_after`` is 0 if a token was taken."""
+    tokens = capacity if state is None else _refill(state[0], state[1], now, capacity, rate)
+    if tokens >= 1:
+        return (tokens - 1, now), 0
+    return (tokens, now), (1 - tokens) / rate
+
+
+# ===================================
+# Bucket storage
+# ===================================
+
+class MemoryBuckets:
+    """Buckets kept in this process, least recently used evicted past ``max_keys``."""
+
+    def __init__(self, max_keys=10000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, now, capacity, rate):
+        with self._lock:
+            state, retry_after = _take(self._buckets.get(key), now, capacity, rate)
+            self._buckets[key] = state
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return retry_after
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class FileBuckets:
+    """Buckets shared by the workers of one host through a JSON file.
+
+    Every attempt reads and rewrites the file under an exclusive ``flock``,
+    so this suits low-traffic sites; use ``SqliteBuckets`` otherwise.
+    """
+
+    def __init__(self, path, max_keys=10000):
+        self.path = path
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    def take(self, key, now, capacity, rate):
+        with self._lock, open(self.path + '.lock', 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    buckets = json.load(f)
+            except (FileNotFoundError, ValueError):
+                buckets = {}
+            state, retry_after = _take(buckets.pop(key, None), now, capacity, rate)
+            # Insertion order doubles as recency: the key just used goes last
+            buckets[key] = state
+            for stale in list(buckets)[:max(0, len(buckets) - self.max_keys)]:
+                del buckets[stale]
+            tmp_path = f'{self.path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(buckets, f)
+            os.replace(tmp_path, self.path)
+            return retry_after
+
+
+class SqliteBuckets:
+    """Buckets shared by the workers of one host through a SQLite table.
+
+    Each attempt is one short ``BEGIN IMMEDIATE`` transaction; buckets
+    beyond ``max_keys`` are pruned, least recently used first, every
+    ``prune_every`` writes.
+    """
+
+    SCHEMA = 'CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+
+    def __init__(self, database, max_keys=10000, prune_every=100):
+        self.database = database
+        self.max_keys = max_keys
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        os.makedirs(os.path.dirname(database) or '.', exist_ok=True)
+        self._connect().execute(self.SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.database, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def take(self, key, now, capacity, rate):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (key,)).fetchone()
+            state, retry_after = _take(row, now, capacity, rate)
+            conn.execute('INSERT OR REPLACE INTO buckets (key, tokens, updated) VALUES (?, ?, ?)', (key, *state))
+            self._writes += 1
+            if self._writes % self.prune_every == 0:
+                conn.execute('DELETE FROM buckets WHERE key NOT IN '
+                             '(SELECT key FROM buckets ORDER BY updated DESC LIMIT ?)', (self.max_keys,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return retry_after
+
+
+# ===================================
+# Limiter
+# ===================================
+
+class LoginThrottle:
+    """Token-bucket limits on login attempts, checked before any password hashing.
+
+    Every attempt takes a token from its client IP's bucket and, for
+    usernames that exist, from that username's bucket; an attempt finding
+    either bucket empty is rejected without running the (deliberately
+    slow) password KDF, so a credential-stuffing burst cannot pin the
+    workers' CPUs. Unknown usernames never reach the KDF, so they are not
+    given buckets of their own.
+
+    ``per_ip`` and ``per_username`` are ``(burst, attempts per minute)``.
+    Buckets live in ``buckets`` (``MemoryBuckets`` by default, i.e. per
+    worker); pass ``FileBuckets`` or ``SqliteBuckets`` to share them between
+    the workers of a host. Rejections are counted per scope for /admin/metrics.
+    """
+
+    def __init__(self, per_ip=(10, 6), per_username=(5, 3), buckets=None, clock=time.time):
+        self.limits = {'ip': per_ip, 'username': per_username}
+        self.buckets = buckets if buckets is not None else MemoryBuckets()
+        self.clock = clock
+        self.rejected = {'ip': 0, 'username': 0}
+        self._lock = threading.Lock()
+
+    def check(self, ip, username=None):
+        """Take a token for this attempt; returns 0 if allowed, else seconds until a retry can succeed."""
+        now = self.clock()
+        for scope, key in (('ip', ip), ('username', username)):
+            if key is None:
+                continue
+            burst, per_minute = self.limits[scope]
+            retry_after = self.buckets.take(f'{scope}:{key}', now, burst, per_minute / 60)
+            if retry_after:
+                with self._lock:
+                    self.rejected[scope] += 1
+                return math.ceil(retry_after)
+        return 0
+
+    def stats(self):
+        with self._lock:
+            return dict(self.rejected)
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+# Values accepted as "yes" in CSV columns such as featured
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 'on'}
+
+DEFAULT_IMAGES = {
+    'announcements': '/static/images/announcements/default.jpg',
+    'staff': '/static/images/staff/default.jpg',
+}
+
+STAFF_ROLES = ('leadership', 'program_staff')
+
+
+def read_rows(file):
+    """Return the rows of an uploaded .csv or .json file as a list of dicts.
+
+    JSON may be a list of objects or an object holding such a list under
+    the collection name (the layout of the data/*.json files works as-is).
+    """
+    filename = (file.filename or '').lower()
+    text = file.stream.read().decode('utf-8-sig')
+    if filename.endswith('.json'):
+        data = json.loads(text)
+        if isinstance(data, dict):
+            data = next((v for v in data.values() if isinstance(v, list)), None)
+        if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+            raise ValueError('JSON must be a list of objects')
+        return data
+    if filename.endswith('.csv'):
+        return [{k.strip(): v for k, v in row.items() if k} for row in csv.DictReader(io.StringIO(text))]
+    raise ValueError('Upload a .csv or .json file')
+
+
+def _text(row, field):
+    value = row.get(field)
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    return str(value or '').strip().lower() in TRUE_VALUES
+
+
+def announcement_record(row, now):
+    title = _text(row, 'title')
+    if not title:
+        raise ValueError('title is required')
+    date = _text(row, 'date') or now.isoformat()
+    try:
+        datetime.fromisoformat(date)
+    except ValueError:
+        raise ValueError(f'date "{date}" is not an ISO date')
+    return {
+        'title': title,
+        'excerpt': _text(row, 'excerpt') or '',
+        'category': _text(row, 'category') or 'News',
+        'date': date,
+        'image_url': _text(row, 'image_url') or DEFAULT_IMAGES['announcements'],
+        'featured': _flag(row.get('featured'))
+    }
+
+
+def staff_record(row, now):
+    name = _text(row, 'name')
+    if not name:
+        raise ValueError('name is required')
+    role = _text(row, 'role') or 'program_staff'
+    if role not in STAFF_ROLES:
+        raise ValueError(f'role must be one of {", ".join(STAFF_ROLES)}')
+    record = {
+        'name': name,
+        'title': _text(row, 'title') or '',
+        'bio': _text(row, 'bio') or '',
+        'role': role,
+        'email': _text(row, 'email') or '',
+        'linkedin_url': _text(row, 'linkedin_url') or '',
+        'image_url': _text(row, 'image_url') or DEFAULT_IMAGES['staff']
+    }
+    if role == 'program_staff':
+        record['department'] = _text(row, 'department') or ''
+    return record
+
+
+BUILDERS = {'announcements': announcement_record, 'staff': staff_record}
+
+
+def build_records(name, rows):
+    """Validate ``rows`` for collection ``name``; returns ``(records, errors)``.
+
+    Records come back without ids. ``errors`` lists one message per bad
+    row, counting data rows from 1 (a CSV header is not counted).
+    """
+    build = BUILDERS[name]
+    now = datetime.now()
+    records, errors = [], []
+    for number, row in enumerate(rows, start=1):
+        try:
+            records.append(build(row, now))
+        except ValueError as e:
+            errors.append(f'Record {number}: {e}')
+    return records, errors
@@ -0,0 +1,267 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+# Collection -> (field, weight) pairs that are searched; a match in a
+# heavier field counts as that many occurrences
+SEARCH_FIELDS = {
+    'announcements': (('title', 2), ('excerpt', 1), ('category', 1)),
+    'staff': (('name', 3), ('title', 2), ('bio', 1), ('department', 1)),
+    'programs': (('name', 3), ('tagline', 2), ('description', 1), ('features', 1)),
+}
+
+# Runs of letters and digits; emoji and punctuation separate words
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def normalize(text):
+    """Casefold ``text`` and strip accents, so "Café" and "cafe" match."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+@lru_cache(maxsize=65536)
+def _normalize_word(word):
+    return tuple(_WORD_RE.findall(normalize(word)))
+
+
+def tokenize(value):
+    """Return the search terms in a field value (a string or a list of strings)."""
+    if not value:
+        return []
+    if isinstance(value, (list, tuple)):
+        value = ' '.join(str(v) for v in value)
+    text = str(value)
+    if text.isascii():
+        return _WORD_RE.findall(text.lower())
+    # Split first and normalise word by word: the vocabulary is small, so
+    # most words are already in the cache
+    terms = []
+    for word in _WORD_RE.findall(unicodedata.normalize('NFC', text)):
+        terms.extend(_normalize_word(word))
+    return terms
+
+
+class SearchIndex:
+    """In-memory inverted index over the content collections, ranked with BM25.
+
+    The index is built from the store on the first search. After that it is
+    kept in step record by record: a collection whose signature changed is
+    compared against the indexed copy and only added, edited or deleted
+    records are re-tokenized. ``refresh`` is registered as a store listener
+    so admin edits are applied as they are saved; changes made by another
+    process are picked up by the signature check on the next search.
+
+    Each term's postings are kept sorted by their BM25 contribution, so a
+    query walks the lists from the top and stops as soon as no unseen record
+    could still reach the requested page (Fagin's threshold algorithm)
+    rather than scoring every match. Document length normalisation uses the
+    average length from when a list was sorted; edits are applied to the
+    sorted lists in place, and a list is re-sorted once the average drifts
+    by more than 10%. Ranked
+    results are memoized per query until the index next changes.
+    """
+
+    def __init__(self, store, fields=SEARCH_FIELDS, k1=1.2, b=0.75, cache_size=256):
+        self.store = store
+        self.fields = fields
+        self.k1 = k1
+        self.b = b
+        self.cache_size = cache_size
+        self._postings = {}
+        self._docs = {}
+        self._keys = {name: set() for name in fields}
+        self._signatures = {}
+        self._total_length = 0
+        self._ranked = {}
+        self._cache = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ===================================
+    # Indexing
+    # ===================================
+
+    def _terms(self, name, record):
+        terms = {}
+        for field, weight in self.fields[name]:
+            for term in tokenize(record.get(field)):
+                terms[term] = terms.get(term, 0) + weight
+        return terms
+
+    def _add(self, key, record):
+        terms = self._terms(key[0], record)
+        length = sum(terms.values())
+        for term, tf in terms.items():
+            self._postings.setdefault(term, {})[key] = tf
+            self._update_ranked(term, key, tf, length)
+        self._docs[key] = (record, length, terms)
+        self._keys[key[0]].add(key)
+        self._total_length += length
+
+    def _remove(self, key):
+        record, length, terms = self._docs.pop(key)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+            self._update_ranked(term, key)
+        self._keys[key[0]].discard(key)
+        self._total_length -= length
+
+    def _sync(self, name):
+        signature = self.store.signature(name)
+        if self._signatures.get(name) == signature:
+            return
+        seen = set()
+        changed = False
+        for record in self.store.all(name):
+            key = (name, record.get('id'))
+            seen.add(key)
+            indexed = self._docs.get(key)
+            if indexed is not None and (indexed[0] is record or indexed[0] == record):
+                continue
+            if indexed is not None:
+                self._remove(key)
+            self._add(key, record)
+            changed = True
+        for key in self._keys[name] - seen:
+            self._remove(key)
+            changed = True
+        self._signatures[name] = signature
+        if changed:
+            self._cache.clear()
+
+    def refresh(self, name=None):
+        """Apply changes to ``name`` (or every collection) once the index is built."""
+        with self._lock:
+            for collection in ([name] if name is not None else list(self.fields)):
+                if collection in self._signatures:
+                    self._sync(collection)
+
+    # ===================================
+    # Queries
+    # ===================================
+
+    def _impact(self, tf, length, average_length):
+        norm = self.k1 * (1 - self.b + self.b * length / average_length)
+        return tf * (self.k1 + 1) / (tf + norm)
+
+    def _update_ranked(self, term, key, tf=None, length=None):
+        # Keep already sorted lists in step instead of re-sorting them on the
+        # next query: remove the record's old entry, insert the new one
+        if not self._ranked:
+            return
+        for collection in (None, key[0]):
+            cached = self._ranked.get((term, collection))
+            if cached is None:
+                continue
+            average_length, impacts, ordered = cached
+            old = impacts.pop(key, None)
+            if old is not None:
+                i = bisect.bisect_left(ordered, -old, key=lambda item: -item[0])
+                while ordered[i][1] != key:
+                    i += 1
+                del ordered[i]
+            if tf is not None:
+                impact = impacts[key] = self._impact(tf, length, average_length)
+                bisect.insort(ordered, (impact, key), key=lambda item: -item[0])
+
+    def _term_list(self, term, collection):
+        """Return ``(impacts, ordered)`` for a term: ``{key: impact}`` and ``[(impact, key)]`` best first."""
+        average_length = self._total_length / len(self._docs)
+        cached = self._ranked.get((term, collection))
+        if cached is not None and abs(cached[0] - average_length) <= 0.1 * cached[0]:
+            return cached[1], cached[2]
+
+        impacts = {}
+        for key, tf in self._postings.get(term, {}).items():
+            if collection is None or key[0] == collection:
+                impacts[key] = self._impact(tf, self._docs[key][1], average_length)
+        ordered = sorted(((impact, key) for key, impact in impacts.items()), key=lambda item: -item[0])
+        self._ranked[(term, collection)] = (average_length, impacts, ordered)
+        return impacts, ordered
+
+    def _rank(self, terms, collection, k):
+        """Return ``(total, [(score, key)])`` with the ``k`` best matches of any of ``terms``."""
+        n_docs = len(self._docs)
+        lists = []
+        for term in dict.fromkeys(terms):
+            df = len(self._postings.get(term, ()))
+            if not df:
+                continue
+            impacts, ordered = self._term_list(term, collection)
+            if ordered:
+                lists.append((math.log(1 + (n_docs - df + 0.5) / (df + 0.5)), impacts, ordered))
+        if not lists:
+            return 0, []
+        if len(lists) == 1:
+            idf, impacts, ordered = lists[0]
+            return len(ordered), [(idf * impact, key) for impact, key in ordered[:k]]
+
+        best, seen, depth = [], set(), 0
+        while True:
+            threshold, remaining = 0.0, False
+            for idf, _, ordered in lists:
+                if depth >= len(ordered):
+                    continue
+                remaining = True
+                impact, key = ordered[depth]
+                threshold += idf * impact
+                if key in seen:
+                    continue
+                seen.add(key)
+                score = sum(other_idf * impacts.get(key, 0.0) for other_idf, impacts, _ in lists)
+                entry = (score, len(seen), key)
+                if len(best) < k:
+                    heapq.heappush(best, entry)
+                elif score > best[0][0]:
+                    heapq.heapreplace(best, entry)
+            depth += 1
+            # No record not yet seen can score above the current k-th best
+            if not remaining or (len(best) >= k and best[0][0] >= threshold):
+                break
+
+        total = len(set(lists[0][1]).union(*(impacts for _, impacts, _ in lists[1:])))
+        return total, [(score, key) for score, _, key in sorted(best, key=lambda entry: (-entry[0], entry[1]))]
+
+    def search(self, query, collection=None, limit=10, offset=0):
+        """Return ``(total, hits)`` for ``query``; hits are ``(score, collection, record)``, best first."""
+        terms = tuple(tokenize(query))
+        if not terms:
+            return 0, []
+        with self._lock:
+            for name in self.fields:
+                self._sync(name)
+            if not self._docs:
+                return 0, []
+
+            cache_key = (terms, collection, offset + limit)
+            cached = self._cache.get(cache_key)
+            if cached is None:
+                total, best = self._rank(terms, collection, offset + limit)
+                cached = (total, [(score, key[0], self._docs[key][0]) for score, key in best])
+                self._cache[cache_key] = cached
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(cache_key)
+            total, ranked = cached
+            return total, ranked[offset:offset + limit]
+
+    def invalidate(self):
+        """Forget memoized results; the index itself is kept."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'documents': len(self._docs), 'terms': len(self._postings),
+                    'ranked_terms': len(self._ranked), 'cached_queries': len(self._cache)}
@@ -0,0 +1,178 @@
+import os
+
+from flask import current_app, g, has_request_context
+from flask import render_template as _render_template
+from werkzeug.local import LocalProxy
+
+from assets import AssetManifest
+from content_store import ContentStore
+from fragment_cache import FragmentCache
+from image_refs import ImageReferenceIndex
+from images import ImageFolderIndex, ImageMetadataIndex, ImagePipeline, ThumbnailCache
+from metrics import Metrics
+from page_cache import PageCache
+from ratelimit import FileBuckets, LoginThrottle, MemoryBuckets, SqliteBuckets
+from record_import import DEFAULT_IMAGES
+from search import SearchIndex
+from snapshot_store import SnapshotContentStore
+from static_export import StaticExporter
+from submissions import JsonlSubmissions, SqliteSubmissions, SubmissionWriter
+from storage import JsonStorage
+from uploads import UploadStore
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+# Request instrumentation: per-route latency histograms plus timings of the
+# data, image listing, rendering and file phases, reported per request in a
+# Server-Timing header and in aggregate on /admin/metrics. Shared by every app
+# in the process, like the worker it measures.
+metrics = Metrics(current_timer=lambda: g.get('request_timer') if has_request_context() else None)
+
+# Templates rendered through here are timed as the 'render' phase
+render_template = metrics.timed('render')(_render_template)
+
+
+def _writable(*folders):
+    """Whether every folder exists (or can be created) and can be written to."""
+    for folder in folders:
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError:
+            return False
+        if not os.access(folder, os.W_OK):
+            return False
+    return True
+
+
+class Services:
+    """Storage, caches and image handling shared by all requests of one app.
+
+    Built by ``create_app`` and kept in ``app.extensions['services']``; views
+    reach the parts through the proxies at the bottom of this module. Nothing
+    here touches the data until the first request needs it.
+    """
+
+    def __init__(self, app):
+        config = app.config
+
+        # Content storage: the indexed data/*.json collections, optionally
+        # shared by the workers through a memory-mapped snapshot, or, once
+        # migrated with 'flask migrate-to-sqlite', a SQLite database
+        snapshot_folder = os.path.join(config['CACHE_FOLDER'], 'snapshot')
+        if config['STORAGE_BACKEND'] == 'sqlite':
+            from sqlite_store import SqliteContentStore
+            self.store = SqliteContentStore(config['SQLITE_DATABASE'])
+        elif config['CONTENT_SNAPSHOT'] and _writable(config['DATA_FOLDER'], snapshot_folder):
+            self.store = SnapshotContentStore(config['DATA_FOLDER'], snapshot_folder,
+                                              verify_interval=config['CONTENT_SNAPSHOT_VERIFY_INTERVAL'])
+        else:
+            if config['CONTENT_SNAPSHOT']:
+                # Publishing needs a lock file in DATA_FOLDER and the snapshot files
+                app.logger.warning('Content snapshot disabled: %s or %s is not writable',
+                                   config['DATA_FOLDER'], snapshot_folder)
+            self.store = ContentStore(config['DATA_FOLDER'])
+
+        # Dimensions, blurred placeholders and dominant colours of the images,
+        # computed off the request path and persisted for every worker
+        self.image_metadata = ImageMetadataIndex(os.path.join('static', 'images'), config['CACHE_FOLDER'])
+
+        # Resized WebP/AVIF copies of uploaded images, encoded in the background
+        self.image_pipeline = ImagePipeline(os.path.join('static', 'images'),
+                                            os.path.join('static', 'images', 'variants'),
+                                            formats=config['IMAGE_VARIANT_FORMATS'],
+                                            metadata=self.image_metadata)
+
+        # Cached listings of the static/images folders, persisted for cold workers
+        self.image_index = ImageFolderIndex(os.path.join('static', 'images'), ALLOWED_EXTENSIONS,
+                                            manifest_folder=config['CACHE_FOLDER'])
+
+        # Small previews for the admin galleries, encoded on first request
+        self.thumbnails = ThumbnailCache(os.path.join('static', 'images'),
+                                         os.path.join(config['CACHE_FOLDER'], 'thumbnails'))
+
+        # Rendered public pages, dropped whenever the content they show changes
+        self.page_cache = PageCache(config['PAGE_CACHE_SIZE'])
+        self.store.add_listener(self.page_cache.invalidate)
+        self.image_index.add_listener(lambda folder: self.page_cache.invalidate(f'images/{folder}'))
+        self.image_metadata.add_listener(lambda: self.page_cache.invalidate('image-metadata'))
+
+        # Rendered {% cache %} blocks of the templates; fragments of records are
+        # namespaced by collection and dropped when it is edited
+        self.fragment_cache = FragmentCache(config['FRAGMENT_CACHE_SIZE'])
+        self.store.add_listener(self.fragment_cache.invalidate)
+
+        # Content-hashed static URLs, cached by browsers for a year
+        self.asset_manifest = AssetManifest(app.static_folder)
+
+        # Which records use each image, so unused ones can be garbage collected;
+        # the default images records fall back to and the image library's own
+        # uploads are never collected
+        self.image_refs = ImageReferenceIndex(self.store, os.path.join('static', 'images'),
+                                              pinned=DEFAULT_IMAGES.values(),
+                                              keep=lambda url: self.upload_store.in_library(url),
+                                              allowed_extensions=ALLOWED_EXTENSIONS)
+        self.store.add_listener(self.image_refs.refresh)
+
+        # Content-addressed uploads: identical bytes are stored once, and the
+        # reference index above tells whether announcements, staff or programs use them
+        self.upload_store = UploadStore(config['UPLOAD_FOLDER'], '/static/images/uploads',
+                                        JsonStorage(config['DATA_FOLDER']), references=self.image_refs.references)
+
+        # Full-text index over the content, built on the first search and then
+        # updated record by record as the collections change
+        self.search_index = SearchIndex(self.store)
+        self.store.add_listener(self.search_index.refresh)
+
+        # Public pages pre-rendered by 'flask export'; edits re-render the
+        # exported pages that depend on the changed collection or folder
+        self.exporter = StaticExporter(app, config['EXPORT_FOLDER'])
+        self.store.add_listener(self.exporter.invalidate)
+        self.image_index.add_listener(lambda folder: self.exporter.invalidate(f'images/{folder}'))
+        self.image_metadata.add_listener(lambda: self.exporter.invalidate('image-metadata'))
+
+        # Rate limits checked before the admin login hashes a password
+        max_keys = config['LOGIN_THROTTLE_MAX_KEYS']
+        if config['LOGIN_THROTTLE_STORAGE'] == 'sqlite':
+            buckets = SqliteBuckets(os.path.join(config['CACHE_FOLDER'], 'login-throttle.db'), max_keys)
+        elif config['LOGIN_THROTTLE_STORAGE'] == 'file':
+            buckets = FileBuckets(os.path.join(config['CACHE_FOLDER'], 'login-throttle.json'), max_keys)
+        else:
+            buckets = MemoryBuckets(max_keys)
+        self.login_throttle = LoginThrottle(config['LOGIN_THROTTLE_PER_IP'], config['LOGIN_THROTTLE_PER_USERNAME'],
+                                            buckets)
+
+        # Contact and newsletter submissions, written in batches off the request threads
+        if config['SUBMISSIONS_STORAGE'] == 'sqlite':
+            sink = SqliteSubmissions(os.path.join(config['DATA_FOLDER'], 'submissions.db'))
+        else:
+            sink = JsonlSubmissions(os.path.join(config['DATA_FOLDER'], 'submissions.jsonl'))
+        self.submissions = SubmissionWriter(sink, config['SUBMISSIONS_QUEUE_SIZE'], config['SUBMISSIONS_BATCH_SIZE'])
+
+        # Set by create_app once the middleware wraps the app
+        self.compression = None
+
+        metrics.instrument(self.store, ('all', 'get', 'filter', 'count'), 'data-load')
+        metrics.instrument(self.store, ('insert', 'update', 'delete', 'save', 'next_id'), 'data-save')
+        metrics.instrument(self.image_index, ('list',), 'images')
+        metrics.instrument(self.search_index, ('search',), 'search')
+
+
+def _service(name):
+    return LocalProxy(lambda: getattr(current_app.extensions['services'], name))
+
+
+store = _service('store')
+image_pipeline = _service('image_pipeline')
+image_index = _service('image_index')
+image_metadata = _service('image_metadata')
+image_refs = _service('image_refs')
+thumbnails = _service('thumbnails')
+login_throttle = _service('login_throttle')
+submissions = _service('submissions')
+page_cache = _service('page_cache')
+fragment_cache = _service('fragment_cache')
+upload_store = _service('upload_store')
+asset_manifest = _service('asset_manifest')
+compression = _service('compression')
+exporter = _service('exporter')
+search_index = _service('search_index')
@@ -0,0 +1,281 @@
+import json
+import marshal
+import mmap
+import os
+import struct
+import sys
+import time
+
+from content_store import ContentStore, _Collection
+
+# Leading bytes of every snapshot file; bump when the layout changes
+MAGIC = b'MWSNAP01'
+
+_GENERATION = struct.Struct('<Q')
+_HEADER_LENGTH = struct.Struct('<I')
+
+
+def _format():
+    # marshal data is only guaranteed to load on the Python that wrote it
+    return [marshal.version, *sys.version_info[:2]]
+
+
+class SharedSnapshot:
+    """Immutable snapshot files of the content, memory-mapped by every worker.
+
+    ``publish`` writes all collections into one file, ``<generation>.snap``
+    in ``folder``: a JSON header giving each collection's storage signature,
+    journal position and byte range, followed by the records serialised
+    with ``marshal``. The current generation is an 8 byte counter in the
+    ``generation`` file, which is only ever overwritten in place, so every
+    process that maps it sees a new generation as soon as it is published.
+
+    Readers map the file of the current generation read-only and decode a
+    collection straight from the mapped pages. A published file is never
+    changed, so one mapping stays consistent until the counter moves on;
+    the ``keep`` newest files are left in place for readers that are still
+    switching over. Callers must serialise ``publish`` across processes.
+    """
+
+    def __init__(self, folder, keep=2):
+        self.folder = folder
+        self.keep = keep
+        self._counter = None
+        self._mapped = None
+
+    def _path(self, generation):
+        return os.path.join(self.folder, f'{generation}.snap')
+
+    def _counter_path(self):
+        return os.path.join(self.folder, 'generation')
+
+    # ===================================
+    # Reads
+    # ===================================
+
+    def generation(self):
+        """Return the published generation, 0 if nothing was published yet."""
+        counter = self._counter
+        if counter is None:
+            try:
+                with open(self._counter_path(), 'rb') as f:
+                    counter = self._counter = mmap.mmap(f.fileno(), _GENERATION.size, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # Not created yet, or still shorter than the counter
+                return 0
+        return _GENERATION.unpack_from(counter)[0]
+
+    def view(self):
+        """Return ``(generation, header, buffer)`` for the current snapshot, or None."""
+        for _ in range(3):
+            generation = self.generation()
+            mapped = self._mapped
+            if mapped is not None and mapped[0] == generation:
+                return mapped
+            if not generation:
+                return None
+            try:
+                with open(self._path(generation), 'rb') as f:
+                    buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                # Superseded and pruned between reading the counter and opening it
+                continue
+            header = self._read_header(buffer)
+            if header is None or header['generation'] != generation or header['format'] != _format():
+                return None
+            self._mapped = mapped = (generation, header, buffer)
+            return mapped
+        return None
+
+    @staticmethod
+    def _read_header(buffer):
+        start = len(MAGIC) + _HEADER_LENGTH.size
+        if len(buffer) < start or buffer[:len(MAGIC)] != MAGIC:
+            return None
+        (length,) = _HEADER_LENGTH.unpack_from(buffer, len(MAGIC))
+        try:
+            header = json.loads(buffer[start:start + length])
+        except ValueError:
+            return None
+        header['base'] = start + length
+        return header
+
+    @staticmethod
+    def records(view, name):
+        """Decode the records of ``name`` from a ``view``."""
+        _, header, buffer = view
+        entry = header['collections'][name]
+        start = header['base'] + entry['offset']
+        with memoryview(buffer) as data, data[start:start + entry['length']] as payload:
+            return marshal.loads(payload)
+
+    def stats(self):
+        view = self.view()
+        if view is None:
+            return {'generation': 0, 'bytes': 0, 'collections': {}}
+        generation, header, buffer = view
+        return {'generation': generation, 'bytes': len(buffer),
+                'collections': {name: entry['length'] for name, entry in header['collections'].items()}}
+
+    # ===================================
+    # Publishing
+    # ===================================
+
+    def publish(self, collections):
+        """Write ``{name: (entry, payload)}`` as the next generation and return its number.
+
+        ``entry`` is a JSON-serialisable dict stored in the header next to
+        the payload's byte range; ``payload`` is the marshalled records.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        fd = os.open(self._counter_path(), os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, 'r+b', buffering=0) as counter:
+            current = counter.read(_GENERATION.size)
+            generation = (_GENERATION.unpack(current)[0] if len(current) == _GENERATION.size else 0) + 1
+
+            header = {'generation': generation, 'format': _format(), 'collections': {}}
+            offset = 0
+            for name, (entry, payload) in collections.items():
+                header['collections'][name] = {**entry, 'offset': offset, 'length': len(payload)}
+                offset += len(payload)
+            header = json.dumps(header, separators=(',', ':')).encode('utf-8')
+
+            filepath = self._path(generation)
+            tmp_path = f'{filepath}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(MAGIC + _HEADER_LENGTH.pack(len(header)) + header)
+                for _, payload in collections.values():
+                    f.write(payload)
+            os.replace(tmp_path, filepath)
+
+            # The file is complete before the counter points at it
+            counter.seek(0)
+            counter.write(_GENERATION.pack(generation))
+        self._prune(generation)
+        return generation
+
+    def _prune(self, generation):
+        for filename in os.listdir(self.folder):
+            stem, ext = os.path.splitext(filename)
+            if ext != '.snap' or not stem.isdigit() or int(stem) > generation - self.keep:
+                continue
+            try:
+                os.remove(os.path.join(self.folder, filename))
+            except OSError:
+                # Already pruned by another worker, or still mapped on Windows
+                pass
+
+
+class SnapshotContentStore(ContentStore):
+    """``ContentStore`` whose reads come from a ``SharedSnapshot``.
+
+    Instead of stat'ing each collection's snapshot and journal on every
+    read, a read checks the shared generation counter, which is one load
+    from a mapped page. When it has moved, only the collections whose
+    storage signature changed are decoded again, straight from the mapped
+    file; nothing is re-parsed from JSON. The serialised records sit in the
+    page cache once for all workers on the host, though each worker still
+    builds its own records and indexes from them.
+
+    Writes go through ``JsonStorage`` as before and publish the next
+    generation before their listeners run, so other workers see an edit on
+    their next read. Edits made
+    outside the app (by hand, or by a process running a plain
+    ``ContentStore``) are caught by comparing the files' signatures with
+    the snapshot at most once every ``verify_interval`` seconds.
+    """
+
+    def __init__(self, data_folder='data', snapshot_folder='cache/snapshot', indexes=None, storage=None,
+                 verify_interval=2.0, clock=time.monotonic):
+        super().__init__(data_folder, indexes, storage)
+        self.snapshot = SharedSnapshot(snapshot_folder)
+        self.verify_interval = verify_interval
+        self._clock = clock
+        self._generations = {}
+        self._verified = {}
+        self._encoded = {}
+
+    def _shared(self, name):
+        collection = self._collections.get(name)
+        if collection is not None and self._generations.get(name) == self.snapshot.generation() \
+                and self._clock() - self._verified.get(name, float('-inf')) < self.verify_interval:
+            return collection
+        return self._sync(name)
+
+    def _sync(self, name):
+        with self._lock:
+            now = self._clock()
+            view = self.snapshot.view()
+            entry = view[1]['collections'].get(name) if view is not None else None
+            stale = entry is None
+            if not stale and now - self._verified.get(name, float('-inf')) >= self.verify_interval:
+                stale = tuple(entry['signature']) != self.storage.signature(name)
+            if stale:
+                self.publish()
+                view = self.snapshot.view()
+                entry = view[1]['collections'].get(name) if view is not None else None
+                if entry is None:
+                    return self._collection(name)
+            self._verified[name] = now
+
+            signature = tuple(entry['signature'])
+            collection = self._collections.get(name)
+            if collection is None or collection.signature != signature:
+                collection = _Collection(self.snapshot.records(view, name), self.index_fields.get(name, ()),
+                                         signature, entry['journal_offset'], entry['journal_entries'])
+                self._collections[name] = collection
+            self._generations[name] = view[0]
+            return collection
+
+    def publish(self):
+        """Write the collections as they are on disk as the next snapshot generation."""
+        with self._lock, self.storage.lock('snapshot'):
+            collections = {}
+            for name in self.collections:
+                try:
+                    collection = self._collection(name)
+                except FileNotFoundError:
+                    continue
+                encoded = self._encoded.get(name)
+                if encoded is None or encoded[0] != collection.signature:
+                    encoded = self._encoded[name] = (collection.signature, marshal.dumps(collection.records))
+                entry = {'signature': collection.signature, 'journal_offset': collection.journal_offset,
+                         'journal_entries': collection.journal_entries}
+                collections[name] = (entry, encoded[1])
+            return self.snapshot.publish(collections)
+
+    # ===================================
+    # Reads
+    # ===================================
+
+    def all(self, name):
+        return self._shared(name).records
+
+    def get(self, name, record_id):
+        return self._shared(name).by_id.get(record_id)
+
+    def filter(self, name, field, value):
+        collection = self._shared(name)
+        if field in collection.indexes:
+            return collection.indexes[field].get(value, [])
+        return [r for r in collection.records if r.get(field) == value]
+
+    def signature(self, name):
+        return self._shared(name).signature
+
+    def invalidate(self, name=None):
+        with self._lock:
+            super().invalidate(name)
+            for state in (self._generations, self._verified):
+                if name is None:
+                    state.clear()
+                else:
+                    state.pop(name, None)
+
+    # ===================================
+    # Writes
+    # ===================================
+
+    def _notify(self, name):
+        self.publish()
+        super()._notify(name)
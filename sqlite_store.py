@@ -0,0 +1,268 @@
+import json
+import os
+import sqlite3
+import threading
+
+from content_store import BaseStore
+
+# Record fields copied into their own indexed columns
+INDEXED_COLUMNS = ('role', 'category', 'featured', 'date')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS records (
+    collection TEXT NOT NULL,
+    id TEXT NOT NULL,
+    position REAL NOT NULL,
+    role TEXT,
+    category TEXT,
+    featured INTEGER,
+    date TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (collection, id)
+);
+CREATE INDEX IF NOT EXISTS idx_records_position ON records (collection, position);
+CREATE INDEX IF NOT EXISTS idx_records_role ON records (collection, role, position);
+CREATE INDEX IF NOT EXISTS idx_records_category ON records (collection, category, position);
+CREATE INDEX IF NOT EXISTS idx_records_featured ON records (collection, featured, position);
+CREATE INDEX IF NOT EXISTS idx_records_date ON records (collection, date);
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sequences (
+    collection TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+"""
+
+
+def _encode_id(record_id):
+    # JSON keeps numeric ids (1) distinct from string ids ("staff-001")
+    return json.dumps(record_id)
+
+
+def _column_value(field, value):
+    if field == 'featured':
+        return None if value is None else int(bool(value))
+    return value
+
+
+class SqliteContentStore(BaseStore):
+    """Content store backed by a single SQLite database in WAL mode.
+
+    Every record is kept as JSON next to copies of its ``role``,
+    ``category``, ``featured`` and ``date`` fields, which are indexed so
+    filters never scan the whole collection. Each collection has a version
+    counter bumped in the same transaction as every write; it doubles as the
+    ``signature`` used by the page cache and to memoize query results, so
+    repeated reads between writes do not touch the database beyond one
+    primary-key lookup.
+    """
+
+    def __init__(self, database, indexes=None):
+        super().__init__(indexes)
+        self.database = database
+        self._local = threading.local()
+        self._memo = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(database) or '.', exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.database, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _memoized(self, name, key, query):
+        # Query results are cached per collection version
+        version = self.signature(name)
+        with self._lock:
+            memo = self._memo.get(name)
+            if memo is None or memo[0] != version:
+                memo = self._memo[name] = (version, {})
+            if key in memo[1]:
+                return memo[1][key]
+        result = query()
+        with self._lock:
+            if self._memo.get(name, (None,))[0] == version:
+                self._memo[name][1][key] = result
+        return result
+
+    # ===================================
+    # Reads
+    # ===================================
+
+    def signature(self, name):
+        row = self._connect().execute(
+            'SELECT version FROM versions WHERE collection = ?', (name,)).fetchone()
+        return row[0] if row else 0
+
+    def all(self, name):
+        def query():
+            rows = self._connect().execute(
+                'SELECT data FROM records WHERE collection = ? ORDER BY position', (name,))
+            return [json.loads(data) for (data,) in rows]
+        return self._memoized(name, ('all',), query)
+
+    def get(self, name, record_id):
+        def query():
+            row = self._connect().execute(
+                'SELECT data FROM records WHERE collection = ? AND id = ?',
+                (name, _encode_id(record_id))).fetchone()
+            return json.loads(row[0]) if row else None
+        return self._memoized(name, ('get', _encode_id(record_id)), query)
+
+    def filter(self, name, field, value):
+        if field not in INDEXED_COLUMNS:
+            return [r for r in self.all(name) if r.get(field) == value]
+
+        def query():
+            rows = self._connect().execute(
+                f'SELECT data FROM records WHERE collection = ? AND {field} IS ? ORDER BY position',
+                (name, _column_value(field, value)))
+            return [json.loads(data) for (data,) in rows]
+        return self._memoized(name, ('filter', field, _column_value(field, value)), query)
+
+    def count(self, name, field=None, value=None):
+        conn = self._connect()
+        if field is None:
+            return conn.execute('SELECT COUNT(*) FROM records WHERE collection = ?', (name,)).fetchone()[0]
+        if field not in INDEXED_COLUMNS:
+            return len(self.filter(name, field, value))
+        return conn.execute(f'SELECT COUNT(*) FROM records WHERE collection = ? AND {field} IS ?',
+                            (name, _column_value(field, value))).fetchone()[0]
+
+    def invalidate(self, name=None):
+        with self._lock:
+            if name is None:
+                self._memo.clear()
+            else:
+                self._memo.pop(name, None)
+
+    # ===================================
+    # Writes
+    # ===================================
+
+    def _write(self, name, write, changes_data=True):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            result = write(conn)
+            if changes_data:
+                conn.execute('INSERT INTO versions (collection, version) VALUES (?, 1) '
+                             'ON CONFLICT (collection) DO UPDATE SET version = version + 1', (name,))
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        if changes_data:
+            self._notify(name)
+        return result
+
+    @staticmethod
+    def _row(name, record, position):
+        return (name, _encode_id(record.get('id')), position,
+                *(_column_value(field, record.get(field)) for field in INDEXED_COLUMNS),
+                json.dumps(record, ensure_ascii=False))
+
+    @staticmethod
+    def _put(conn, row):
+        conn.execute('INSERT OR REPLACE INTO records (collection, id, position, role, category, featured, date, data) '
+                     'VALUES (?, ?, ?, ?, ?, ?, ?, ?)', row)
+
+    def save(self, name, records):
+        def write(conn):
+            conn.execute('DELETE FROM records WHERE collection = ?', (name,))
+            for position, record in enumerate(records):
+                self._put(conn, self._row(name, record, position))
+        self._write(name, write)
+
+    def compact(self, name):
+        self._connect().execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def next_id(self, name):
+        def write(conn):
+            row = conn.execute('SELECT last_id FROM sequences WHERE collection = ?', (name,)).fetchone()
+            ids = [r['id'] for r in self.all(name) if isinstance(r.get('id'), int)] if row is None else []
+            new_id = max([row[0] if row else 0] + ids) + 1
+            conn.execute('INSERT INTO sequences (collection, last_id) VALUES (?, ?) '
+                         'ON CONFLICT (collection) DO UPDATE SET last_id = excluded.last_id', (name, new_id))
+            return new_id
+        return self._write(name, write, changes_data=False)
+
+    def next_ids(self, name, count):
+        def write(conn):
+            row = conn.execute('SELECT last_id FROM sequences WHERE collection = ?', (name,)).fetchone()
+            ids = [r['id'] for r in self.all(name) if isinstance(r.get('id'), int)] if row is None else []
+            first_id = max([row[0] if row else 0] + ids) + 1
+            conn.execute('INSERT INTO sequences (collection, last_id) VALUES (?, ?) '
+                         'ON CONFLICT (collection) DO UPDATE SET last_id = excluded.last_id',
+                         (name, first_id + count - 1))
+            return range(first_id, first_id + count)
+        return self._write(name, write, changes_data=False)
+
+    def seed_sequence(self, name, last_id):
+        conn = self._connect()
+        conn.execute('INSERT INTO sequences (collection, last_id) VALUES (?, ?) '
+                     'ON CONFLICT (collection) DO UPDATE SET last_id = MAX(last_id, excluded.last_id)',
+                     (name, last_id))
+
+    def insert(self, name, record, first=False):
+        def write(conn):
+            aggregate = 'MIN(position) - 1' if first else 'MAX(position) + 1'
+            position = conn.execute(f'SELECT COALESCE({aggregate}, 0) FROM records WHERE collection = ?',
+                                    (name,)).fetchone()[0]
+            self._put(conn, self._row(name, record, position))
+        self._write(name, write)
+        return record
+
+    def insert_many(self, name, records, first=False):
+        if not records:
+            return records
+
+        def write(conn):
+            if first:
+                top = conn.execute('SELECT COALESCE(MIN(position), 0) FROM records WHERE collection = ?',
+                                   (name,)).fetchone()[0]
+                start = top - len(records)
+            else:
+                start = conn.execute('SELECT COALESCE(MAX(position) + 1, 0) FROM records WHERE collection = ?',
+                                     (name,)).fetchone()[0]
+            for i, record in enumerate(records):
+                self._put(conn, self._row(name, record, start + i))
+        self._write(name, write)
+        return records
+
+    def update(self, name, record_id, changes):
+        def write(conn):
+            row = conn.execute('SELECT position, data FROM records WHERE collection = ? AND id = ?',
+                               (name, _encode_id(record_id))).fetchone()
+            if row is None:
+                return None
+            record = {**json.loads(row[1]), **changes}
+            self._put(conn, self._row(name, record, row[0]))
+            return record
+        return self._write(name, write)
+
+    def delete(self, name, record_id):
+        def write(conn):
+            cursor = conn.execute('DELETE FROM records WHERE collection = ? AND id = ?',
+                                  (name, _encode_id(record_id)))
+            return cursor.rowcount > 0
+        return self._write(name, write)
+
+    def delete_many(self, name, record_ids):
+        def write(conn):
+            deleted = []
+            for record_id in dict.fromkeys(record_ids):
+                row = conn.execute('DELETE FROM records WHERE collection = ? AND id = ? RETURNING data',
+                                   (name, _encode_id(record_id))).fetchone()
+                if row is not None:
+                    deleted.append(json.loads(row[0]))
+            return deleted
+        return self._write(name, write)
@@ -1,39 +1,186 @@
 /**
- * Announcements filtering functionality
+ * Announcements filtering and pagination
+ *
+ * The server renders the first page of announcements. Changing the category
+ * or clicking "Load More" fetches further pages from the JSON endpoint
+ * instead of downloading the whole archive up front.
  */
 
-// Store all announcements for filtering
-let allAnnouncements = [];
+// Current query state, initialised from the server-rendered list
+let currentCategory = 'all';
+let nextPage = null;
+let requestToken = 0;
+
+// Build the CSS modifier used for category badges, e.g. "Success Stories" -> "success-stories"
+function categoryClass(category) {
+    return 'badge-' + (category || '').toLowerCase().replace(/ /g, '-');
+}
+
+// Create an announcement list item matching the server-rendered markup
+function createAnnouncementCard(announcement) {
+    const card = document.createElement('div');
+    card.className = 'announcement-card announcement-list-item fade-in';
+    card.setAttribute('data-category', announcement.category || '');
+
+    const imageWrapper = document.createElement('div');
+    imageWrapper.className = 'announcement-list-image';
+    const image = document.createElement('img');
+    image.src = announcement.image_url;
+    image.alt = announcement.title || '';
+    image.loading = 'lazy';
+    imageWrapper.appendChild(image);
+
+    const content = document.createElement('div');
+    content.className = 'announcement-list-content';
+
+    const meta = document.createElement('div');
+    meta.className = 'announcement-meta';
+    const badge = document.createElement('span');
+    badge.className = 'badge badge-category ' + categoryClass(announcement.category);
+    badge.textContent = announcement.category || '';
+    const date = document.createElement('span');
+    date.className = 'announcement-date';
+    date.innerHTML = '<i data-lucide="calendar"></i>';
+    date.appendChild(document.createTextNode(' ' + (announcement.date || '').slice(0, 10)));
+    meta.appendChild(badge);
+    meta.appendChild(date);
+
+    const title = document.createElement('h3');
+    title.className = 'announcement-list-title';
+    title.textContent = announcement.title || '';
+
+    const excerpt = document.createElement('p');
+    excerpt.className = 'announcement-list-excerpt';
+    excerpt.textContent = announcement.excerpt || '';
+
+    const link = document.createElement('a');
+    link.href = '#';
+    link.className = 'btn-outline btn-sm';
+    link.textContent = 'Learn More';
+
+    content.appendChild(meta);
+    content.appendChild(title);
+    content.appendChild(excerpt);
+    content.appendChild(link);
+
+    card.appendChild(imageWrapper);
+    card.appendChild(content);
+    return card;
+}
+
+// Fetch one page of announcements for a category from the JSON endpoint
+async function fetchAnnouncements(category, page) {
+    const list = document.getElementById('announcements-list');
+    const params = new URLSearchParams({ category: category, page: page });
+    const response = await fetch(`${list.dataset.apiUrl}?${params}`, {
+        headers: { 'Accept': 'application/json' }
+    });
+
+    if (!response.ok) {
+        throw new Error(`Failed to load announcements (${response.status})`);
+    }
+    return response.json();
+}
+
+// Append (or replace) list items with a page of results
+function renderAnnouncements(data, replace) {
+    const list = document.getElementById('announcements-list');
+
+    if (replace) {
+        list.querySelectorAll('.announcement-list-item').forEach(card => card.remove());
+    }
+
+    const fragment = document.createDocumentFragment();
+    data.announcements.forEach(announcement => {
+        fragment.appendChild(createAnnouncementCard(announcement));
+    });
+    list.appendChild(fragment);
+
+    nextPage = data.next_page;
+    updateLoadMoreButton();
+    updateEmptyState(data.category, data.total);
+
+    // Re-initialize Lucide icons if available
+    if (typeof lucide !== 'undefined' && lucide.createIcons) {
+        lucide.createIcons();
+    }
+}
 
 // Filter announcements by category
-function filterAnnouncements(category) {
+async function filterAnnouncements(category) {
     const startTime = performance.now();
+    const token = ++requestToken;
+    currentCategory = category;
 
-    const announcementCards = document.querySelectorAll('.announcement-card');
+    // Featured announcements are rendered server-side; there are at most two
+    document.querySelectorAll('.featured-announcements-section .announcement-card').forEach(card => {
+        const matches = category === 'all' || card.getAttribute('data-category') === category;
+        card.classList.toggle('hidden', !matches);
+    });
 
-    announcementCards.forEach(card => {
-        const cardCategory = card.getAttribute('data-category');
+    try {
+        const data = await fetchAnnouncements(category, 1);
 
-        if (category === 'all' || cardCategory === category) {
-            card.style.display = '';
-            // Add fade-in animation
-            card.classList.remove('hidden');
-            card.classList.add('fade-in');
-        } else {
-            card.style.display = 'none';
-            card.classList.add('hidden');
-            card.classList.remove('fade-in');
+        // Ignore responses for a filter the user has already moved away from
+        if (token !== requestToken) {
+            return;
         }
-    });
-
-    const endTime = performance.now();
-    const duration = endTime - startTime;
+        renderAnnouncements(data, true);
+    } catch (error) {
+        console.error(error);
+        if (typeof toast !== 'undefined') {
+            toast.show('Could not load announcements. Please try again.', 'error');
+        }
+        return;
+    }
 
-    // Log performance (should be under 300ms as per requirements)
+    const duration = performance.now() - startTime;
     console.log(`Filtering completed in ${duration.toFixed(2)}ms`);
+}
+
+// Load the next page for the current category
+async function loadMoreAnnouncements() {
+    if (!nextPage) {
+        return;
+    }
+
+    const token = requestToken;
+    const data = await fetchAnnouncements(currentCategory, nextPage);
+    if (token === requestToken) {
+        renderAnnouncements(data, false);
+    }
+}
+
+// Show the "Load More" button only while there are further pages
+function updateLoadMoreButton() {
+    const button = document.getElementById('load-more-announcements');
+    const pagination = document.querySelector('.announcements-pagination');
+    if (!pagination) {
+        return;
+    }
 
-    // Update empty state message
-    updateEmptyState(category);
+    if (nextPage) {
+        if (button) {
+            button.style.display = '';
+            button.setAttribute('data-next-page', nextPage);
+        } else {
+            const link = document.createElement('a');
+            link.id = 'load-more-announcements';
+            link.className = 'btn-outline';
+            link.href = '#';
+            link.textContent = 'Load More Announcements';
+            link.setAttribute('data-next-page', nextPage);
+            link.addEventListener('click', onLoadMoreClick);
+            pagination.appendChild(link);
+        }
+    } else if (button) {
+        button.style.display = 'none';
+    }
+}
+
+function onLoadMoreClick(event) {
+    event.preventDefault();
+    loadMoreAnnouncements().catch(error => console.error(error));
 }
 
 // Update active filter button styling
@@ -51,11 +198,10 @@ function setActiveFilter(button) {
 }
 
 // Update empty state message when no announcements match filter
-function updateEmptyState(category) {
-    const visibleCards = document.querySelectorAll('.announcement-card:not(.hidden)');
+function updateEmptyState(category, total) {
     let emptyState = document.getElementById('empty-state');
 
-    if (visibleCards.length === 0) {
+    if (total === 0) {
         // Create empty state if it doesn't exist
         if (!emptyState) {
             emptyState = document.createElement('div');
@@ -77,11 +223,6 @@ function updateEmptyState(category) {
             </div>
         `;
         emptyState.style.display = 'block';
-
-        // Re-initialize Lucide icons if available
-        if (typeof lucide !== 'undefined' && lucide.createIcons) {
-            lucide.createIcons();
-        }
     } else {
         // Hide empty state if announcements are visible
         if (emptyState) {
@@ -92,6 +233,15 @@ function updateEmptyState(category) {
 
 // Initialize announcements filtering when DOM is loaded
 document.addEventListener('DOMContentLoaded', function () {
+    const list = document.getElementById('announcements-list');
+    if (!list) {
+        return;
+    }
+
+    currentCategory = list.dataset.category || 'all';
+    const loadMore = document.getElementById('load-more-announcements');
+    nextPage = loadMore ? parseInt(loadMore.getAttribute('data-next-page'), 10) : null;
+
     // Get all filter buttons
     const filterButtons = document.querySelectorAll('.filter-btn');
 
@@ -108,24 +258,22 @@ document.addEventListener('DOMContentLoaded', function () {
         });
     });
 
-    // Store all announcement cards for reference
-    const announcementCards = document.querySelectorAll('.announcement-card');
-    allAnnouncements = Array.from(announcementCards);
+    if (loadMore) {
+        loadMore.addEventListener('click', onLoadMoreClick);
+    }
 
     // Set initial active filter (should be "all")
     const activeButton = document.querySelector('.filter-btn.active');
     if (!activeButton && filterButtons.length > 0) {
         setActiveFilter(filterButtons[0]);
     }
-
-    // Initialize with all announcements visible
-    filterAnnouncements('all');
 });
 
 // Export functions for potential use in other scripts
 if (typeof module !== 'undefined' && module.exports) {
     module.exports = {
         filterAnnouncements,
+        loadMoreAnnouncements,
         setActiveFilter
     };
 }
@@ -122,6 +122,26 @@ function showToast(message, type = 'success') {
     }
 }
 
+// Post a form to its action; resolves to { ok, status, body }
+function postForm(form) {
+    return fetch(form.action, {
+        method: 'POST',
+        body: new FormData(form),
+        headers: { 'Accept': 'application/json' }
+    }).then(response => response.json()
+        .catch(() => ({}))
+        .then(body => ({ ok: response.ok, status: response.status, body })));
+}
+
+// Toast for a submission the server refused or never saw
+function showSubmitError(result) {
+    if (result && result.status === 429) {
+        showToast(result.body.error || 'We are receiving a lot of messages right now. Please try again in a moment.', 'error');
+    } else {
+        showToast('Something went wrong. Please try again.', 'error');
+    }
+}
+
 // Handle form submission
 function submitForm(event) {
     event.preventDefault();
@@ -145,23 +165,34 @@ function submitForm(event) {
         return;
     }
 
-    // Simulate form submission (in production, this would send to backend)
-    // For now, we'll just show success message and clear form
-    setTimeout(() => {
-        showToast('Thank you for your message! We will get back to you soon.', 'success');
-        form.reset();
-
-        // Clear any remaining error states
-        const errorFields = form.querySelectorAll('.field-error');
-        errorFields.forEach(field => {
-            field.classList.remove('field-error');
-        });
-
-        const errorMessages = form.querySelectorAll('.error-message');
-        errorMessages.forEach(msg => {
-            msg.remove();
-        });
-    }, 500);
+    const button = form.querySelector('button[type="submit"]');
+    if (button) button.disabled = true;
+
+    postForm(form).then(result => {
+        if (result.ok) {
+            showToast('Thank you for your message! We will get back to you soon.', 'success');
+            form.reset();
+
+            // Clear any remaining error states
+            const errorFields = form.querySelectorAll('.field-error');
+            errorFields.forEach(field => {
+                field.classList.remove('field-error');
+            });
+
+            const errorMessages = form.querySelectorAll('.error-message');
+            errorMessages.forEach(msg => {
+                msg.remove();
+            });
+        } else if (result.status === 400 && result.body.errors) {
+            // The server checks the same rules; show what it rejected
+            Object.entries(result.body.errors).forEach(([fieldId, message]) => showFieldError(fieldId, message));
+            showToast('Please fix the errors in the form', 'error');
+        } else {
+            showSubmitError(result);
+        }
+    }).catch(() => showSubmitError(null)).finally(() => {
+        if (button) button.disabled = false;
+    });
 }
 
 // Initialize form functionality when DOM is loaded
@@ -197,12 +228,21 @@ document.addEventListener('DOMContentLoaded', function () {
             event.preventDefault();
             const emailInput = form.querySelector('input[type="email"]');
 
-            if (emailInput && validateEmail(emailInput.value)) {
-                showToast('Thank you for subscribing to our newsletter!', 'success');
-                form.reset();
-            } else {
+            if (!emailInput || !validateEmail(emailInput.value)) {
                 showToast('Please enter a valid email address', 'error');
+                return;
             }
+
+            postForm(form).then(result => {
+                if (result.ok) {
+                    showToast('Thank you for subscribing to our newsletter!', 'success');
+                    form.reset();
+                } else if (result.status === 400) {
+                    showToast('Please enter a valid email address', 'error');
+                } else {
+                    showSubmitError(result);
+                }
+            }).catch(() => showSubmitError(null));
         });
     });
 });
@@ -0,0 +1,62 @@
+/**
+ * Local icon sprite
+ *
+ * Provides the part of the Lucide API the pages use (lucide.createIcons) on
+ * top of the sprite written by `flask build-assets`: every
+ * <i data-lucide="name"> placeholder becomes an inline <svg> that references
+ * the matching <symbol> in the sprite, so no third-party script is loaded.
+ */
+
+(function () {
+    const meta = document.querySelector('meta[name="icon-sprite"]');
+
+    // Without a built sprite the pages load the Lucide script instead
+    if (!meta || typeof window.lucide !== 'undefined') {
+        return;
+    }
+
+    const SVG_NS = 'http://www.w3.org/2000/svg';
+    const spriteUrl = meta.getAttribute('content');
+
+    // Stroke styling inherited by the sprite's paths, as in Lucide's own SVGs
+    const ICON_ATTRIBUTES = {
+        'width': '24',
+        'height': '24',
+        'viewBox': '0 0 24 24',
+        'fill': 'none',
+        'stroke': 'currentColor',
+        'stroke-width': '2',
+        'stroke-linecap': 'round',
+        'stroke-linejoin': 'round',
+        'aria-hidden': 'true'
+    };
+
+    function createIcon(placeholder) {
+        const name = placeholder.getAttribute('data-lucide');
+        const svg = document.createElementNS(SVG_NS, 'svg');
+
+        Object.keys(ICON_ATTRIBUTES).forEach(attribute => {
+            svg.setAttribute(attribute, ICON_ATTRIBUTES[attribute]);
+        });
+
+        // Keep the placeholder's own attributes (class, style, ...)
+        Array.from(placeholder.attributes).forEach(attribute => {
+            if (attribute.name !== 'data-lucide' && attribute.name !== 'class') {
+                svg.setAttribute(attribute.name, attribute.value);
+            }
+        });
+        svg.setAttribute('class', ['lucide', 'lucide-' + name, placeholder.getAttribute('class') || ''].join(' ').trim());
+
+        const use = document.createElementNS(SVG_NS, 'use');
+        use.setAttribute('href', spriteUrl + '#' + name);
+        svg.appendChild(use);
+
+        placeholder.replaceWith(svg);
+    }
+
+    window.lucide = {
+        createIcons: function () {
+            document.querySelectorAll('i[data-lucide]').forEach(createIcon);
+        }
+    };
+})();
@@ -0,0 +1,21 @@
+/**
+ * Image Placeholders
+ */
+
+/**
+ * Drop the blurred placeholder behind an image once the image itself has loaded,
+ * so it cannot show through transparent or letterboxed images
+ * @param {HTMLImageElement} img - The image to clear
+ */
+function clearPlaceholder(img) {
+    img.style.background = '';
+    img.removeAttribute('data-placeholder');
+}
+
+document.querySelectorAll('img[data-placeholder]').forEach(img => {
+    if (img.complete && img.naturalWidth) {
+        clearPlaceholder(img);
+    } else {
+        img.addEventListener('load', () => clearPlaceholder(img), { once: true });
+    }
+});
@@ -4,9 +4,31 @@
 
 let currentSlide = 0;
 let slideInterval;
+let preloadTimeout;
 const slides = document.querySelectorAll('.slide');
 const indicators = document.querySelectorAll('.indicator');
 const autoPlayDelay = 5000; // 5 seconds
+const preloadLead = 2000; // fetch the next slide 2 seconds before it is due
+
+/**
+ * Swap in the real sources of a deferred slide so the browser fetches its image
+ * @param {number} index - The index of the slide to load
+ */
+function loadSlide(index) {
+    const slide = slides[(index + slides.length) % slides.length];
+    if (!slide) {
+        return;
+    }
+
+    slide.querySelectorAll('source[data-srcset]').forEach(source => {
+        source.srcset = source.dataset.srcset;
+        source.removeAttribute('data-srcset');
+    });
+    slide.querySelectorAll('img[data-src]').forEach(img => {
+        img.src = img.dataset.src;
+        img.removeAttribute('data-src');
+    });
+}
 
 /**
  * Show a specific slide
@@ -32,9 +54,14 @@ function showSlide(index) {
         indicator.classList.remove('active');
     });
 
-    // Show current slide
+    // Show current slide, fetching it now if it was not loaded ahead of time
+    loadSlide(currentSlide);
     slides[currentSlide].classList.add('active');
 
+    // Load the following slide shortly before auto-play reaches it
+    clearTimeout(preloadTimeout);
+    preloadTimeout = setTimeout(() => loadSlide(currentSlide + 1), autoPlayDelay - preloadLead);
+
     // Highlight current indicator
     if (indicators[currentSlide]) {
         indicators[currentSlide].classList.add('active');
@@ -0,0 +1,253 @@
+import json
+import logging
+import mimetypes
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import bundles
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'export-manifest.json'
+
+
+def _version_key(version):
+    # Signatures are tuples of mtimes and sizes; compare them as JSON
+    return json.dumps(version) if version is not None else None
+
+
+def output_path(path, mimetype):
+    """Return the file a page is exported to, relative to the output folder.
+
+    HTML pages become ``<path>/index.html`` so static hosts serve them at
+    the same URL; other types get their usual extension (``api/announcements.json``).
+    """
+    stem = path.strip('/')
+    if mimetype == 'text/html':
+        return f'{stem}/index.html' if stem else 'index.html'
+    return stem + (mimetypes.guess_extension(mimetype) or '')
+
+
+class StaticExporter:
+    """Pre-rendered copies of the public pages, kept current as content changes.
+
+    Every GET route of the ``public`` blueprint without URL arguments whose
+    view is wrapped in ``cached_page`` is exportable; the collections and
+    image folders it depends on come from that decorator. ``export``
+    writes each page (plus .gz/.br copies) to ``output_folder`` and records
+    the content version it was rendered from in ``export-manifest.json``,
+    so re-running it only re-renders pages whose content changed.
+
+    ``invalidate`` is registered as a store and image index listener: an
+    admin edit re-renders, on a background thread, just the exported pages
+    that depend on what changed. ``lookup`` only hands out pages whose
+    recorded version is still current, so a page that is being re-rendered
+    (or was changed by another process) falls through to the app.
+    """
+
+    def __init__(self, app, output_folder, blueprint='public'):
+        self.app = app
+        self.output_folder = output_folder
+        self.blueprint = blueprint
+        self._manifest = None
+        self._manifest_mtime = None
+        self._lock = threading.Lock()
+        self._export_lock = threading.Lock()
+        self._executor = None
+        self._closed = False
+        self._pending = set()
+
+    # ===================================
+    # Pages
+    # ===================================
+
+    def pages(self):
+        """Return ``{path: (endpoint, dependencies)}`` for every exportable page."""
+        pages = {}
+        for rule in self.app.url_map.iter_rules():
+            view = self.app.view_functions.get(rule.endpoint)
+            if not rule.endpoint.startswith(f'{self.blueprint}.') or rule.arguments \
+                    or 'GET' not in rule.methods or not hasattr(view, 'dependencies'):
+                continue
+            pages[rule.rule] = (rule.endpoint, view.dependencies)
+        return pages
+
+    def dependency_map(self):
+        """Return ``{collection or 'images/<folder>': [paths]}``."""
+        dependents = {}
+        for path, (_, dependencies) in sorted(self.pages().items()):
+            for dependency in dependencies:
+                dependents.setdefault(dependency, []).append(path)
+        return dependents
+
+    # ===================================
+    # Manifest
+    # ===================================
+
+    def _manifest_path(self):
+        return os.path.join(self.output_folder, MANIFEST_NAME)
+
+    def manifest(self):
+        """Return ``{path: entry}`` for the exported pages, re-read if another process changed it."""
+        try:
+            mtime = os.stat(self._manifest_path()).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self._lock:
+            if self._manifest is None or mtime != self._manifest_mtime:
+                manifest = {}
+                if mtime is not None:
+                    try:
+                        with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                            manifest = json.load(f)['pages']
+                    except (FileNotFoundError, ValueError, KeyError):
+                        manifest = {}
+                self._manifest, self._manifest_mtime = manifest, mtime
+            return self._manifest
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.output_folder, exist_ok=True)
+        filepath = self._manifest_path()
+        tmp_path = f'{filepath}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'pages': manifest, 'dependencies': self.dependency_map()}, f, indent=2)
+        os.replace(tmp_path, filepath)
+        with self._lock:
+            self._manifest, self._manifest_mtime = manifest, os.stat(filepath).st_mtime_ns
+
+    # ===================================
+    # Rendering
+    # ===================================
+
+    def _current_version(self, endpoint):
+        return _version_key(self.app.view_functions[endpoint].content_version())
+
+    def render(self, path, endpoint):
+        """Render one page to disk; returns its manifest entry, or None if it wasn't a 200."""
+        # Rendering can itself bump a version (e.g. by writing an image listing
+        # manifest), so retry once; if content keeps changing the page is left stale
+        for _ in range(2):
+            with self.app.test_request_context(path):
+                version = self._current_version(endpoint)
+                response = self.app.make_response(self.app.view_functions[endpoint]())
+                if response.status_code != 200:
+                    return None
+                body = response.get_data()
+                if self._current_version(endpoint) == version:
+                    break
+        else:
+            version = None
+
+        filename = output_path(path, response.mimetype)
+        bundles.write_precompressed(os.path.join(self.output_folder, filename), body)
+        return {'file': filename, 'mimetype': response.mimetype, 'etag': response.get_etag()[0],
+                'links': response.headers.getlist('Link'), 'version': version}
+
+    def export(self, paths=None, force=False):
+        """Render ``paths`` (default: all pages) whose content changed since they were exported.
+
+        Returns ``(rendered, unchanged)`` lists of paths.
+        """
+        pages = self.pages()
+        rendered, unchanged = [], []
+        with self._export_lock:
+            manifest = dict(self.manifest())
+            for path in sorted(pages if paths is None else paths):
+                if path not in pages:
+                    continue
+                endpoint, _ = pages[path]
+                entry = manifest.get(path)
+                with self.app.test_request_context(path):
+                    current = self._current_version(endpoint)
+                if not force and entry is not None and entry['version'] == current \
+                        and os.path.exists(os.path.join(self.output_folder, entry['file'])):
+                    unchanged.append(path)
+                    continue
+                entry = self.render(path, endpoint)
+                if entry is None:
+                    manifest.pop(path, None)
+                    continue
+                manifest[path] = entry
+                rendered.append(path)
+            if rendered or len(manifest) != len(self.manifest()):
+                self._write_manifest(manifest)
+        return rendered, unchanged
+
+    # ===================================
+    # Incremental updates
+    # ===================================
+
+    def invalidate(self, dependency):
+        """Re-render, in the background, the exported pages that depend on ``dependency``."""
+        if self._closed:
+            return
+        manifest = self.manifest()
+        if not manifest:
+            return
+        paths = [path for path, (_, dependencies) in self.pages().items()
+                 if path in manifest and dependency in dependencies]
+        if paths:
+            self.refresh(paths)
+
+    def refresh(self, paths):
+        """Queue ``paths`` for re-rendering unless they are already queued.
+
+        Does nothing once ``close`` was called or the interpreter is exiting.
+        """
+        with self._lock:
+            paths = set(paths) - self._pending
+            if self._closed or not paths:
+                return None
+            self._pending |= paths
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='static-export')
+            executor = self._executor
+        try:
+            future = executor.submit(self._refresh, paths)
+        except RuntimeError:
+            # Shut down (by close, or at interpreter exit) since the check above
+            with self._lock:
+                self._pending -= paths
+            return None
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def _refresh(self, paths):
+        with self._lock:
+            self._pending -= paths
+        return self.export(paths)
+
+    def close(self):
+        """Finish the re-renders already queued and stop queueing new ones."""
+        with self._lock:
+            self._closed = True
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    @staticmethod
+    def _log_failure(future):
+        if future.exception() is not None:
+            logger.error('Static export failed', exc_info=future.exception())
+
+    # ===================================
+    # Serving
+    # ===================================
+
+    def lookup(self, path, endpoint):
+        """Return ``(filepath, entry)`` for an exported page that is still current, else None.
+
+        A page found stale is queued for re-rendering so later requests can
+        be served from disk again.
+        """
+        entry = self.manifest().get(path)
+        if entry is None:
+            return None
+        if entry['version'] is None or entry['version'] != self._current_version(endpoint):
+            self.refresh([path])
+            return None
+        filepath = os.path.join(self.output_folder, entry['file'])
+        if not os.path.exists(filepath):
+            return None
+        return filepath, entry
@@ -0,0 +1,218 @@
+import json
+import os
+import stat
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+# Journal entries allowed to pile up before they are folded into the snapshot
+DEFAULT_COMPACT_EVERY = 100
+
+
+def apply_ops(records, ops):
+    """Replay journal operations on top of ``records`` and return a new list.
+
+    Operations are idempotent so a journal that survived a crash during
+    compaction can safely be replayed over the freshly written snapshot.
+    """
+    records = list(records)
+    for op in ops:
+        if op['op'] == 'put':
+            record = op['record']
+            for i, existing in enumerate(records):
+                if existing.get('id') == record.get('id'):
+                    records[i] = record
+                    break
+            else:
+                if op.get('first'):
+                    records.insert(0, record)
+                else:
+                    records.append(record)
+        elif op['op'] == 'delete':
+            records = [r for r in records if r.get('id') != op['id']]
+    return records
+
+
+class JsonStorage:
+    """Crash-safe persistence for the data/*.json collections.
+
+    Each collection is stored as a snapshot (``<name>.json``) plus an
+    append-only journal (``<name>.journal``) of record-level changes, so a
+    single edit only appends one line. Once the journal holds
+    ``compact_every`` entries it is folded back into the snapshot, which is
+    always replaced atomically via a temp file and ``os.replace``.
+
+    Writers hold an exclusive ``flock`` on ``<name>.lock`` so several
+    workers can share one data folder, and new numeric ids come from a
+    persisted sequence (``<name>.seq``) that never hands out the same id
+    twice.
+    """
+
+    def __init__(self, data_folder='data', compact_every=DEFAULT_COMPACT_EVERY):
+        self.data_folder = data_folder
+        self.compact_every = compact_every
+        self._thread_locks = {}
+        self._guard = threading.Lock()
+        self._local = threading.local()
+
+    def _path(self, name, suffix):
+        return os.path.join(self.data_folder, f'{name}{suffix}')
+
+    @staticmethod
+    def _stat(filepath):
+        try:
+            stats = os.stat(filepath)
+        except FileNotFoundError:
+            return (0, 0)
+        return (stats.st_mtime_ns, stats.st_size)
+
+    def signature(self, name):
+        return self._stat(self._path(name, '.json')) + self._stat(self._path(name, '.journal'))
+
+    @contextmanager
+    def lock(self, name):
+        with self._guard:
+            thread_lock = self._thread_locks.setdefault(name, threading.RLock())
+        with thread_lock:
+            # flock is not re-entrant across file descriptions, so nested
+            # lock() calls in the same thread reuse the outer one
+            held = getattr(self._local, 'held', None)
+            if held is None:
+                held = self._local.held = set()
+            if fcntl is None or name in held:
+                yield
+                return
+            with open(self._path(name, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                held.add(name)
+                try:
+                    yield
+                finally:
+                    held.discard(name)
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    # ===================================
+    # Reads
+    # ===================================
+
+    def read_snapshot(self, name):
+        with open(self._path(name, '.json'), 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_journal(self, name, offset=0):
+        """Return ``(ops, end_offset)`` for journal entries after ``offset``.
+
+        A torn final line left by a crash mid-append is ignored; it will be
+        overwritten by the next append.
+        """
+        ops = []
+        try:
+            f = open(self._path(name, '.journal'), 'rb')
+        except FileNotFoundError:
+            return ops, 0
+        with f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    ops.append(json.loads(line))
+                except ValueError:
+                    break
+                offset += len(line)
+        return ops, offset
+
+    def load(self, name):
+        """Return ``(records, journal_offset, journal_entries)``."""
+        records = self.read_snapshot(name)
+        ops, offset = self.read_journal(name)
+        return apply_ops(records, ops), offset, len(ops)
+
+    # ===================================
+    # Writes
+    # ===================================
+
+    def atomic_write(self, filepath, write):
+        directory = os.path.dirname(filepath) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{os.path.basename(filepath)}.', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                write(f)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp creates the file 0600; keep the mode the target had
+            try:
+                mode = stat.S_IMODE(os.stat(filepath).st_mode)
+            except FileNotFoundError:
+                mode = 0o644
+            os.chmod(tmp_path, mode)
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+
+    def write_snapshot(self, name, records):
+        """Atomically replace the snapshot and discard the journal.
+
+        Callers must hold ``lock(name)``.
+        """
+        self.atomic_write(self._path(name, '.json'),
+                           lambda f: json.dump(records, f, indent=2, ensure_ascii=False))
+        journal_path = self._path(name, '.journal')
+        if os.path.exists(journal_path):
+            os.remove(journal_path)
+
+    def append(self, name, ops, offset):
+        """Append ``ops`` to the journal at ``offset`` and return the new offset.
+
+        Writing at the last known good offset drops any torn line left by an
+        earlier crash. Callers must hold ``lock(name)``.
+        """
+        payload = b''.join(
+            json.dumps(op, ensure_ascii=False).encode('utf-8') + b'\n' for op in ops)
+        fd = os.open(self._path(name, '.journal'), os.O_WRONLY | os.O_CREAT, 0o644)
+        try:
+            os.ftruncate(fd, offset)
+            os.lseek(fd, offset, os.SEEK_SET)
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        return offset + len(payload)
+
+    def compact(self, name):
+        with self.lock(name):
+            records, _, _ = self.load(name)
+            self.write_snapshot(name, records)
+        return records
+
+    def last_id(self, name):
+        """Return the last id handed out by the sequence for ``name`` (0 if none)."""
+        try:
+            with open(self._path(name, '.seq'), 'r', encoding='utf-8') as f:
+                return int(f.read().strip() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def next_id(self, name, records, count=1):
+        """Reserve ``count`` consecutive numeric ids for ``name`` and return the first.
+
+        The sequence is seeded from the largest integer id in ``records`` so
+        existing data keeps working. Callers must hold ``lock(name)``.
+        """
+        ids = [r['id'] for r in records if isinstance(r.get('id'), int)]
+        new_id = max([self.last_id(name)] + ids) + 1
+        self.atomic_write(self._path(name, '.seq'), lambda f: f.write(str(new_id + count - 1)))
+        return new_id
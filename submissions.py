@@ -0,0 +1,306 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialised within the process
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Same rules as static/js/forms.js, so the server agrees with the inline errors
+EMAIL_RE = re.compile(r'^[^\s@]+@[^\s@]+\.[^\s@]+$')
+PHONE_RE = re.compile(r'^(\+27|0)[0-9]{9}$')
+
+# Longest value accepted per field; anything longer is rejected rather than cut
+FIELD_LIMITS = {'name': 200, 'email': 254, 'phone': 20, 'subject': 200, 'message': 5000}
+
+# Columns shown in the admin area and exported, per kind of submission
+SUBMISSION_FIELDS = {
+    'contact': ('name', 'email', 'phone', 'subject', 'message'),
+    'newsletter': ('email',),
+}
+
+
+def _text(form, field):
+    return (form.get(field) or '').strip()
+
+
+def _check_length(fields, errors):
+    for field, value in fields.items():
+        if field not in errors and len(value) > FIELD_LIMITS[field]:
+            errors[field] = f'Please keep this under {FIELD_LIMITS[field]} characters'
+
+
+def contact_fields(form):
+    """Validate a contact form; returns ``(fields, errors)`` with one message per bad field."""
+    fields = {field: _text(form, field) for field in SUBMISSION_FIELDS['contact']}
+    errors = {}
+    if len(fields['name']) < 2:
+        errors['name'] = 'Name must be at least 2 characters long'
+    if not EMAIL_RE.match(fields['email']):
+        errors['email'] = 'Please enter a valid email address'
+    if not PHONE_RE.match(re.sub(r'[\s-]', '', fields['phone'])):
+        errors['phone'] = 'Please enter a valid South African phone number'
+    if len(fields['subject']) < 3:
+        errors['subject'] = 'Subject must be at least 3 characters long'
+    if len(fields['message']) < 10:
+        errors['message'] = 'Message must be at least 10 characters long'
+    _check_length(fields, errors)
+    return fields, errors
+
+
+def newsletter_fields(form):
+    """Validate a newsletter sign-up; returns ``(fields, errors)``."""
+    fields = {'email': _text(form, 'email')}
+    errors = {}
+    if not EMAIL_RE.match(fields['email']):
+        errors['email'] = 'Please enter a valid email address'
+    _check_length(fields, errors)
+    return fields, errors
+
+
+# ===================================
+# Submission logs
+# ===================================
+
+class JsonlSubmissions:
+    """Submissions appended one JSON object per line to ``path``.
+
+    A batch is written with a single ``write`` and ``fsync`` under an
+    exclusive ``flock``, so the workers of a host can share the file. The
+    file is only ever appended to, so readers keep what they parsed and
+    only read the lines added since; a torn final line left by a crash is
+    skipped.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._records = []
+        self._offset = 0
+        self._inode = None
+        self._lock = threading.Lock()
+
+    def append(self, records):
+        payload = b''.join(json.dumps(record, ensure_ascii=False).encode('utf-8') + b'\n' for record in records)
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            view = memoryview(payload)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _read(self):
+        with self._lock:
+            try:
+                f = open(self.path, 'rb')
+            except FileNotFoundError:
+                self._records, self._offset, self._inode = [], 0, None
+                return self._records
+            with f:
+                stats = os.fstat(f.fileno())
+                if stats.st_ino != self._inode or stats.st_size < self._offset:
+                    # Replaced or truncated by hand: start over
+                    self._records, self._offset, self._inode = [], 0, stats.st_ino
+                f.seek(self._offset)
+                records = list(self._records)
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    self._offset += len(line)
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        continue
+                self._records = records
+            return records
+
+    def count(self, kind):
+        return sum(1 for record in self._read() if record.get('kind') == kind)
+
+    def page(self, kind, offset, limit):
+        """Return up to ``limit`` submissions of ``kind``, newest first, skipping ``offset``."""
+        matches = [record for record in reversed(self._read()) if record.get('kind') == kind]
+        return matches[offset:offset + limit]
+
+    def iter(self, kind):
+        """Yield every submission of ``kind``, oldest first."""
+        return (record for record in self._read() if record.get('kind') == kind)
+
+
+class SqliteSubmissions:
+    """Submissions kept in a SQLite table in WAL mode.
+
+    A batch is inserted in one transaction with ``synchronous=FULL``, so
+    it costs a single fsync however many submissions it holds.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS submissions (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        id TEXT NOT NULL UNIQUE,
+        kind TEXT NOT NULL,
+        created TEXT NOT NULL,
+        data TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_submissions_kind ON submissions (kind, seq);
+    """
+
+    def __init__(self, database):
+        self.database = database
+        self._local = threading.local()
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.database) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.database, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=FULL')
+            conn.executescript(self.SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def append(self, records):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany('INSERT OR IGNORE INTO submissions (id, kind, created, data) VALUES (?, ?, ?, ?)',
+                             [(r['id'], r['kind'], r['created'], json.dumps(r, ensure_ascii=False)) for r in records])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def count(self, kind):
+        return self._connect().execute('SELECT COUNT(*) FROM submissions WHERE kind = ?', (kind,)).fetchone()[0]
+
+    def page(self, kind, offset, limit):
+        rows = self._connect().execute('SELECT data FROM submissions WHERE kind = ? ORDER BY seq DESC LIMIT ? OFFSET ?',
+                                       (kind, limit, offset))
+        return [json.loads(data) for data, in rows]
+
+    def iter(self, kind):
+        rows = self._connect().execute('SELECT data FROM submissions WHERE kind = ? ORDER BY seq', (kind,))
+        return (json.loads(data) for data, in rows)
+
+
+# ===================================
+# Writer
+# ===================================
+
+class SubmissionWriter:
+    """Bounded in-process queue of form submissions, persisted in batches off the request threads.
+
+    ``submit`` never touches the disk: it puts the submission on a queue of
+    at most ``max_queue`` entries and returns None when that is full, so
+    the endpoints can answer 429 instead of holding a request thread. One
+    writer thread per process takes everything queued (up to
+    ``batch_size``) and appends it to ``sink`` in one write; submissions
+    arriving during that fsync make up the next batch.
+
+    A batch that cannot be written is retried after ``retry_delay``
+    seconds rather than dropped; the queue filling up meanwhile is what
+    pushes back on clients. Whatever is still queued is flushed at exit.
+    """
+
+    def __init__(self, sink, max_queue=1000, batch_size=100, retry_delay=1.0):
+        self.sink = sink
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.retry_delay = retry_delay
+        self._queue = queue.Queue(max_queue)
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._exit_hook = False
+        self.accepted = 0
+        self.rejected = 0
+        self.written = 0
+        self.batches = 0
+
+    def _start(self):
+        if self._thread is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Forked after the parent started writing: its queue and thread stay behind
+                self._queue = queue.Queue(self.max_queue)
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='submission-writer', daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self.flush)
+                self._exit_hook = True
+
+    def submit(self, kind, fields):
+        """Queue a validated submission; returns the queued record, or None if the queue is full."""
+        record = {'id': uuid.uuid4().hex, 'kind': kind,
+                  'created': datetime.now(timezone.utc).isoformat(timespec='seconds'), **fields}
+        self._start()
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return None
+        with self._lock:
+            self.accepted += 1
+        return record
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(batch)
+            for _ in batch:
+                self._queue.task_done()
+
+    def _write(self, batch):
+        while True:
+            try:
+                self.sink.append(batch)
+            except Exception:
+                logger.exception('Could not write %d form submissions; retrying', len(batch))
+                time.sleep(self.retry_delay)
+                continue
+            with self._lock:
+                self.written += len(batch)
+                self.batches += 1
+            return
+
+    def flush(self, timeout=5.0):
+        """Wait up to ``timeout`` seconds for the queue to be written; returns True once it is."""
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {'queued': self._queue.qsize(), 'max_queue': self.max_queue, 'accepted': self.accepted,
+                    'rejected': self.rejected, 'written': self.written, 'batches': self.batches}
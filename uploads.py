@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+# Characters of the SHA-256 digest used in stored filenames
+HASH_LENGTH = 20
+
+# Extensions that name the same format, normalised so equal bytes dedupe
+EXTENSION_ALIASES = {'jpeg': 'jpg'}
+
+# Before uploads were content-addressed, image library files were saved as
+# upload_<timestamp>_<name>; those all belong to the library
+LEGACY_LIBRARY_PREFIX = 'upload_'
+
+
+class UploadStore:
+    """Content-addressed storage for uploaded images.
+
+    Each upload is streamed to a temp file while being hashed and kept as
+    ``<sha256 prefix>.<ext>``, so uploading the same bytes again only
+    returns the existing file. Records reference uploads by that URL;
+    ``references(url)`` returns the records using one (the image reference
+    index's ``references``), so a file still in use is never deleted from
+    the image library.
+
+    Files uploaded to the image library itself are used by no record, so
+    their names are kept in ``<data_folder>/image_library.json`` and
+    ``in_library`` tells the garbage collector to leave them alone.
+    """
+
+    def __init__(self, folder, url_prefix, storage, references=None):
+        self.folder = folder
+        self.url_prefix = url_prefix.rstrip('/') + '/'
+        self.storage = storage
+        self.references = references
+        self._library_path = os.path.join(storage.data_folder, 'image_library.json')
+        self._library = None
+        self._library_mtime = None
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def url(self, filename):
+        return self.url_prefix + filename
+
+    def filename(self, url):
+        """Return the stored filename for ``url``, or None if it isn't an upload."""
+        if not url or not url.startswith(self.url_prefix):
+            return None
+        return url[len(self.url_prefix):]
+
+    # ===================================
+    # Storage
+    # ===================================
+
+    def save(self, file, extension, chunk_size=65536):
+        """Store an uploaded file and return ``(filename, created)``."""
+        extension = EXTENSION_ALIASES.get(extension, extension)
+        digest = hashlib.sha256()
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, prefix='.upload-', suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: file.stream.read(chunk_size), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            filename = f'{digest.hexdigest()[:HASH_LENGTH]}.{extension}'
+            filepath = os.path.join(self.folder, filename)
+            if os.path.exists(filepath):
+                os.remove(tmp_path)
+                return filename, False
+            os.replace(tmp_path, filepath)
+            return filename, True
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ===================================
+    # References
+    # ===================================
+
+    def refcount(self, filename):
+        """Return how many records use the upload ``filename``."""
+        if self.references is None:
+            return 0
+        return len(self.references(self.url(filename)))
+
+    # ===================================
+    # Image library
+    # ===================================
+
+    def _read_library(self):
+        try:
+            mtime = os.stat(self._library_path).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        with self._lock:
+            if self._library is None or mtime != self._library_mtime:
+                library = frozenset()
+                if mtime is not None:
+                    try:
+                        with open(self._library_path, 'r', encoding='utf-8') as f:
+                            library = frozenset(json.load(f))
+                    except (FileNotFoundError, ValueError):
+                        pass
+                self._library, self._library_mtime = library, mtime
+            return self._library
+
+    def _change_library(self, add=(), remove=()):
+        with self.storage.lock('image_library'):
+            library = (set(self._read_library()) | set(add)) - set(remove)
+            self.storage.atomic_write(self._library_path, lambda f: json.dump(sorted(library), f, indent=2))
+
+    def add_to_library(self, *urls):
+        """Record that ``urls`` were uploaded to the image library."""
+        filenames = [f for f in map(self.filename, urls) if f is not None]
+        if filenames:
+            self._change_library(add=filenames)
+
+    def remove_from_library(self, *urls):
+        filenames = [f for f in map(self.filename, urls) if f is not None and f in self._read_library()]
+        if filenames:
+            self._change_library(remove=filenames)
+
+    def in_library(self, url):
+        """Whether ``url`` is an upload of the image library, which is kept even when no record uses it."""
+        filename = self.filename(url)
+        if filename is None:
+            return False
+        return filename.startswith(LEGACY_LIBRARY_PREFIX) or filename in self._read_library()